@@ -4,28 +4,112 @@ Define las tools y configuraciones necesarias para la navegación web.
 """
 
 import os
+import asyncio
+import functools
 import logging
+import multiprocessing
+import random
 import sys
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
 import time
-import html2text
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, List, Dict, Optional, Tuple, Union
 import urllib.parse
 
-import requests
-from bs4 import BeautifulSoup
-from mcp.server.fastmcp import FastMCP
-from starlette.routing import Route
-from starlette.responses import PlainTextResponse
+import httpx
+from mcp import types
+from mcp.server.fastmcp import Context, FastMCP
+from starlette.routing import Mount, Route
+from starlette.responses import PlainTextResponse, Response
+
+from app.core.cache import Cache
+from app.core.changes import ChangeDetector, page_fingerprint
+from app.core.chunks import ChunkedContent
+from app.core.config import settings
+from app.core.crawler import SiteCrawler
+from app.core.es_index import ElasticsearchIndex
+from app.core import metrics
+from app.core.index import SearchIndex, tokenize
+from app.core.metrics import observe_tool, setup_tracing, tracer
+from app.core.parser import StreamingParser, parse_page_timed
+from app.core.ratelimit import RateLimiter, UpstreamGate, UpstreamOverloaded
+from app.core.resilience import CircuitBreaker, CircuitOpen, LatencyTracker, is_transient
+from app.core.session import NavigationState, SessionRegistry
+from app.core.shared_cache import RedisPageCache
+from app.core.store import PageStore
+from app.core.vectors import VectorIndex, hybrid_scores, make_embedder
+from app.core.workers import LeaderLock, SessionRelay
 
 # --- Configuración centralizada ---
 CONFIG = {
     "PORT": int(os.environ.get("MCP_NAV_PORT", 9090)),
-    "BASE_URL": "https://modelcontextprotocol.io",
+    "BASE_URL": os.environ.get("MCP_NAV_BASE_URL", "https://modelcontextprotocol.io").rstrip("/"),
     "CACHE_TTL": int(os.environ.get("MCP_NAV_CACHE_TTL", 3600)),
+    "CACHE_MAX_ENTRIES": int(os.environ.get("MCP_NAV_CACHE_MAX_ENTRIES", 1000)),
+    "CACHE_MAX_BYTES": int(os.environ.get("MCP_NAV_CACHE_MAX_BYTES", 256 * 1024 * 1024)),
+    "CACHE_EXPIRY_INTERVAL": float(os.environ.get("MCP_NAV_CACHE_EXPIRY_INTERVAL", 60)),
+    "CACHE_STALE_TTL": int(os.environ.get("MCP_NAV_CACHE_STALE_TTL", 86400)),
+    "STALE_WHILE_REVALIDATE": os.environ.get("MCP_NAV_STALE_WHILE_REVALIDATE", "0") == "1",
+    "STORE_DIR": os.environ.get("MCP_NAV_STORE_DIR", ""),
+    "WORKERS": int(os.environ.get("MCP_NAV_WORKERS", 1)),
+    "STORE_SYNC_INTERVAL": float(os.environ.get("MCP_NAV_STORE_SYNC_INTERVAL", 2)),
+    "LEADER_RETRY_INTERVAL": float(os.environ.get("MCP_NAV_LEADER_RETRY_INTERVAL", 5)),
+    "REDIS_CACHE": os.environ.get("MCP_NAV_REDIS_CACHE", "0") == "1",
+    "REDIS_LOCK_TTL": float(os.environ.get("MCP_NAV_REDIS_LOCK_TTL", 30)),
+    "REDIS_LOCK_WAIT": float(os.environ.get("MCP_NAV_REDIS_LOCK_WAIT", 10)),
     "KEEP_HTML": os.environ.get("MCP_NAV_KEEP_HTML", "0") == "1",
+    "PARSER": os.environ.get("MCP_NAV_PARSER", "lxml"),
+    "PARSE_WORKERS": int(os.environ.get("MCP_NAV_PARSE_WORKERS", 0)),
+    "SESSION_MAX_HISTORY": int(os.environ.get("MCP_NAV_SESSION_MAX_HISTORY", 100)),
+    "SESSION_IDLE_TTL": float(os.environ.get("MCP_NAV_SESSION_IDLE_TTL", 1800)),
+    "MAX_SESSIONS": int(os.environ.get("MCP_NAV_MAX_SESSIONS", 1000)),
+    "MAX_LINKS": int(os.environ.get("MCP_NAV_MAX_LINKS", 20)),
+    "BATCH_MAX_URLS": int(os.environ.get("MCP_NAV_BATCH_MAX_URLS", 50)),
+    "BATCH_MAX_BYTES": int(os.environ.get("MCP_NAV_BATCH_MAX_BYTES", 4096)),
+    "CONTENT_CHUNK_BYTES": int(os.environ.get("MCP_NAV_CONTENT_CHUNK_BYTES", 16384)),
+    "CRAWL_ON_STARTUP": os.environ.get("MCP_NAV_CRAWL_ON_STARTUP", "0") == "1",
+    "CRAWL_INTERVAL": float(os.environ.get("MCP_NAV_CRAWL_INTERVAL", 0)),
+    "CRAWL_MAX_DEPTH": int(os.environ.get("MCP_NAV_CRAWL_MAX_DEPTH", 3)),
+    "CRAWL_MAX_PAGES": int(os.environ.get("MCP_NAV_CRAWL_MAX_PAGES", 200)),
+    "CRAWL_CONCURRENCY": int(os.environ.get("MCP_NAV_CRAWL_CONCURRENCY", 4)),
+    "CRAWL_DELAY": float(os.environ.get("MCP_NAV_CRAWL_DELAY", 0.5)),
+    "USER_AGENT": os.environ.get("MCP_NAV_USER_AGENT", "mcp-nav"),
+    "SITEMAP_URL": os.environ.get("MCP_NAV_SITEMAP_URL", ""),
+    "CHANGE_CHECK_INTERVAL": float(os.environ.get("MCP_NAV_CHANGE_CHECK_INTERVAL", 0)),
     "MAX_RETRIES": 3,
-    "RETRY_DELAY": 1
+    "RETRY_DELAY": 1,
+    "FETCH_TIMEOUT": float(os.environ.get("MCP_NAV_FETCH_TIMEOUT", 30)),
+    "FETCH_TIMEOUT_MIN": float(os.environ.get("MCP_NAV_FETCH_TIMEOUT_MIN", 1)),
+    "FETCH_TIMEOUT_FACTOR": float(os.environ.get("MCP_NAV_FETCH_TIMEOUT_FACTOR", 3)),
+    "LATENCY_WINDOW": int(os.environ.get("MCP_NAV_LATENCY_WINDOW", 200)),
+    "LATENCY_MIN_SAMPLES": int(os.environ.get("MCP_NAV_LATENCY_MIN_SAMPLES", 20)),
+    "HEDGE_REQUESTS": os.environ.get("MCP_NAV_HEDGE_REQUESTS", "1") == "1",
+    "BREAKER_FAILURES": int(os.environ.get("MCP_NAV_BREAKER_FAILURES", 5)),
+    "BREAKER_RESET_TIMEOUT": float(os.environ.get("MCP_NAV_BREAKER_RESET_TIMEOUT", 30)),
+    "HTTP2": os.environ.get("MCP_NAV_HTTP2", "1") == "1",
+    "MAX_BODY_BYTES": int(os.environ.get("MCP_NAV_MAX_BODY_BYTES", 10 * 1024 * 1024)),
+    "HTTP_TIMEOUT": float(os.environ.get("MCP_NAV_HTTP_TIMEOUT", 10)),
+    "CONNECT_TIMEOUT": float(os.environ.get("MCP_NAV_CONNECT_TIMEOUT", 5)),
+    "MAX_CONNECTIONS": int(os.environ.get("MCP_NAV_MAX_CONNECTIONS", 100)),
+    "MAX_CONNECTIONS_PER_HOST": int(os.environ.get("MCP_NAV_MAX_CONNECTIONS_PER_HOST", 10)),
+    "SEARCH_CONCURRENCY": int(os.environ.get("MCP_NAV_SEARCH_CONCURRENCY", 8)),
+    "SEARCH_PAGE_TIMEOUT": float(os.environ.get("MCP_NAV_SEARCH_PAGE_TIMEOUT", 15)),
+    "SEARCH_BACKEND": os.environ.get("MCP_NAV_SEARCH_BACKEND", "memory"),
+    "ES_INDEX": os.environ.get("MCP_NAV_ES_INDEX", "mcp-nav-pages"),
+    "ES_BATCH_SIZE": int(os.environ.get("MCP_NAV_ES_BATCH_SIZE", 100)),
+    "ES_FLUSH_INTERVAL": float(os.environ.get("MCP_NAV_ES_FLUSH_INTERVAL", 1.0)),
+    "ES_MAX_PENDING": int(os.environ.get("MCP_NAV_ES_MAX_PENDING", 1000)),
+    "VECTOR_SEARCH": os.environ.get("MCP_NAV_VECTOR_SEARCH", "0") == "1",
+    "VECTOR_MODEL": os.environ.get("MCP_NAV_VECTOR_MODEL", ""),
+    "VECTOR_DIR": os.environ.get("MCP_NAV_VECTOR_DIR", os.environ.get("MCP_NAV_STORE_DIR", "")),
+    "VECTOR_CHUNK_BYTES": int(os.environ.get("MCP_NAV_VECTOR_CHUNK_BYTES", 1024)),
+    "HYBRID_ALPHA": float(os.environ.get("MCP_NAV_HYBRID_ALPHA", 0.5)),
+    "RATE_LIMIT_REQUESTS": settings.RATE_LIMIT_REQUESTS,
+    "RATE_LIMIT_WINDOW": settings.RATE_LIMIT_WINDOW,
+    "RATE_LIMIT_REDIS": settings.RATE_LIMIT_REDIS,
+    "UPSTREAM_CONCURRENCY": int(os.environ.get("MCP_NAV_UPSTREAM_CONCURRENCY", 32)),
+    "UPSTREAM_QUEUE": int(os.environ.get("MCP_NAV_UPSTREAM_QUEUE", 256)),
 }
 
 # --- Configuración de logging ---
@@ -36,118 +120,906 @@ logging.basicConfig(
 )
 logger = logging.getLogger("mcp-nav")
 
-class Cache:
-    """Clase para manejar el caché de páginas."""
-    
-    def __init__(self, ttl: int = CONFIG["CACHE_TTL"]):
-        self.cache: Dict[str, Dict] = {}
-        self.ttl = ttl
+class ResponseTooLarge(Exception):
+    """El cuerpo de la respuesta supera MAX_BODY_BYTES; la descarga se aborta."""
+
+    def __init__(self, url: str, max_bytes: int) -> None:
+        super().__init__(f"La respuesta de {url} supera el tamaño máximo ({max_bytes} bytes)")
+        self.url = url
+        self.max_bytes = max_bytes
+
+
+class WebsiteNavigator:
+    """Clase para gestionar la navegación en el sitio web."""
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        shared: Optional[RedisPageCache] = None,
+        es: Optional[ElasticsearchIndex] = None,
+        vectors: Optional[VectorIndex] = None,
+    ) -> None:
+        """
+        Inicializar el navegador con un cliente HTTP asíncrono y estado.
+
+        Args:
+            transport: Transporte httpx alternativo (por ejemplo, para pruebas)
+            shared: Caché compartido de segundo nivel; si no se indica, se crea
+                uno en Redis cuando MCP_NAV_REDIS_CACHE=1
+            es: Índice de búsqueda en Elasticsearch; si no se indica, se crea
+                cuando MCP_NAV_SEARCH_BACKEND=elasticsearch
+            vectors: Índice vectorial para la búsqueda híbrida; si no se indica,
+                se crea cuando MCP_NAV_VECTOR_SEARCH=1
+        """
+        self.client = httpx.AsyncClient(
+            http2=CONFIG["HTTP2"],
+            transport=transport,
+            follow_redirects=True,
+            headers={"User-Agent": CONFIG["USER_AGENT"]},
+            timeout=httpx.Timeout(CONFIG["HTTP_TIMEOUT"], connect=CONFIG["CONNECT_TIMEOUT"]),
+            limits=httpx.Limits(
+                max_connections=CONFIG["MAX_CONNECTIONS"],
+                max_keepalive_connections=CONFIG["MAX_CONNECTIONS"],
+            ),
+        )
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        # Latencias recientes y circuit breaker de cada host del origen
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # Estado por defecto (uso fuera de una sesión MCP) y estados por sesión
+        self.state = NavigationState(CONFIG["BASE_URL"], CONFIG["SESSION_MAX_HISTORY"])
+        self.sessions = SessionRegistry(
+            CONFIG["BASE_URL"],
+            max_history=CONFIG["SESSION_MAX_HISTORY"],
+            idle_ttl=CONFIG["SESSION_IDLE_TTL"],
+            max_sessions=CONFIG["MAX_SESSIONS"],
+        )
+        self.cache = Cache(
+            ttl=CONFIG["CACHE_TTL"],
+            max_entries=CONFIG["CACHE_MAX_ENTRIES"],
+            max_bytes=CONFIG["CACHE_MAX_BYTES"],
+            stale_ttl=CONFIG["CACHE_STALE_TTL"],
+            # Los índices en memoria solo guardan páginas que están en el caché,
+            # así que CACHE_MAX_BYTES acota también su memoria
+            on_remove=self._unindex,
+        )
+        if shared is None and CONFIG["REDIS_CACHE"]:
+            shared = RedisPageCache.from_url(
+                settings.get_redis_url(),
+                ttl=CONFIG["CACHE_TTL"],
+                stale_ttl=CONFIG["CACHE_STALE_TTL"],
+                lock_ttl=CONFIG["REDIS_LOCK_TTL"],
+            )
+        self.shared = shared
+        if es is None and CONFIG["SEARCH_BACKEND"] == "elasticsearch":
+            es = ElasticsearchIndex.from_url(
+                settings.get_es_url(),
+                index=CONFIG["ES_INDEX"],
+                batch_size=CONFIG["ES_BATCH_SIZE"],
+                flush_interval=CONFIG["ES_FLUSH_INTERVAL"],
+                max_pending=CONFIG["ES_MAX_PENDING"],
+            )
+        self.es = es
+        if vectors is None and CONFIG["VECTOR_SEARCH"]:
+            vectors = VectorIndex(
+                make_embedder(CONFIG["VECTOR_MODEL"]),
+                path=CONFIG["VECTOR_DIR"] or None,
+                chunk_bytes=CONFIG["VECTOR_CHUNK_BYTES"],
+            )
+        self.vectors = vectors
+        if CONFIG["RATE_LIMIT_REDIS"]:
+            self.limiter = RateLimiter.from_url(
+                settings.get_redis_url(), CONFIG["RATE_LIMIT_REQUESTS"], CONFIG["RATE_LIMIT_WINDOW"]
+            )
+        else:
+            self.limiter = RateLimiter(CONFIG["RATE_LIMIT_REQUESTS"], CONFIG["RATE_LIMIT_WINDOW"])
+        self.upstream = UpstreamGate(CONFIG["UPSTREAM_CONCURRENCY"], CONFIG["UPSTREAM_QUEUE"])
+        self.store = PageStore(CONFIG["STORE_DIR"]) if CONFIG["STORE_DIR"] else None
+        # Con varios workers, solo el líder rastrea el sitio
+        self.leader = (
+            LeaderLock(os.path.join(CONFIG["STORE_DIR"], "leader.lock"))
+            if self.store is not None and CONFIG["WORKERS"] > 1 else None
+        )
+        self._parse_pool = (
+            ProcessPoolExecutor(CONFIG["PARSE_WORKERS"], mp_context=multiprocessing.get_context("spawn"))
+            if CONFIG["PARSE_WORKERS"] > 0 else None
+        )
+        self.crawler = SiteCrawler(
+            self,
+            CONFIG["BASE_URL"],
+            max_depth=CONFIG["CRAWL_MAX_DEPTH"],
+            max_pages=CONFIG["CRAWL_MAX_PAGES"],
+            concurrency=CONFIG["CRAWL_CONCURRENCY"],
+            delay=CONFIG["CRAWL_DELAY"],
+            user_agent=CONFIG["USER_AGENT"],
+        )
+        self.changes = ChangeDetector(
+            self,
+            CONFIG["SITEMAP_URL"] or urllib.parse.urljoin(CONFIG["BASE_URL"], "/sitemap.xml"),
+            concurrency=CONFIG["CRAWL_CONCURRENCY"],
+        )
+        self._tasks: List[asyncio.Task] = []
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._chunked: "OrderedDict[str, ChunkedContent]" = OrderedDict()
+        # Hash en el almacén de las páginas adoptadas de él, para reconocer simples renovaciones
+        self._store_hashes: Dict[str, str] = {}
+        self.index = SearchIndex()
     
-    def get(self, key: str) -> Optional[Dict]:
-        """Obtener un valor del caché si existe y no ha expirado."""
-        if key in self.cache:
-            entry = self.cache[key]
-            if datetime.now() - entry["timestamp"] < timedelta(seconds=self.ttl):
-                return entry["data"]
-            else:
-                del self.cache[key]
-        return None
+    async def _make_request(
+        self,
+        url: str,
+        retries: int = CONFIG["MAX_RETRIES"],
+        headers: Optional[Dict[str, str]] = None,
+        sink: Optional[Callable[[httpx.Response], Any]] = None,
+    ) -> Tuple[httpx.Response, Any]:
+        """
+        Hacer una petición HTTP con reintentos y backoff exponencial con jitter.
+        Una respuesta 304 (petición condicional) se devuelve sin tratarla como error.
+
+        Solo se reintentan los errores transitorios (timeouts, conexión, 5xx, 408
+        y 429); un 4xx se propaga al momento. Cada host tiene un circuit breaker:
+        con el circuito abierto se lanza CircuitOpen sin contactar con el origen.
+
+        El cuerpo se lee en streaming (ver `_read_body`): con `sink`, cada intento
+        crea su destino con `sink(response)` y le entrega los trozos a medida que
+        llegan; si no, se devuelven los bytes.
+
+        Returns:
+            Tupla (respuesta, cuerpo), con el cuerpo en bytes o el destino ya alimentado
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(CONFIG["MAX_CONNECTIONS_PER_HOST"])
+        latency = self._latencies.get(host)
+        if latency is None:
+            latency = self._latencies[host] = LatencyTracker(
+                window=CONFIG["LATENCY_WINDOW"],
+                min_samples=CONFIG["LATENCY_MIN_SAMPLES"],
+                factor=CONFIG["FETCH_TIMEOUT_FACTOR"],
+                min_timeout=CONFIG["FETCH_TIMEOUT_MIN"],
+                max_timeout=CONFIG["FETCH_TIMEOUT"],
+            )
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                host, CONFIG["BREAKER_FAILURES"], CONFIG["BREAKER_RESET_TIMEOUT"]
+            )
+        with tracer.start_as_current_span("http.get") as span:
+            span.set_attribute("http.url", url)
+            for attempt in range(retries):
+                try:
+                    breaker.check()
+                except CircuitOpen:
+                    metrics.CIRCUIT_REJECTED.inc()
+                    raise
+                try:
+                    response, body = await self._hedged_attempt(url, headers, sink, slots, latency)
+                    span.set_attribute("http.status_code", response.status_code)
+                    span.set_attribute("http.attempts", attempt + 1)
+                    if response.status_code == 304:
+                        breaker.record_success()
+                        return response, None
+                    response.raise_for_status()
+                    breaker.record_success()
+                    return response, body
+                except httpx.HTTPError as e:
+                    if not is_transient(e):
+                        # Un 4xx es una respuesta válida del origen: no se reintenta
+                        breaker.record_success()
+                        span.record_exception(e)
+                        raise
+                    breaker.record_failure()
+                    if attempt == retries - 1:
+                        span.record_exception(e)
+                        raise
+                    metrics.FETCH_RETRIES.inc()
+                    logger.warning(f"Error en intento {attempt + 1}/{retries}: {e}")
+                    delay = CONFIG["RETRY_DELAY"] * (2 ** attempt)
+                    await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
     
-    def set(self, key: str, value: Dict):
-        """Guardar un valor en el caché."""
-        self.cache[key] = {
-            "data": value,
-            "timestamp": datetime.now()
-        }
+    async def _hedged_attempt(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        sink: Optional[Callable[[httpx.Response], Any]],
+        slots: asyncio.Semaphore,
+        latency: LatencyTracker,
+    ) -> Tuple[httpx.Response, Any]:
+        """
+        Un intento de `_make_request` con un plazo derivado de las latencias del host.
+
+        El plazo y la espera para duplicar cuentan desde que la petición obtiene
+        turno (límite global y conexión del host), no mientras espera en la cola
+        local: esa espera no es latencia del origen. Si la respuesta tarda más
+        que el p95, se lanza una petición duplicada (con MCP_NAV_HEDGE_REQUESTS=1
+        y solo si hay turno libre) y se usa la primera que termine bien; la otra
+        se cancela. Superado el plazo se lanza httpx.TimeoutException.
+        """
+        timeout = latency.timeout()
+        hedge_delay = latency.hedge_delay() if CONFIG["HEDGE_REQUESTS"] else None
+        started = asyncio.Event()
+        tasks = {asyncio.ensure_future(self._attempt(url, headers, sink, slots, latency, started))}
+        error: Optional[BaseException] = None
+        try:
+            waiting = asyncio.ensure_future(started.wait())
+            try:
+                await asyncio.wait({*tasks, waiting}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiting.cancel()
+            deadline = time.monotonic() + timeout
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                if not done and not slots.locked() and not self.upstream.saturated:
+                    metrics.FETCH_HEDGED.inc()
+                    logger.info(f"Petición duplicada a {url} tras {hedge_delay * 1000:.0f} ms (p95)")
+                    tasks.add(asyncio.ensure_future(self._attempt(url, headers, sink, slots, latency)))
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    metrics.FETCH_TIMEOUTS.inc()
+                    raise httpx.TimeoutException(f"Sin respuesta de {url} en {timeout:.1f} s")
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
     
-    def clear(self):
-        """Limpiar el caché."""
-        self.cache.clear()
+    async def _attempt(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        sink: Optional[Callable[[httpx.Response], Any]],
+        slots: asyncio.Semaphore,
+        latency: LatencyTracker,
+        started: Optional[asyncio.Event] = None,
+    ) -> Tuple[httpx.Response, Any]:
+        """Una petición al origen, con su cuerpo leído; anota su latencia (sin la espera de turno).
 
-class WebsiteNavigator:
-    """Clase para gestionar la navegación en el sitio web."""
+        `started` se activa al obtener turno, justo antes de contactar con el origen.
+        """
+        async with self.upstream, slots:
+            if started is not None:
+                started.set()
+            started_at = time.perf_counter()
+            try:
+                async with self.client.stream("GET", url, headers=headers) as response:
+                    body = await self._read_body(response, sink) if response.is_success else None
+            except httpx.HTTPError:
+                metrics.FETCH_SECONDS.labels("error").observe(time.perf_counter() - started_at)
+                raise
+        elapsed = time.perf_counter() - started_at
+        metrics.FETCH_SECONDS.labels(str(response.status_code)).observe(elapsed)
+        latency.observe(elapsed)
+        return response, body
+    
+    async def _read_body(
+        self,
+        response: httpx.Response,
+        sink: Optional[Callable[[httpx.Response], Any]] = None,
+    ) -> Any:
+        """
+        Leer el cuerpo de una respuesta por trozos, como mucho MAX_BODY_BYTES
+        (ya descomprimidos); si la respuesta los supera se aborta con ResponseTooLarge.
+        """
+        max_bytes = CONFIG["MAX_BODY_BYTES"]
+        length = response.headers.get("content-length", "")
+        if max_bytes and length.isdigit() and int(length) > max_bytes:
+            raise ResponseTooLarge(str(response.url), max_bytes)
+        target = sink(response) if sink is not None else None
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            metrics.FETCH_BYTES.inc(len(chunk))
+            if max_bytes and size > max_bytes:
+                raise ResponseTooLarge(str(response.url), max_bytes)
+            if target is not None:
+                target.feed(chunk)
+            else:
+                chunks.append(chunk)
+        return target if target is not None else b"".join(chunks)
+    
+    async def start(self) -> None:
+        """
+        Precalentar el caché desde el almacén en disco y lanzar las tareas en
+        segundo plano (expiración del caché, rastreo del sitio y comprobación
+        de cambios en sitemap.xml).
 
-    def __init__(self) -> None:
-        """Inicializar el navegador con una sesión y estado."""
-        self.session = requests.Session()
-        self.current_url = CONFIG["BASE_URL"]
-        self.history = [CONFIG["BASE_URL"]]
-        self.cache = Cache()
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = False
-    
-    def _make_request(self, url: str, retries: int = CONFIG["MAX_RETRIES"]) -> requests.Response:
-        """Hacer una petición HTTP con reintentos."""
-        for attempt in range(retries):
+        Con varios workers (MCP_NAV_WORKERS > 1) cada uno incorpora
+        periódicamente las páginas que los demás guardan en el almacén, y solo
+        el worker elegido como líder rastrea el sitio y comprueba el sitemap.
+        """
+        self.warm_from_store()
+        self._tasks.append(asyncio.create_task(
+            self.cache.expire_periodically(CONFIG["CACHE_EXPIRY_INTERVAL"])
+        ))
+        if self.leader is not None:
+            self._tasks.append(asyncio.create_task(self.follow_store(CONFIG["STORE_SYNC_INTERVAL"])))
+        if CONFIG["CRAWL_ON_STARTUP"] or CONFIG["CRAWL_INTERVAL"] > 0:
+            def crawl():
+                return self.crawler.run_periodically(CONFIG["CRAWL_INTERVAL"], run_now=CONFIG["CRAWL_ON_STARTUP"])
+            self._tasks.append(asyncio.create_task(self._lead(crawl) if self.leader is not None else crawl()))
+        if CONFIG["CHANGE_CHECK_INTERVAL"] > 0:
+            def check():
+                return self.changes.run_periodically(CONFIG["CHANGE_CHECK_INTERVAL"])
+            self._tasks.append(asyncio.create_task(self._lead(check) if self.leader is not None else check()))
+    
+    async def _lead(self, run: Callable[[], Any]) -> None:
+        """Ejecutar `run()` solo en el worker líder; los demás reintentan por si el líder cae."""
+        while not self.leader.try_acquire():
+            await asyncio.sleep(CONFIG["LEADER_RETRY_INTERVAL"])
+        await run()
+    
+    async def follow_store(self, interval: float) -> None:
+        """Incorporar cada `interval` segundos las páginas que otros workers guardan en el almacén."""
+        while True:
+            await asyncio.sleep(interval)
             try:
-                response = self.session.get(url)
-                response.raise_for_status()
-                return response
-            except requests.RequestException as e:
-                if attempt == retries - 1:
-                    raise
-                logger.warning(f"Error en intento {attempt + 1}/{retries}: {e}")
-                time.sleep(CONFIG["RETRY_DELAY"] * (2 ** attempt))
+                self.sync_from_store()
+            except Exception as e:
+                logger.error(f"Error al sincronizar con el almacén: {e}")
+    
+    async def aclose(self) -> None:
+        """Detener las tareas en segundo plano y cerrar el pool de conexiones HTTP."""
+        for task in [*self._tasks, *self._refreshing.values()]:
+            task.cancel()
+        self._tasks.clear()
+        self._refreshing.clear()
+        await self.client.aclose()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+        if self.store is not None:
+            self.store.close()
+        if self.shared is not None:
+            await self.shared.aclose()
+        if self.es is not None:
+            await self.es.aclose()
+        await self.limiter.aclose()
+        self.checkpoint()
+        if self.leader is not None:
+            self.leader.release()
+    
+    def checkpoint(self) -> None:
+        """
+        Guardar en disco el índice vectorial si cambió. Con varios workers solo
+        lo guarda el líder, que es quien rastrea el sitio.
+        """
+        if self.leader is not None and not self.leader.is_leader:
+            return
+        if self.vectors is not None:
+            self.vectors.save()
     
-    def get_page_content(self, url: str) -> dict:
-        """Obtener y analizar el contenido de una página."""
+    def resolve_url(self, url: str) -> str:
+        """
+        Convertir una URL relativa en absoluta respecto a BASE_URL y normalizarla
+        (esquema y host en minúsculas, sin fragmento y la raíz sin barra final,
+        como BASE_URL), para usarla como clave.
+        """
         full_url = url if url.startswith("http") else urllib.parse.urljoin(CONFIG["BASE_URL"], url)
+        parts = urllib.parse.urlsplit(full_url)
+        path = "" if parts.path == "/" else parts.path
+        return urllib.parse.urlunsplit(
+            (parts.scheme.lower(), parts.netloc.lower(), path, parts.query, "")
+        )
+    
+    @property
+    def current_url(self) -> str:
+        """URL actual del estado de navegación por defecto."""
+        return self.state.current_url
+    
+    @property
+    def history(self) -> List[str]:
+        """Historial del estado de navegación por defecto."""
+        return self.state.history
+    
+    async def get_page_content(self, url: str, state: Optional[NavigationState] = None) -> dict:
+        """
+        Navegar a una página: obtener su contenido y actualizar la URL actual e historial.
+
+        Args:
+            url: URL absoluta o relativa a BASE_URL
+            state: Estado de navegación de la sesión (por defecto, el del navegador)
+        """
+        result = await self.fetch_page(url)
+        if "error" not in result:
+            (state or self.state).visit(result["url"])
+        return result
+    
+    def chunked(self, page: dict) -> ChunkedContent:
+        """
+        Contenido de una página dividido en fragmentos de CONTENT_CHUNK_BYTES,
+        con su índice de secciones.
+
+        La división se calcula una vez por versión del contenido y se reutiliza
+        en las peticiones siguientes (hasta CACHE_MAX_ENTRIES páginas).
+        """
+        url = page["url"]
+        chunked = self._chunked.get(url)
+        if chunked is not None and chunked.content == page["content"]:
+            # Compartir el texto de la entrada actual del caché en vez de retener otra copia
+            chunked.content = page["content"]
+            self._chunked.move_to_end(url)
+            return chunked
+        chunked = self._chunked[url] = ChunkedContent(
+            page["content"], CONFIG["CONTENT_CHUNK_BYTES"], anchors=page.get("anchors")
+        )
+        self._chunked.move_to_end(url)
+        while len(self._chunked) > CONFIG["CACHE_MAX_ENTRIES"]:
+            self._chunked.popitem(last=False)
+        return chunked
+    
+    async def fetch_page(self, url: str, revalidate: bool = False) -> dict:
+        """
+        Obtener y analizar el contenido de una página sin modificar el estado de navegación.
+
+        Las entradas caducadas se revalidan con una petición condicional; en modo
+        stale-while-revalidate se sirven de inmediato y se refrescan en segundo plano.
+        Si el origen falla (o su circuito está abierto) se sirve la entrada
+        caducada, si la hay; sin ella, un circuito abierto falla al instante.
+
+        Args:
+            url: URL (absoluta o relativa al sitio) de la página
+            revalidate: Revalidar con el origen aunque la entrada siga vigente
+                (p. ej. porque el sitemap indica que la página cambió)
+        """
+        full_url = self.resolve_url(url)
         
         # Intentar obtener del caché primero
-        cached_content = self.cache.get(full_url)
-        if cached_content:
-            logger.info(f"Contenido obtenido del caché para {full_url}")
-            return cached_content
+        entry = self.cache.get_entry(full_url)
+        if entry is not None and not revalidate:
+            if entry["fresh"]:
+                logger.info(f"Contenido obtenido del caché para {full_url}")
+                return entry["data"]
+            if CONFIG["STALE_WHILE_REVALIDATE"]:
+                logger.info(f"Sirviendo contenido obsoleto de {full_url} mientras se revalida")
+                self._schedule_refresh(full_url)
+                return entry["data"]
         
         try:
-            logger.info(f"Obteniendo contenido de {full_url}")
-            response = self._make_request(full_url)
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Extraer contenido principal
-            content = soup.find("main") or soup.find("article") or soup.find("div", class_="content") or soup.find("body")
-            
-            # Convertir HTML a Markdown
-            markdown_content = self.html_converter.handle(str(content)) if content else ""
-            
-            # Extraer enlaces de la página
-            links = []
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                # Solo incluir enlaces al mismo dominio
-                if href.startswith("/") or href.startswith(CONFIG["BASE_URL"]):
-                    links.append({
-                        "text": a.get_text().strip(),
-                        "url": href
-                    })
-            
-            # Actualizar URL actual e historial
-            self.current_url = full_url
-            if full_url not in self.history:
-                self.history.append(full_url)
-            
-            # Preparar respuesta
-            result = {
-                "url": full_url,
-                "title": soup.title.string if soup.title else "Sin título",
-                "content": markdown_content,
-                "links": links[:20],  # Limitar a los primeros 20 enlaces
-            }
-            
-            # Opcionalmente incluir HTML original
-            if CONFIG["KEEP_HTML"] and content:
-                result["html"] = str(content)
-            
-            # Guardar en caché
-            self.cache.set(full_url, result)
-            
-            return result
-            
+            return await self._load_coalesced(full_url, entry)
+        except (CircuitOpen, httpx.HTTPError) as e:
+            if entry is not None and (isinstance(e, CircuitOpen) or is_transient(e)):
+                # Con el origen caído, mejor una copia obsoleta que un error
+                logger.warning(f"Sirviendo contenido obsoleto de {full_url}: {e}")
+                metrics.STALE_SERVED.inc()
+                return entry["data"]
+            if isinstance(e, CircuitOpen):
+                logger.warning(f"Petición a {full_url} rechazada: {e}")
+                return {"error": str(e), "url": full_url, "status": 503}
+            logger.error(f"Error al obtener {full_url}: {e}")
+            if isinstance(e, httpx.HTTPStatusError):
+                return {"error": str(e), "url": full_url, "status": e.response.status_code}
+            return {"error": str(e), "url": full_url}
+        except UpstreamOverloaded as e:
+            logger.warning(f"Petición a {full_url} rechazada: {e}")
+            return {"error": str(e), "url": full_url, "status": 503}
         except Exception as e:
             logger.error(f"Error al obtener {full_url}: {e}")
             return {"error": str(e), "url": full_url}
+    
+    async def _load_coalesced(self, full_url: str, entry: Optional[Dict] = None) -> dict:
+        """
+        Cargar una página compartiendo una única descarga entre llamadas concurrentes.
+
+        Quien llega mientras la URL ya se está cargando espera el mismo resultado;
+        los errores se propagan a todos y no quedan en caché. Cancelar a un
+        llamador no cancela la carga compartida.
+        """
+        future = self._inflight.get(full_url)
+        if future is None:
+            future = asyncio.ensure_future(self._load_page(full_url, entry))
+            self._inflight[full_url] = future
+            
+            def done(finished: asyncio.Future) -> None:
+                self._inflight.pop(full_url, None)
+                if not finished.cancelled():
+                    finished.exception()  # evitar avisos si ningún llamador la espera ya
+            
+            future.add_done_callback(done)
+        return await asyncio.shield(future)
+    
+    def _schedule_refresh(self, full_url: str) -> None:
+        """Lanzar (una sola vez por URL) la revalidación en segundo plano de una entrada."""
+        if full_url in self._refreshing:
+            return
+        
+        async def refresh() -> None:
+            try:
+                await self._load_coalesced(full_url, self.cache.get_entry(full_url))
+            except Exception as e:
+                logger.warning(f"Error al revalidar {full_url}: {e}")
+            finally:
+                self._refreshing.pop(full_url, None)
+        
+        self._refreshing[full_url] = asyncio.create_task(refresh())
+    
+    def warm_from_store(self) -> int:
+        """
+        Cargar en el caché y el índice las páginas del almacén en disco.
+        Las que ya superaron el TTL entran como obsoletas y se revalidan al pedirlas.
+        """
+        if self.store is None:
+            return 0
+        started = time.perf_counter()
+        for full_url, stored in self.store.items():
+            stored["age"] = min(stored["age"], self.cache.ttl)
+            self._store_hashes[full_url] = stored["hash"]
+            self._adopt_entry(full_url, stored)
+        logger.info(
+            f"Caché precalentado con {len(self.store)} páginas del almacén en disco "
+            f"en {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return len(self.store)
+    
+    def sync_from_store(self) -> int:
+        """
+        Copiar al caché local e índice las páginas que otros procesos guardaron
+        (o revalidaron) en el almacén desde la última sincronización, y
+        eliminar las que borraron.
+        """
+        if self.store is None:
+            return 0
+        adopted = 0
+        for full_url in self.store.refresh():
+            info = self.store.info(full_url)
+            if info is None:
+                self._drop_local(full_url)
+                continue
+            age = min(info["age"], self.cache.ttl)
+            if info["hash"] == self._store_hashes.get(full_url) and self.cache.touch(full_url, age=age):
+                # Mismo contenido, solo renovado (sitemap o 304): sin leerlo ni reindexarlo
+                continue
+            stored = self.store.get(full_url)
+            stored["age"] = age
+            self._store_hashes[full_url] = stored["hash"]
+            self._adopt_entry(full_url, stored)
+            adopted += 1
+        return adopted
+    
+    async def _load_page(self, full_url: str, entry: Optional[Dict] = None) -> dict:
+        """
+        Obtener una página que no está (o ya no es válida) en el caché local.
+
+        Antes de descargarla se consulta el almacén en disco y, con caché
+        compartido, Redis; solo la réplica que consigue el lock de la URL la
+        descarga y las demás esperan su resultado.
+        """
+        if entry is None and self.store is not None:
+            stored = self.store.get(full_url)
+            if stored is not None:
+                if stored["age"] < self.cache.ttl:
+                    logger.info(f"Contenido obtenido del almacén en disco para {full_url}")
+                    return self._adopt_entry(full_url, stored)
+                # Los validadores guardados permiten una petición condicional
+                entry = stored
+        
+        if self.shared is None:
+            result, _ = await self._download_page(full_url, entry)
+            return result
+        
+        remote = await self.shared.get(full_url)
+        # Si la copia local sigue vigente es una revalidación forzada (la página
+        # cambió): la copia compartida, igual de vigente, puede ser tan antigua como ella
+        if remote is not None and remote["fresh"] and not (entry is not None and entry.get("fresh")):
+            logger.info(f"Contenido obtenido del caché compartido para {full_url}")
+            return self._adopt_entry(full_url, remote)
+        # Los validadores de otra réplica también permiten una petición condicional
+        entry = entry or remote
+        
+        token = await self.shared.acquire(full_url)
+        if token is None:
+            remote = await self.shared.wait_for(full_url, CONFIG["REDIS_LOCK_WAIT"])
+            if remote is not None:
+                logger.info(f"Contenido obtenido del caché compartido para {full_url}")
+                return self._adopt_entry(full_url, remote)
+            result, _ = await self._download_page(full_url, entry)
+            return result
+        
+        try:
+            result, validators = await self._download_page(full_url, entry)
+            await self.shared.set(full_url, result, validators)
+        finally:
+            await self.shared.release(full_url, token)
+        return result
+    
+    def _adopt_entry(self, full_url: str, entry: Dict) -> dict:
+        """Copiar al caché local e índice una entrada del caché compartido o del almacén."""
+        self.cache.set(full_url, entry["data"], entry["validators"], age=entry["age"])
+        self._index_page(full_url, entry["data"])
+        return entry["data"]
+    
+    def _index_page(self, full_url: str, page: Dict) -> None:
+        """
+        Actualizar el índice BM25 y, si está activo, el vectorial con una página.
+        Las páginas que no caben en el caché no se indexan.
+        """
+        if full_url not in self.cache:
+            return
+        self.index.add(full_url, page["title"], page["content"])
+        if self.vectors is not None:
+            self.vectors.add(full_url, page["title"], page["content"])
+    
+    def _unindex(self, full_url: str) -> None:
+        """Retirar de los índices en memoria una página que sale del caché."""
+        self._chunked.pop(full_url, None)
+        self._store_hashes.pop(full_url, None)
+        self.index.remove(full_url)
+        if self.vectors is not None:
+            self.vectors.remove(full_url)
+    
+    async def clear(self) -> None:
+        """
+        Vaciar todos los niveles de caché (memoria, almacén en disco y Redis) y
+        los índices de búsqueda, de modo que la siguiente petición vaya al origen.
+        """
+        self.cache.clear()
+        self._chunked.clear()
+        if self.store is not None:
+            self.store.clear()
+        if self.shared is not None:
+            await self.shared.clear()
+        if self.es is not None:
+            await self.es.clear()
+    
+    async def renew(self, full_url: str) -> None:
+        """
+        Renovar la vigencia de una página que no cambió en el caché local, el
+        almacén (los demás workers la recogen al sincronizarse) y el compartido.
+        """
+        self.cache.touch(full_url)
+        if self.store is not None:
+            self.store.touch(full_url)
+        if self.shared is not None:
+            await self.shared.touch(full_url)
+    
+    async def forget(self, full_url: str) -> None:
+        """Eliminar de cachés, almacén e índices una página que ya no existe en el sitio."""
+        self._drop_local(full_url)
+        if self.store is not None:
+            self.store.delete(full_url)
+        if self.shared is not None:
+            await self.shared.delete(full_url)
+        if self.es is not None:
+            await self.es.remove(full_url)
+    
+    def _drop_local(self, full_url: str) -> None:
+        """Eliminar una página del caché en memoria y de los índices de este proceso."""
+        if not self.cache.remove(full_url):
+            self._unindex(full_url)
+    
+    async def _prefetch_shared(self, urls: Iterable[str]) -> None:
+        """Traer del caché compartido, en un solo MGET, las páginas ausentes del caché local."""
+        missing = [url for url in dict.fromkeys(map(self.resolve_url, urls)) if url not in self.cache]
+        for full_url, remote in (await self.shared.get_many(missing)).items():
+            if remote["fresh"]:
+                self._adopt_entry(full_url, remote)
+    
+    async def _download_page(self, full_url: str, entry: Optional[Dict] = None) -> tuple:
+        """
+        Descargar una página y guardarla en caché e índice.
+        Si hay una entrada previa con validadores, la petición es condicional y
+        un 304 solo renueva su TTL, sin volver a analizar el HTML.
+
+        Returns:
+            Tupla (resultado, validadores HTTP)
+        """
+        headers = {}
+        if entry is not None:
+            validators = entry["validators"]
+            if "etag" in validators:
+                headers["If-None-Match"] = validators["etag"]
+            if "last-modified" in validators:
+                headers["If-Modified-Since"] = validators["last-modified"]
+        
+        logger.info(f"Obteniendo contenido de {full_url}")
+        sink = None
+        if self._parse_pool is None:
+            # Sin pool de procesos, el HTML se analiza a medida que se descarga
+            sink = lambda response: StreamingParser(
+                full_url, CONFIG["BASE_URL"], response.encoding, CONFIG["KEEP_HTML"], CONFIG["PARSER"]
+            )
+        response, body = await self._make_request(full_url, headers=headers or None, sink=sink)
+        if response.status_code == 304 and entry is not None:
+            logger.info(f"Contenido sin cambios (304) para {full_url}")
+            metrics.PAGES_UNCHANGED.labels("304").inc()
+            result = entry["data"]
+            if not self.cache.touch(full_url):
+                self.cache.set(full_url, result, entry["validators"])
+            if full_url not in self.index:
+                self._index_page(full_url, result)
+            if self.store is not None and not self.store.touch(full_url):
+                self.store.put(full_url, result, entry["validators"])
+            return result, entry["validators"]
+        
+        result = await self._parse_page(full_url, body, response.encoding)
+        validators = {
+            name: response.headers[name]
+            for name in ("etag", "last-modified")
+            if name in response.headers
+        }
+        
+        if entry is not None and page_fingerprint(result) == page_fingerprint(entry["data"]):
+            # Sin validadores (o con validadores que cambian siempre) el hash del
+            # contenido evita reindexar una página que no cambió
+            logger.info(f"Contenido sin cambios (hash) para {full_url}")
+            metrics.PAGES_UNCHANGED.labels("hash").inc()
+            result = entry["data"]
+            self.cache.set(full_url, result, validators)
+            if full_url not in self.index:
+                self._index_page(full_url, result)
+            if self.store is not None:
+                self.store.put(full_url, result, validators)
+            return result, validators
+        
+        # Guardar en caché (y en disco) y actualizar el índice de búsqueda
+        self.cache.set(full_url, result, validators)
+        self._index_page(full_url, result)
+        if self.store is not None:
+            self.store.put(full_url, result, validators)
+        if self.es is not None:
+            await self.es.add(result)
+        return result, validators
+    
+    async def _parse_page(
+        self,
+        full_url: str,
+        body: Union[bytes, StreamingParser],
+        encoding: Optional[str] = None,
+    ) -> dict:
+        """
+        Analizar el HTML de una página: título, contenido en Markdown y enlaces.
+        `body` son los bytes de la página o un StreamingParser que ya los recibió.
+        Con MCP_NAV_PARSE_WORKERS > 0 se hace en un pool de procesos, fuera del event loop.
+        """
+        args = (body, encoding, full_url, CONFIG["BASE_URL"], CONFIG["KEEP_HTML"], CONFIG["PARSER"])
+        with tracer.start_as_current_span("page.parse") as span:
+            span.set_attribute("parser", CONFIG["PARSER"])
+            if isinstance(body, StreamingParser):
+                span.set_attribute("page.bytes", body.size)
+                result, timings = body.close()
+            elif self._parse_pool is None:
+                span.set_attribute("page.bytes", len(body))
+                result, timings = parse_page_timed(*args)
+            else:
+                span.set_attribute("page.bytes", len(body))
+                loop = asyncio.get_running_loop()
+                result, timings = await loop.run_in_executor(self._parse_pool, parse_page_timed, *args)
+        metrics.PARSE_SECONDS.labels(CONFIG["PARSER"]).observe(timings["parse"])
+        metrics.CONVERT_SECONDS.labels(CONFIG["PARSER"]).observe(timings["convert"])
+        return result
+    
+    async def fetch_many(
+        self,
+        urls: Iterable[str],
+        concurrency: int = CONFIG["SEARCH_CONCURRENCY"],
+        timeout: float = CONFIG["SEARCH_PAGE_TIMEOUT"],
+    ) -> AsyncIterator[dict]:
+        """
+        Obtener varias páginas en paralelo y devolverlas a medida que terminan.
+
+        Args:
+            urls: URLs a obtener
+            concurrency: Número máximo de páginas obtenidas a la vez
+            timeout: Plazo máximo (segundos) para cada página
+
+        Yields:
+            El resultado de cada página; las que superan el plazo devuelven un error
+        """
+        urls = list(urls)
+        if self.shared is not None:
+            await self._prefetch_shared(urls)
+        slots = asyncio.Semaphore(concurrency)
+        tasks = [asyncio.ensure_future(self._fetch_bounded(url, slots, timeout)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def fetch_all(
+        self,
+        urls: Iterable[str],
+        concurrency: int = CONFIG["SEARCH_CONCURRENCY"],
+        timeout: float = CONFIG["SEARCH_PAGE_TIMEOUT"],
+    ) -> List[dict]:
+        """
+        Obtener varias páginas en paralelo y devolverlas en el orden pedido.
+        Como `fetch_many`, no modifica el estado de navegación; cada página que
+        falla devuelve su propio error sin afectar a las demás.
+        """
+        urls = list(urls)
+        if self.shared is not None:
+            await self._prefetch_shared(urls)
+        slots = asyncio.Semaphore(concurrency)
+        return list(await asyncio.gather(*(self._fetch_bounded(url, slots, timeout) for url in urls)))
+    
+    async def _fetch_bounded(self, url: str, slots: asyncio.Semaphore, timeout: float) -> dict:
+        """Obtener una página ocupando uno de `slots`, con un plazo máximo."""
+        async with slots:
+            try:
+                return await asyncio.wait_for(self.fetch_page(url), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Tiempo agotado al obtener {url}")
+                return {"error": "timeout", "url": self.resolve_url(url)}
+    
+    async def index_site(self) -> int:
+        """
+        Asegurar que la página de inicio y sus enlaces están indexados.
+        Solo descarga (en paralelo) las páginas que aún no forman parte del índice.
+        """
+        home_content = await self.fetch_page(CONFIG["BASE_URL"])
+        home_links = home_content.get("links", [])[:CONFIG["MAX_LINKS"]]
+        links = dict.fromkeys(self.resolve_url(link["url"]) for link in home_links)
+        pending = [url for url in links if url not in self.index]
+        async for _ in self.fetch_many(pending):
+            pass
+        return len(pending)
+    
+    async def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Buscar en el índice de Elasticsearch compartido si está configurado
+        (MCP_NAV_SEARCH_BACKEND=elasticsearch) y, si no o si falla, en el índice en memoria.
+        Con el índice vectorial activo, el ranking en memoria es híbrido: BM25
+        normalizado más la similitud coseno del mejor fragmento de cada página.
+        """
+        if self.es is not None:
+            results = await self.es.search(query, limit)
+            if results is not None:
+                return results
+        if self.vectors is None or not len(self.vectors):
+            return self.index.search(query, limit=limit)
+        with tracer.start_as_current_span("search.hybrid") as span:
+            lexical = self.index.score(tokenize(query))
+            semantic = self.vectors.url_scores(query, limit=limit * 5)
+            scores = hybrid_scores(lexical, semantic, CONFIG["HYBRID_ALPHA"])
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            span.set_attribute("search.matches", len(scores))
+        return [
+            self.index.hit(url, query, score) if url in self.index else self.vectors.hit(url, query, score)
+            for url, score in ranked
+            if score > 0
+        ]
+    
+    async def iter_search(self, query: str) -> AsyncIterator[dict]:
+        """
+        Buscar de forma incremental: primero las páginas ya indexadas y después
+        cada página de la portada en cuanto termina de obtenerse e indexarse.
+
+        Yields:
+            Resultados (title, url, relevance, snippet) en orden de descubrimiento
+        """
+        sent = set()
+        for hit in self.index.search(query, limit=None):
+            sent.add(hit["url"])
+            yield hit
+        
+        home_content = await self.fetch_page(CONFIG["BASE_URL"])
+        candidates = [home_content] if "error" not in home_content else []
+        home_links = home_content.get("links", [])[:CONFIG["MAX_LINKS"]]
+        links = dict.fromkeys(self.resolve_url(link["url"]) for link in home_links)
+        pending = [url for url in links if url not in self.index]
+        
+        async def fetched() -> AsyncIterator[dict]:
+            for page in candidates:
+                yield page
+            async for page in self.fetch_many(pending):
+                yield page
+        
+        async for page in fetched():
+            if "error" in page or page["url"] in sent:
+                continue
+            hit = self.index.match(page["url"], query)
+            if hit is not None:
+                sent.add(hit["url"])
+                yield hit
 
 # --- Crear el servidor MCP ---
 mcp = FastMCP(
@@ -155,87 +1027,386 @@ mcp = FastMCP(
     description="Navegador para modelcontextprotocol.io con caché y conversión markdown"
 )
 
-# Instanciar el navegador
-navigator = WebsiteNavigator()
+# El navegador se crea al primer uso (normalmente en create_app): importar el
+# paquete, como hacen los procesos del pool de análisis, no abre el almacén ni
+# crea clientes de Redis, Elasticsearch o del modelo de embeddings
+navigator: Optional[WebsiteNavigator] = None
+
+def get_navigator() -> WebsiteNavigator:
+    """Navegador global del servidor, creado al primer uso."""
+    global navigator
+    if navigator is None:
+        navigator = WebsiteNavigator()
+    return navigator
+
+metrics.register_cache(lambda: get_navigator().cache.stats())
+
+def _session_key() -> Optional[str]:
+    """Identificador de la sesión MCP que hace la petición actual (None fuera de una petición)."""
+    try:
+        session = mcp.get_context().session
+    except ValueError:
+        return None
+    key = getattr(session, "_mcp_nav_session_id", None)
+    if key is None:
+        key = session._mcp_nav_session_id = uuid.uuid4().hex
+    return key
+
+def _session_state() -> NavigationState:
+    """Estado de navegación de la sesión MCP que hace la petición actual."""
+    key = _session_key()
+    if key is None:
+        return get_navigator().state
+    return get_navigator().sessions.get(key)
+
+def admitted(fn):
+    """
+    Aplicar el rate limit por sesión (RATE_LIMIT_REQUESTS por RATE_LIMIT_WINDOW)
+    a una tool: sin token disponible se responde al momento con un error 429.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        decision = await get_navigator().limiter.acquire(_session_key() or "local")
+        if not decision.allowed:
+            metrics.ADMISSION_REJECTED.labels("client").inc()
+            return {
+                "error": "Demasiadas peticiones; reintenta más tarde",
+                "status": 429,
+                "retry_after": round(decision.retry_after, 3),
+            }
+        return await fn(*args, **kwargs)
+    return wrapper
+
+def _paginate_links(links: List[dict], offset: int = 0, limit: Optional[int] = None) -> dict:
+    """Seleccionar una página de enlaces (por defecto y como mucho, MAX_LINKS)."""
+    limit = CONFIG["MAX_LINKS"] if limit is None else min(max(0, limit), CONFIG["MAX_LINKS"])
+    offset = max(0, offset)
+    end = offset + limit
+    return {
+        "links": links[offset:end],
+        "links_total": len(links),
+        "next_links_offset": end if end < len(links) else None,
+    }
+
+def _content_limit(limit: Optional[int]) -> int:
+    """Bytes de contenido de una respuesta: los pedidos, como mucho CONTENT_CHUNK_BYTES."""
+    if not limit or limit < 0:
+        return CONFIG["CONTENT_CHUNK_BYTES"]
+    return min(limit, CONFIG["CONTENT_CHUNK_BYTES"])
+
+def _page_view(
+    page: dict,
+    chunk: int = 0,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    links_offset: int = 0,
+    links_limit: Optional[int] = None,
+) -> dict:
+    """
+    Respuesta acotada de una página: un fragmento del contenido (por número de
+    fragmento o por rango de bytes), el índice de encabezados con sus desplazamientos
+    y una página de enlaces.
+    """
+    if "error" in page:
+        return page
+    chunked = get_navigator().chunked(page)
+    if offset is not None:
+        part = chunked.read(offset, _content_limit(limit))
+        chunk_id = None
+        next_offset = part["end"] if part["end"] < chunked.total_bytes else None
+    else:
+        part = chunked.chunk(chunk)
+        if part is None:
+            return {"error": f"Fragmento {chunk} fuera de rango (0-{len(chunked) - 1})", "url": page["url"]}
+        chunk_id = chunk
+        next_offset = part["end"] if chunk + 1 < len(chunked) else None
+    return {
+        "url": page["url"],
+        "title": page["title"],
+        "content": part["content"],
+        "range": {"start": part["start"], "end": part["end"], "total_bytes": chunked.total_bytes},
+        "chunk": chunk_id,
+        "chunks": len(chunked),
+        "next_chunk": chunk_id + 1 if chunk_id is not None and chunk_id + 1 < len(chunked) else None,
+        "next_offset": next_offset,
+        "outline": chunked.outline,
+        **_paginate_links(page.get("links", []), links_offset, links_limit),
+    }
+
+def _section_view(page: dict, section: str, limit: Optional[int] = None) -> Optional[dict]:
+    """
+    Respuesta con solo una sección de la página (por ancla o título): su
+    contenido hasta `limit` bytes y sus subencabezados. None si la página no
+    tiene esa sección.
+    """
+    chunked = get_navigator().chunked(page)
+    part = chunked.section(section, _content_limit(limit))
+    if part is None:
+        return None
+    heading = part["heading"]
+    return {
+        "url": page["url"],
+        "title": page["title"],
+        "section": {"anchor": heading["anchor"], "title": heading["title"], "level": heading["level"]},
+        "content": part["content"],
+        "range": {"start": part["start"], "end": part["end"], "total_bytes": chunked.total_bytes},
+        "next_offset": part["end"] if part["end"] < heading["end"] else None,
+        "outline": part["outline"],
+    }
+
+def _batch_item(page: dict, mode: str, max_bytes: int, links_limit: int) -> dict:
+    """
+    Resumen de una página para `navigate_many`: solo el título (`titles`), el
+    índice de encabezados (`outline`) o además el comienzo del contenido (`content`).
+    """
+    if "error" in page:
+        return page
+    chunked = get_navigator().chunked(page)
+    item = {"url": page["url"], "title": page["title"], "total_bytes": chunked.total_bytes}
+    if mode != "titles":
+        item["outline"] = chunked.outline
+    if mode == "content":
+        part = chunked.read(0, max_bytes)
+        item["content"] = part["content"]
+        item["truncated"] = part["end"] < chunked.total_bytes
+        item["next_offset"] = part["end"] if item["truncated"] else None
+    if links_limit > 0:
+        item.update(_paginate_links(page.get("links", []), 0, links_limit))
+    return item
 
 # --- Definición de herramientas ---
 @mcp.tool()
-def navigate(url: str) -> dict:
-    """Navegar a una URL específica en modelcontextprotocol.io."""
-    return navigator.get_page_content(url)
+@observe_tool
+@admitted
+async def navigate(
+    url: str,
+    chunk: int = 0,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    links_offset: int = 0,
+    links_limit: Optional[int] = None,
+) -> dict:
+    """
+    Navegar a una URL específica en modelcontextprotocol.io.
+    El contenido se devuelve por fragmentos de tamaño acotado junto con el índice de
+    encabezados (con desplazamientos en bytes): usa `chunk` (o `offset`/`limit` en bytes)
+    para leer el resto, y `links_offset`/`links_limit` para paginar los enlaces.
+    Si la URL lleva `#fragmento` y existe esa sección, se devuelve solo ella.
+    """
+    page = await get_navigator().get_page_content(url, _session_state())
+    fragment = urllib.parse.urlsplit(url).fragment
+    if fragment and "error" not in page and chunk == 0 and offset is None:
+        view = _section_view(page, fragment, limit)
+        if view is not None:
+            return {**view, **_paginate_links(page.get("links", []), links_offset, links_limit)}
+    return _page_view(page, chunk, offset, limit, links_offset, links_limit)
 
 @mcp.tool()
-def current_page() -> dict:
-    """Obtener el contenido de la página actual."""
-    return navigator.get_page_content(navigator.current_url)
+@observe_tool
+@admitted
+async def navigate_many(
+    urls: List[str],
+    mode: str = "content",
+    max_bytes: Optional[int] = None,
+    links_limit: int = 0,
+) -> dict:
+    """
+    Obtener varias páginas de modelcontextprotocol.io en una sola llamada.
+    Las páginas se obtienen en paralelo (a través del caché) y se devuelven en el
+    orden pedido, cada una con su propio error si falla. No cambia la página actual
+    ni el historial. `mode` elige el detalle: `titles` (título y tamaño), `outline`
+    (además, el índice de encabezados) o `content` (además, los primeros `max_bytes`
+    del contenido, como mucho BATCH_MAX_BYTES; sigue leyendo con `navigate` y
+    `offset`=`next_offset`).
+    """
+    if mode not in ("titles", "outline", "content"):
+        return {"error": f"Modo no válido: {mode} (titles, outline o content)"}
+    if len(urls) > CONFIG["BATCH_MAX_URLS"]:
+        return {"error": f"Demasiadas URLs: {len(urls)} (máximo {CONFIG['BATCH_MAX_URLS']})"}
+    # Lo que pida el cliente no supera los límites, para que la respuesta siga acotada
+    if max_bytes is None:
+        max_bytes = CONFIG["BATCH_MAX_BYTES"]
+    max_bytes = min(max(0, max_bytes), CONFIG["BATCH_MAX_BYTES"])
+    links_limit = min(max(0, links_limit), CONFIG["MAX_LINKS"])
+    pages = await get_navigator().fetch_all(urls)
+    return {"pages": [_batch_item(page, mode, max_bytes, links_limit) for page in pages]}
 
 @mcp.tool()
-def search(query: str) -> List[dict]:
+@observe_tool
+@admitted
+async def get_section(url: str, section: Optional[str] = None, limit: Optional[int] = None) -> dict:
+    """
+    Obtener solo una sección de una página, sin navegar: la que indica
+    `section` (ancla o título del encabezado) o el `#fragmento` de la URL,
+    con sus subencabezados. Si supera `limit` bytes, `next_offset` indica
+    dónde seguir leyendo con `navigate`.
+    """
+    section = section or urllib.parse.urlsplit(url).fragment
+    if not section:
+        return {"error": "Indica la sección (parámetro section o #fragmento en la URL)", "url": url}
+    page = await get_navigator().fetch_page(url)
+    if "error" in page:
+        return page
+    view = _section_view(page, section, limit)
+    if view is None:
+        return {
+            "error": f"La página no tiene la sección '{section}'",
+            "url": page["url"],
+            "sections": [entry["anchor"] for entry in get_navigator().chunked(page).outline],
+        }
+    return view
+
+@mcp.tool()
+@observe_tool
+@admitted
+async def current_page(
+    chunk: int = 0,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    links_offset: int = 0,
+    links_limit: Optional[int] = None,
+) -> dict:
+    """
+    Obtener el contenido de la página actual, con la misma paginación que `navigate`.
+    """
+    state = _session_state()
+    page = await get_navigator().get_page_content(state.current_url, state)
+    return _page_view(page, chunk, offset, limit, links_offset, links_limit)
+
+@mcp.tool()
+@observe_tool
+@admitted
+async def search(query: str, limit: int = 10) -> List[dict]:
     """
     Buscar contenido en modelcontextprotocol.io.
-    Realiza una búsqueda más profunda incluyendo contenido de las páginas.
+    Consulta el índice invertido (BM25) sobre el título y el contenido de las páginas,
+    o el índice compartido de Elasticsearch con MCP_NAV_SEARCH_BACKEND=elasticsearch.
     """
-    home_content = navigator.get_page_content(CONFIG["BASE_URL"])
-    results = []
-    
-    for link in home_content.get("links", []):
-        relevance = 0
-        if query.lower() in link["text"].lower():
-            relevance += 2  # Mayor peso para coincidencias en títulos
-            
-        page_content = navigator.get_page_content(link["url"])
-        content = page_content.get("content", "").lower()
-        
-        if query.lower() in content:
-            relevance += 1  # Peso para coincidencias en contenido
-            
-            # Encontrar un snippet relevante
-            index = content.find(query.lower())
-            start = max(0, index - 100)
-            end = min(len(content), index + 100)
-            snippet = content[start:end].strip()
-            
-            if relevance > 0:
-                results.append({
-                    "title": link["text"],
-                    "url": link["url"],
-                    "relevance": relevance,
-                    "snippet": f"...{snippet}..."
-                })
-    
-    results.sort(key=lambda x: x["relevance"], reverse=True)
-    return results
+    await get_navigator().index_site()
+    return await get_navigator().search(query, limit=limit)
+
+async def _notify_hit(ctx: Context, count: int, hit: dict) -> None:
+    """Enviar un resultado como notificación de progreso (si el cliente la pidió)."""
+    meta = ctx.request_context.meta
+    token = meta.progressToken if meta else None
+    if token is None:
+        return
+    await ctx.session.send_notification(types.ServerNotification(types.ProgressNotification(
+        method="notifications/progress",
+        params=types.ProgressNotificationParams(
+            progressToken=token,
+            progress=count,
+            message=f"{hit['title']} ({hit['url']})",
+            hit=hit,
+        ),
+    )))
+
+@mcp.tool()
+@observe_tool
+@admitted
+async def search_stream(query: str, ctx: Context, limit: int = 10, max_results: int = 0) -> List[dict]:
+    """
+    Buscar en modelcontextprotocol.io enviando cada resultado en cuanto se encuentra.
+    Cada resultado llega como notificación de progreso (campo `hit`); al terminar se
+    devuelve el ranking completo. Con max_results > 0 la búsqueda se detiene, y se
+    cancelan las descargas pendientes, al alcanzar ese número de resultados.
+    """
+    count = 0
+    async for hit in get_navigator().iter_search(query):
+        count += 1
+        await _notify_hit(ctx, count, hit)
+        if max_results and count >= max_results:
+            break
+    return await get_navigator().search(query, limit=limit)
 
 @mcp.tool()
+@observe_tool
 def browse_history() -> List[str]:
     """Obtener el historial de navegación."""
-    return navigator.history
+    return _session_state().history
 
 @mcp.tool()
-def extract_links() -> List[dict]:
-    """Extraer todos los enlaces de la página actual."""
-    page_content = navigator.get_page_content(navigator.current_url)
-    return page_content.get("links", [])
+@observe_tool
+@admitted
+async def extract_links(offset: int = 0, limit: Optional[int] = None) -> dict:
+    """Extraer los enlaces de la página actual, paginados con offset/limit."""
+    state = _session_state()
+    page_content = await get_navigator().get_page_content(state.current_url, state)
+    if "error" in page_content:
+        return page_content
+    return _paginate_links(page_content.get("links", []), offset, limit)
 
 @mcp.tool()
-def clear_cache() -> dict:
-    """Limpiar el caché del navegador."""
-    navigator.cache.clear()
+@observe_tool
+@admitted
+async def clear_cache() -> dict:
+    """
+    Limpiar el caché del navegador y, si están activos, el almacén en disco,
+    el caché compartido y el índice de Elasticsearch.
+    """
+    await get_navigator().clear()
     return {"status": "success", "message": "Caché limpiado correctamente"}
 
+@mcp.tool()
+@observe_tool
+@admitted
+async def crawl_site() -> dict:
+    """
+    Recorrer el sitio (BFS por enlaces del mismo dominio) para precalentar
+    el caché y el índice de búsqueda.
+    """
+    return await get_navigator().crawler.crawl()
+
+@mcp.tool()
+@observe_tool
+@admitted
+async def check_changes() -> dict:
+    """
+    Leer sitemap.xml y volver a descargar solo las páginas en caché cuyo
+    `lastmod` indica que cambiaron; las demás renuevan su vigencia.
+    """
+    return await get_navigator().changes.check()
+
+@mcp.tool()
+@observe_tool
+def cache_stats() -> dict:
+    """Obtener estadísticas de uso del caché (aciertos, fallos, desalojos y bytes)."""
+    return get_navigator().cache.stats()
+
 @mcp.resource("resource://current_url")
 def get_current_url() -> str:
     """Obtener la URL actual."""
-    return navigator.current_url
+    return _session_state().current_url
 
 # --- Endpoint de healthcheck ---
 async def ping_response(request):
     """Endpoint simple para verificar que el servidor está funcionando."""
     return PlainTextResponse("pong")
 
+async def metrics_response(request):
+    """Métricas en formato Prometheus."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
 def create_app():
     """Crear y configurar la aplicación SSE."""
     os.environ["MCP_HTTP_PORT"] = str(CONFIG["PORT"])
     app = mcp.sse_app()
+    if CONFIG["WORKERS"] > 1 and CONFIG["STORE_DIR"]:
+        # Los POST de una sesión pueden llegar a otro worker: se reenvían al suyo
+        for position, route in enumerate(app.routes):
+            if isinstance(route, Mount) and route.path == mcp.settings.message_path.rstrip("/"):
+                relay = SessionRelay(os.path.join(CONFIG["STORE_DIR"], "workers"), route.app.__self__)
+                app.routes[position] = Mount(mcp.settings.message_path, app=relay)
+                app.add_event_handler("startup", relay.start)
+                app.add_event_handler("shutdown", relay.aclose)
     app.routes.append(Route("/ping", endpoint=ping_response, methods=["GET"]))
-    return app 
\ No newline at end of file
+    app.routes.append(Route("/metrics", endpoint=metrics_response, methods=["GET"]))
+    navigator = get_navigator()
+    app.add_event_handler("startup", navigator.start)
+    app.add_event_handler("shutdown", navigator.aclose)
+    tracer_provider = setup_tracing()
+    if tracer_provider is not None:
+        # Enviar los spans pendientes antes de salir
+        app.add_event_handler("shutdown", tracer_provider.shutdown)
+    return app
+ 
\ No newline at end of file
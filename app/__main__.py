@@ -1,18 +1,48 @@
 """Punto de entrada para ejecutar el servidor MCP SSE."""
 
+import os
+import tempfile
+
 import uvicorn
 from app import create_app, CONFIG, logger
 
 def main():
     """Iniciar el servidor MCP."""
-    app = create_app()
-    
     logger.info(f"Iniciando servidor MCP-NAV en puerto {CONFIG['PORT']}")
     logger.info(f"URL del servidor: http://localhost:{CONFIG['PORT']}/sse")
     logger.info(f"Caché TTL: {CONFIG['CACHE_TTL']} segundos")
     logger.info(f"Mantener HTML: {'Sí' if CONFIG['KEEP_HTML'] else 'No'}")
     
-    uvicorn.run(app, host="0.0.0.0", port=CONFIG["PORT"], log_level="info")
+    if CONFIG["WORKERS"] > 1:
+        serve_workers()
+        return
+    uvicorn.run(create_app(), host="0.0.0.0", port=CONFIG["PORT"], log_level="info")
+
+def serve_workers():
+    """
+    Iniciar MCP_NAV_WORKERS procesos que comparten el socket de escucha.
+    Las páginas se comparten a través del almacén en disco (MCP_NAV_STORE_DIR,
+    o un directorio temporal, borrado al salir, si no se indica).
+    """
+    if CONFIG["STORE_DIR"]:
+        run_workers(CONFIG["STORE_DIR"])
+        return
+    # Sin almacén indicado, uno temporal que se borra al terminar los workers
+    with tempfile.TemporaryDirectory(prefix="mcp-nav-", ignore_cleanup_errors=True) as store_dir:
+        os.environ["MCP_NAV_STORE_DIR"] = store_dir
+        run_workers(store_dir)
+
+def run_workers(store_dir: str):
+    """Ejecutar uvicorn con MCP_NAV_WORKERS procesos sobre el almacén `store_dir`."""
+    logger.info(f"Modo multiproceso: {CONFIG['WORKERS']} workers, almacén compartido en {store_dir}")
+    uvicorn.run(
+        "app:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=CONFIG["PORT"],
+        workers=CONFIG["WORKERS"],
+        log_level="info",
+    )
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""Caché de páginas en memoria con expiración, límites y métricas."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """Estimar el tamaño en bytes de un resultado de página (cadenas en UTF-8)."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, dict):
+        return sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value)
+    return 8
+
+
+class Cache:
+    """Caché LRU de páginas acotado por número de entradas y por bytes.
+
+    Las entradas son válidas durante `ttl` segundos. Después se conservan
+    como obsoletas otros `stale_ttl` segundos, junto con sus validadores
+    HTTP (ETag / Last-Modified), para poder revalidarlas o servirlas
+    mientras se refrescan. `purge_expired` (o la tarea
+    `expire_periodically`) elimina las que superan ese margen aunque
+    nadie vuelva a pedirlas.
+
+    `on_remove` se llama con la clave de cada entrada que sale del caché
+    (desalojo, expiración, borrado o `clear`), para que lo que depende de
+    ella, como los índices de búsqueda, no la sobreviva.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+        stale_ttl: int = 0,
+        on_remove: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """Inicializar el caché.
+
+        Args:
+            ttl: Segundos que una entrada se considera válida
+            max_entries: Número máximo de entradas (0 = sin límite)
+            max_bytes: Tamaño máximo estimado en bytes (0 = sin límite)
+            stale_ttl: Segundos adicionales que se conserva una entrada caducada
+            on_remove: Función a la que se avisa de cada clave que sale del caché
+        """
+        self.cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.cache
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Obtener un valor del caché si existe y no ha expirado."""
+        entry = self.get_entry(key)
+        if entry is not None and entry["fresh"]:
+            return entry["data"]
+        return None
+
+    def get_entry(self, key: str) -> Optional[Dict]:
+        """Obtener la entrada completa, válida u obsoleta (`fresh` indica cuál).
+
+        Las entradas obsoletas conservan sus validadores para revalidarlas.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry["timestamp"]
+            if age < self.ttl + self.stale_ttl:
+                self.cache.move_to_end(key)
+                entry["fresh"] = age < self.ttl
+                if entry["fresh"]:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                return entry
+            self._remove(key)
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def age(self, key: str) -> Optional[float]:
+        """Segundos desde que una entrada se guardó o renovó, sin contarlo como acceso."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        return time.monotonic() - entry["timestamp"]
+
+    def touch(self, key: str, age: float = 0) -> bool:
+        """Renovar el TTL de una entrada revalidada (respuesta 304), quizá hace `age` segundos."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return False
+        entry["timestamp"] = time.monotonic() - age
+        self.cache.move_to_end(key)
+        self.revalidations += 1
+        return True
+
+    def set(
+        self,
+        key: str,
+        value: Dict,
+        validators: Optional[Dict[str, str]] = None,
+        age: float = 0,
+    ) -> None:
+        """Guardar un valor en el caché, desalojando las entradas menos usadas si hace falta.
+
+        Args:
+            key: Clave (URL completa)
+            value: Resultado de la página
+            validators: Cabeceras ETag / Last-Modified de la respuesta
+            age: Segundos transcurridos desde que se obtuvo el valor (p. ej. en otra réplica)
+        """
+        size = estimate_size(value)
+        if key in self.cache:
+            self._remove(key, notify=False)
+        if self.max_bytes and size > self.max_bytes:
+            if self.on_remove is not None:
+                self.on_remove(key)
+            return
+        self.cache[key] = {
+            "data": value,
+            "timestamp": time.monotonic() - age,
+            "size": size,
+            "validators": validators or {},
+        }
+        self.bytes += size
+        while (self.max_entries and len(self.cache) > self.max_entries) or (
+            self.max_bytes and self.bytes > self.max_bytes
+        ):
+            oldest = next(iter(self.cache))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def remove(self, key: str) -> bool:
+        """Eliminar una entrada. Devuelve False si no estaba."""
+        if key not in self.cache:
+            return False
+        self._remove(key)
+        return True
+
+    def _remove(self, key: str, notify: bool = True) -> None:
+        entry = self.cache.pop(key)
+        self.bytes -= entry["size"]
+        if notify and self.on_remove is not None:
+            self.on_remove(key)
+
+    def purge_expired(self) -> int:
+        """Eliminar las entradas que superan el TTL más el margen de obsolescencia."""
+        limit = time.monotonic() - self.ttl - self.stale_ttl
+        expired = [key for key, entry in self.cache.items() if entry["timestamp"] <= limit]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    async def expire_periodically(self, interval: float) -> None:
+        """Purgar las entradas caducadas cada `interval` segundos (tarea en segundo plano)."""
+        while True:
+            await asyncio.sleep(interval)
+            self.purge_expired()
+
+    def clear(self) -> None:
+        """Limpiar el caché."""
+        keys = list(self.cache) if self.on_remove is not None else []
+        self.cache.clear()
+        self.bytes = 0
+        for key in keys:
+            self.on_remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Obtener contadores de uso del caché."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self.cache),
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits,
+            "revalidations": self.revalidations,
+        }
@@ -0,0 +1,211 @@
+"""Detección de cambios del sitio a partir de sitemap.xml para refrescar solo lo que cambió."""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import time
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+logger = logging.getLogger("mcp-nav")
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def page_fingerprint(page: Dict) -> str:
+    """Hash del contenido de una página (título, Markdown y enlaces), sin la URL."""
+    body = {key: page.get(key) for key in ("title", "content", "links")}
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Convertir un `lastmod` (fecha W3C, con o sin hora) a segundos desde epoch."""
+    if not value:
+        return None
+    try:
+        moment = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.timestamp()
+
+
+def parse_sitemap(body: bytes) -> Tuple[Dict[str, Optional[float]], List[str]]:
+    """Leer un sitemap o un índice de sitemaps.
+
+    Returns:
+        Tupla (URLs con su `lastmod` o None, URLs de los sitemaps hijos)
+    """
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+    root = etree.fromstring(body, parser)
+    pages: Dict[str, Optional[float]] = {}
+    children: List[str] = []
+    for element in root:
+        if not isinstance(element.tag, str):
+            continue
+        loc = element.findtext(f"{SITEMAP_NS}loc") or element.findtext("loc")
+        if not loc:
+            continue
+        if element.tag in (f"{SITEMAP_NS}sitemap", "sitemap"):
+            children.append(loc.strip())
+        else:
+            pages[loc.strip()] = parse_lastmod(element.findtext(f"{SITEMAP_NS}lastmod") or element.findtext("lastmod"))
+    return pages, children
+
+
+class ChangeDetector:
+    """Refresco incremental de las páginas en caché guiado por sitemap.xml.
+
+    En cada comprobación se lee el sitemap (y sus hijos, si es un índice) y,
+    para cada página en caché con `lastmod`, se vuelve a descargar solo si su
+    `lastmod` es posterior a la última vez que se obtuvo o validó; las demás
+    renuevan su TTL sin petición alguna, también en el almacén en disco y en
+    Redis para que el resto de workers y réplicas no las revaliden. Las
+    páginas sin `lastmod` siguen el TTL normal, y al revalidarlas el hash del
+    contenido evita reindexarlas si no cambió. Las que desaparecen del sitemap se revalidan y, si el sitio
+    responde 404 o 410, se eliminan del caché y de los índices.
+    """
+
+    def __init__(
+        self,
+        navigator,
+        sitemap_url: str,
+        concurrency: int = 4,
+        max_sitemaps: int = 50,
+    ) -> None:
+        """Inicializar el detector.
+
+        Args:
+            navigator: WebsiteNavigator cuyo caché e índices se mantienen
+            sitemap_url: URL de sitemap.xml (o de un índice de sitemaps)
+            concurrency: Descargas simultáneas de páginas cambiadas
+            max_sitemaps: Sitemaps máximos leídos por comprobación
+        """
+        self.navigator = navigator
+        self.sitemap_url = sitemap_url
+        self.host = urllib.parse.urlsplit(sitemap_url).netloc.lower()
+        self.concurrency = concurrency
+        self.max_sitemaps = max_sitemaps
+        self.lastmod: Dict[str, Optional[float]] = {}
+        self.last_run: Optional[Dict] = None
+        self._lock = asyncio.Lock()
+
+    async def _load_sitemaps(self) -> Optional[Dict[str, Optional[float]]]:
+        """Leer el sitemap y sus hijos; None si el principal no se puede leer."""
+        pending = [self.sitemap_url]
+        seen = set()
+        pages: Dict[str, Optional[float]] = {}
+        while pending and len(seen) < self.max_sitemaps:
+            url = pending.pop(0)
+            if url in seen:
+                continue
+            seen.add(url)
+            try:
+                # Con los mismos límites (tamaño, turnos, circuit breaker) que las páginas
+                _, body = await self.navigator._make_request(url)
+                found, children = parse_sitemap(body)
+            except Exception as e:
+                logger.warning(f"No se pudo leer el sitemap {url}: {e}")
+                if url == self.sitemap_url:
+                    return None
+                continue
+            for page_url, lastmod in found.items():
+                full_url = self.navigator.resolve_url(page_url)
+                if urllib.parse.urlsplit(full_url).netloc.lower() == self.host:
+                    pages[full_url] = lastmod
+            pending.extend(children)
+        return pages
+
+    def _fetched_at(self, full_url: str) -> Optional[float]:
+        """Momento (epoch) en que se obtuvo o validó por última vez la copia en caché."""
+        age = self.navigator.cache.age(full_url)
+        return None if age is None else time.time() - age
+
+    def _refreshed_since(self, full_url: str, since: float) -> bool:
+        """True si la copia en caché se obtuvo o validó después de `since` (reloj monotónico)."""
+        age = self.navigator.cache.age(full_url)
+        return age is not None and age <= time.monotonic() - since
+
+    async def check(self) -> Dict:
+        """Comprobar el sitemap y refrescar las páginas cambiadas. Si ya hay una comprobación en curso, espera.
+
+        Returns:
+            Estadísticas (URLs del sitemap, cambiadas, sin cambios, eliminadas, errores y duración)
+        """
+        async with self._lock:
+            return await self._check()
+
+    async def _check(self) -> Dict:
+        started = time.monotonic()
+        pages = await self._load_sitemaps()
+        stats = {"urls": 0, "changed": 0, "unchanged": 0, "removed": 0, "errors": 0}
+        if pages is None:
+            stats["errors"] = 1
+            self.last_run = stats
+            return stats
+        stats["urls"] = len(pages)
+
+        changed = []
+        unchanged = []
+        for full_url, lastmod in pages.items():
+            fetched_at = self._fetched_at(full_url)
+            if fetched_at is None or lastmod is None:
+                continue
+            # Un lastmod igual al de la comprobación anterior no es un cambio, aunque
+            # el reloj del sitio vaya por delante del nuestro
+            if lastmod > fetched_at and lastmod != self.lastmod.get(full_url):
+                changed.append(full_url)
+            else:
+                unchanged.append(full_url)
+        stats["unchanged"] = len(unchanged)
+        gone = [url for url in self.lastmod if url not in pages and self._fetched_at(url) is not None]
+        previous, self.lastmod = self.lastmod, dict(pages)
+
+        # La renovación llega también al almacén y a Redis: sin ella, los demás
+        # workers (o este tras reiniciar) volverían a pedir cada página al caducar
+        await asyncio.gather(*(self.navigator.renew(url) for url in unchanged))
+
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(full_url: str) -> Dict:
+            async with slots:
+                return await self.navigator.fetch_page(full_url, revalidate=True)
+
+        refreshing_at = time.monotonic()
+        results = await asyncio.gather(*(refresh(url) for url in changed + gone))
+        for position, (full_url, page) in enumerate(zip(changed + gone, results)):
+            if page.get("status") in (404, 410):
+                await self.navigator.forget(full_url)
+                stats["removed"] += 1
+            elif "error" in page or not self._refreshed_since(full_url, refreshing_at):
+                # Sin respuesta del origen fetch_page sirve la copia obsoleta: se
+                # conserva el lastmod anterior para reintentarlo en la siguiente comprobación
+                stats["errors"] += 1
+                if full_url in previous:
+                    self.lastmod[full_url] = previous[full_url]
+                else:
+                    self.lastmod.pop(full_url, None)
+            elif position < len(changed):
+                stats["changed"] += 1
+
+        stats["elapsed"] = round(time.monotonic() - started, 3)
+        self.last_run = stats
+        logger.info(
+            f"Sitemap comprobado: {stats['changed']} páginas cambiadas, {stats['unchanged']} sin cambios, "
+            f"{stats['removed']} eliminadas en {stats['elapsed']} s"
+        )
+        return stats
+
+    async def run_periodically(self, interval: float) -> None:
+        """Comprobar el sitemap cada `interval` segundos (tarea en segundo plano)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Error al comprobar el sitemap: {e}")
@@ -0,0 +1,189 @@
+"""División del contenido markdown en fragmentos de tamaño acotado."""
+
+import bisect
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+MARKUP_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)|[`*_]")
+SLUG_DROP_RE = re.compile(r"[^\w\- ]")
+
+
+def slugify(title: str) -> str:
+    """Ancla al estilo de GitHub para un encabezado sin `id` (minúsculas, espacios a guiones)."""
+    text = MARKUP_RE.sub(lambda match: match.group(1) or "", title)
+    return SLUG_DROP_RE.sub("", text.lower()).strip().replace(" ", "-")
+
+
+def _char_boundary(raw: bytes, offset: int) -> int:
+    """Retroceder un desplazamiento hasta el inicio de un carácter UTF-8."""
+    offset = max(0, min(offset, len(raw)))
+    while 0 < offset < len(raw) and raw[offset] & 0xC0 == 0x80:
+        offset -= 1
+    return offset
+
+
+def headings(content: str) -> List[str]:
+    """Textos de los encabezados Markdown de un contenido, ignorando los bloques de código."""
+    found = []
+    in_fence = False
+    for line in content.splitlines():
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            heading = HEADING_RE.match(line)
+            if heading:
+                found.append(heading.group(2))
+    return found
+
+
+class ChunkedContent:
+    """Contenido markdown dividido una sola vez en fragmentos de `max_bytes` como máximo.
+
+    Los cortes se hacen preferentemente antes de un encabezado y, si no, en un
+    salto de línea; solo una línea más larga que `max_bytes` se parte por la
+    mitad (siempre en un límite de carácter). Todos los desplazamientos son en
+    bytes UTF-8 sobre el contenido completo.
+
+    Solo se guardan los límites de cada fragmento (en bytes y en caracteres)
+    junto al propio `content`, que es el mismo objeto que la página en caché:
+    el texto de cada lectura se codifica al pedirlo, y solo de los fragmentos
+    que abarca.
+
+    El índice de encabezados (`outline`) guarda de cada sección su ancla (el
+    `id` del HTML o, si no lo tenía, uno derivado del título) y dónde empieza y
+    termina, para servir una sección suelta con `section`.
+    """
+
+    def __init__(self, content: str, max_bytes: int = 16384, anchors: Optional[List[Dict]] = None) -> None:
+        """Dividir el contenido.
+
+        Args:
+            content: Contenido markdown de la página
+            max_bytes: Tamaño máximo de cada fragmento en bytes
+            anchors: Anclas HTML de los encabezados, en orden (`anchors` de la página)
+        """
+        self.content = content
+        self.max_bytes = max(1, max_bytes)
+        raw = content.encode("utf-8")
+        self.total_bytes = len(raw)
+        self.outline: List[Dict] = []
+        self.bounds: List[Tuple[int, int]] = []
+        self._split(raw)
+        self._sections(anchors or [])
+        # Posición en caracteres del inicio de cada fragmento (y del final del contenido)
+        self._chars = [0]
+        for start, end in self.bounds:
+            self._chars.append(self._chars[-1] + len(raw[start:end].decode("utf-8", errors="ignore")))
+
+    def __len__(self) -> int:
+        return len(self.bounds)
+
+    def _split(self, raw: bytes) -> None:
+        start = pos = 0
+        last_heading = None
+        in_fence = False
+        for line in raw.splitlines(keepends=True):
+            end = pos + len(line)
+            text = line.decode("utf-8").rstrip("\r\n")
+            if FENCE_RE.match(text):
+                in_fence = not in_fence
+            elif not in_fence:
+                heading = HEADING_RE.match(text)
+                if heading:
+                    last_heading = pos
+                    self.outline.append({"level": len(heading.group(1)), "title": heading.group(2), "offset": pos})
+
+            if end - start > self.max_bytes and pos > start:
+                # Cortar antes del último encabezado del fragmento si lo hay
+                cut = last_heading if last_heading is not None and last_heading > start else pos
+                self.bounds.append((start, cut))
+                start = cut
+                if end - start > self.max_bytes and pos > start:
+                    self.bounds.append((start, pos))
+                    start = pos
+            # Una línea más larga que max_bytes se parte en trozos
+            while end - start > self.max_bytes:
+                cut = _char_boundary(raw, start + self.max_bytes)
+                if cut <= start:
+                    cut = start + self.max_bytes
+                self.bounds.append((start, cut))
+                start = cut
+            pos = end
+        if pos > start or not self.bounds:
+            self.bounds.append((start, pos))
+
+        starts = [bound[0] for bound in self.bounds]
+        for entry in self.outline:
+            entry["chunk"] = bisect.bisect_right(starts, entry["offset"]) - 1
+
+    def _sections(self, anchors: List[Dict]) -> None:
+        """Completar el índice con el ancla y el final (siguiente encabezado de igual o mayor nivel) de cada sección."""
+        pending = iter(anchors)
+        expected = next(pending, None)
+        open_sections: List[Dict] = []
+        for entry in self.outline:
+            if expected is not None and expected["title"] == entry["title"]:
+                entry["anchor"] = expected["anchor"]
+                expected = next(pending, None)
+            else:
+                entry["anchor"] = slugify(entry["title"])
+            while open_sections and open_sections[-1]["level"] >= entry["level"]:
+                open_sections.pop()["end"] = entry["offset"]
+            open_sections.append(entry)
+        for entry in open_sections:
+            entry["end"] = self.total_bytes
+
+    def _window(self, start: int, end: int) -> Tuple[bytes, int]:
+        """Bytes de los fragmentos que abarcan [start, end) y desplazamiento del primero."""
+        first = max(0, bisect.bisect_right(self.bounds, start, key=lambda bound: bound[0]) - 1)
+        last = max(first, bisect.bisect_right(self.bounds, end - 1, key=lambda bound: bound[0]) - 1)
+        return self.content[self._chars[first]:self._chars[last + 1]].encode("utf-8"), self.bounds[first][0]
+
+    def find(self, name: str) -> Optional[Dict]:
+        """Buscar una sección por su ancla (con o sin `#`) o por su título."""
+        name = name.lstrip("#").strip()
+        if not name:
+            return None
+        slug = slugify(name)
+        for key, value in (("anchor", name), ("anchor", slug), ("title", name)):
+            for entry in self.outline:
+                if entry[key] == value or (key == "title" and entry[key].lower() == value.lower()):
+                    return entry
+        return None
+
+    def section(self, name: str, limit: Optional[int] = None) -> Optional[Dict]:
+        """Leer una sección completa (hasta `limit` bytes), con sus subencabezados. None si no existe."""
+        entry = self.find(name)
+        if entry is None:
+            return None
+        size = entry["end"] - entry["offset"]
+        part = self.read(entry["offset"], min(size, limit) if limit else size)
+        part["heading"] = entry
+        part["outline"] = [sub for sub in self.outline if entry["offset"] < sub["offset"] < entry["end"]]
+        return part
+
+    def chunk(self, chunk_id: int) -> Optional[Dict]:
+        """Obtener un fragmento por su número (None si no existe)."""
+        if not 0 <= chunk_id < len(self.bounds):
+            return None
+        start, end = self.bounds[chunk_id]
+        return {"content": self.content[self._chars[chunk_id]:self._chars[chunk_id + 1]], "start": start, "end": end}
+
+    def texts(self) -> Iterator[str]:
+        """Texto de cada fragmento, en orden."""
+        for chunk_id in range(len(self.bounds)):
+            yield self.content[self._chars[chunk_id]:self._chars[chunk_id + 1]]
+
+    def read(self, offset: int, limit: int) -> Dict:
+        """Leer un rango de bytes del contenido, ajustado a límites de carácter."""
+        offset = max(0, min(offset, self.total_bytes))
+        limit = max(1, limit)
+        window, base = self._window(offset, min(self.total_bytes, offset + max(limit, 4)))
+        start = _char_boundary(window, offset - base)
+        end = _char_boundary(window, start + limit)
+        if end <= start < len(window):
+            end = min(len(window), start + 4)
+        content = window[start:end].decode("utf-8", errors="ignore")
+        return {"content": content, "start": base + start, "end": base + end}
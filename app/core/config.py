@@ -27,6 +27,7 @@ class Settings:
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = int(os.environ.get("MCP_NAV_RATE_LIMIT", 100))
     RATE_LIMIT_WINDOW: int = int(os.environ.get("MCP_NAV_RATE_WINDOW", 60))
+    RATE_LIMIT_REDIS: bool = os.environ.get("MCP_NAV_RATE_LIMIT_REDIS", "0") == "1"
     
     # Auth
     JWT_SECRET: str = os.environ.get("MCP_NAV_JWT_SECRET", "your-secret-key")
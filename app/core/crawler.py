@@ -0,0 +1,146 @@
+"""Rastreador del sitio para precalentar el caché y el índice de búsqueda."""
+
+import asyncio
+import logging
+import time
+import urllib.parse
+import urllib.robotparser
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("mcp-nav")
+
+
+class SiteCrawler:
+    """Recorrido en anchura (BFS) del grafo de enlaces del mismo dominio.
+
+    Cada página se obtiene con `navigator.fetch_page`, de modo que queda en
+    el caché y en el índice de búsqueda sin alterar la navegación de los
+    clientes. La cortesía con el sitio se controla con un número máximo de
+    peticiones simultáneas, una pausa entre descargas y las reglas de
+    robots.txt.
+    """
+
+    def __init__(
+        self,
+        navigator,
+        base_url: str,
+        max_depth: int = 3,
+        max_pages: int = 200,
+        concurrency: int = 4,
+        delay: float = 0.5,
+        user_agent: str = "mcp-nav",
+    ) -> None:
+        """Inicializar el rastreador.
+
+        Args:
+            navigator: WebsiteNavigator con el que se obtienen las páginas
+            base_url: URL inicial; solo se siguen enlaces de su mismo host
+            max_depth: Profundidad máxima desde la página inicial
+            max_pages: Número máximo de páginas por recorrido
+            concurrency: Descargas simultáneas
+            delay: Pausa (segundos) de cada descarga antes de la siguiente
+            user_agent: Agente con el que se consultan las reglas de robots.txt (el
+                User-Agent que envía el cliente del navegador)
+        """
+        self.navigator = navigator
+        self.base_url = base_url
+        self.host = urllib.parse.urlsplit(base_url).netloc.lower()
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.delay = delay
+        self.user_agent = user_agent
+        self.last_run: Optional[Dict] = None
+        self._lock = asyncio.Lock()
+
+    async def _load_robots(self) -> Optional[urllib.robotparser.RobotFileParser]:
+        robots_url = urllib.parse.urljoin(self.base_url, "/robots.txt")
+        try:
+            # Con los mismos límites (tamaño, turnos, circuit breaker) que las páginas
+            response, body = await self.navigator._make_request(robots_url, retries=1)
+        except httpx.HTTPStatusError:
+            return None
+        except Exception as e:
+            logger.warning(f"No se pudo leer {robots_url}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        robots = urllib.robotparser.RobotFileParser(robots_url)
+        robots.parse(body.decode(response.encoding or "utf-8", errors="replace").splitlines())
+        return robots
+
+    async def crawl(self) -> Dict:
+        """Recorrer el sitio. Si ya hay un recorrido en curso, espera a que termine.
+
+        Returns:
+            Estadísticas del recorrido (páginas, errores, profundidad y duración)
+        """
+        async with self._lock:
+            return await self._crawl()
+
+    async def _crawl(self) -> Dict:
+        started = time.monotonic()
+        robots = await self._load_robots()
+        start_url = self.navigator.resolve_url(self.base_url)
+        seen = {start_url}
+        queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+        queue.put_nowait((start_url, 0))
+        stats = {"pages": 0, "errors": 0, "max_depth": 0}
+
+        async def worker() -> None:
+            while True:
+                url, depth = await queue.get()
+                try:
+                    cached = url in self.navigator.cache
+                    page = await self.navigator.fetch_page(url)
+                    if "error" in page:
+                        stats["errors"] += 1
+                        continue
+                    stats["pages"] += 1
+                    stats["max_depth"] = max(stats["max_depth"], depth)
+                    if depth < self.max_depth:
+                        for link in page.get("links", []):
+                            next_url = self.navigator.resolve_url(link["url"])
+                            if next_url in seen or len(seen) >= self.max_pages:
+                                continue
+                            if urllib.parse.urlsplit(next_url).netloc != self.host:
+                                continue
+                            if robots is not None and not robots.can_fetch(self.user_agent, next_url):
+                                continue
+                            seen.add(next_url)
+                            queue.put_nowait((next_url, depth + 1))
+                    if not cached and self.delay:
+                        await asyncio.sleep(self.delay)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+
+        stats["elapsed"] = round(time.monotonic() - started, 3)
+        self.last_run = stats
+        self.navigator.checkpoint()
+        logger.info(
+            f"Rastreo completado: {stats['pages']} páginas, {stats['errors']} errores "
+            f"en {stats['elapsed']} s"
+        )
+        return stats
+
+    async def run_periodically(self, interval: float, run_now: bool = True) -> None:
+        """Recorrer el sitio al arrancar (opcional) y luego cada `interval` segundos."""
+        if not run_now:
+            await asyncio.sleep(interval)
+        while True:
+            try:
+                await self.crawl()
+            except Exception as e:
+                logger.error(f"Error durante el rastreo: {e}")
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
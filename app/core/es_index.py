@@ -0,0 +1,241 @@
+"""Índice de búsqueda compartido entre réplicas en Elasticsearch."""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import ApiError, TransportError
+
+from app.core.chunks import headings
+from app.core.metrics import tracer
+
+logger = logging.getLogger("mcp-nav")
+
+ES_ERRORS = (ApiError, TransportError)
+
+MAPPINGS = {
+    "properties": {
+        "url": {"type": "keyword"},
+        "title": {"type": "text"},
+        "headings": {"type": "text"},
+        "content": {"type": "text"},
+        "links": {
+            "properties": {
+                "text": {"type": "text"},
+                "url": {"type": "keyword"},
+            }
+        },
+    }
+}
+
+
+class ElasticsearchIndex:
+    """Índice de páginas en Elasticsearch con indexación por lotes en segundo plano.
+
+    `add` encola el documento (título, encabezados, contenido y enlaces) y una
+    tarea lo envía con la API bulk en lotes de `batch_size` o cada
+    `flush_interval` segundos. La cola está acotada a `max_pending`
+    documentos: si Elasticsearch no da abasto, `add` espera (backpressure) en
+    lugar de acumular memoria.
+
+    `search` no espera a la cola ni fuerza un refresh: los documentos enviados
+    se hacen visibles con el `refresh_interval` del índice, así que una
+    búsqueda no paga la indexación pendiente. Quien necesite leer lo recién
+    escrito puede llamar antes a `flush`.
+
+    Los errores de Elasticsearch se registran; `search` devuelve None para que
+    quien llama pueda recurrir al índice en memoria.
+    """
+
+    def __init__(
+        self,
+        client: AsyncElasticsearch,
+        index: str = "mcp-nav-pages",
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_pending: int = 1000,
+    ) -> None:
+        """Inicializar el índice.
+
+        Args:
+            client: Cliente asíncrono de Elasticsearch
+            index: Nombre del índice
+            batch_size: Documentos por petición bulk
+            flush_interval: Segundos máximos que un documento espera en la cola
+            max_pending: Documentos en cola a partir de los cuales `add` espera
+        """
+        self.client = client
+        self.index = index
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[Dict]" = asyncio.Queue(maxsize=max_pending)
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._ready = False
+        self._dirty = False
+        self.indexed = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "ElasticsearchIndex":
+        """Crear el índice a partir de una URL de conexión (`settings.get_es_url()`)."""
+        return cls(AsyncElasticsearch(url), **kwargs)
+
+    async def ensure_index(self) -> None:
+        """Crear el índice con su mapping si todavía no existe."""
+        if self._ready:
+            return
+        try:
+            if not await self.client.indices.exists(index=self.index):
+                await self.client.indices.create(index=self.index, mappings=MAPPINGS)
+            self._ready = True
+        except ES_ERRORS as e:
+            logger.warning(f"No se pudo preparar el índice {self.index} en Elasticsearch: {e}")
+
+    @staticmethod
+    def document(page: Dict) -> Dict:
+        """Documento de Elasticsearch para el resultado de una página."""
+        return {
+            "url": page["url"],
+            "title": page.get("title", ""),
+            "headings": headings(page.get("content", "")),
+            "content": page.get("content", ""),
+            "links": page.get("links", []),
+        }
+
+    async def add(self, page: Dict) -> None:
+        """Encolar una página para indexarla (espera si la cola está llena)."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._run())
+        await self._queue.put(self.document(page))
+
+    async def remove(self, url: str) -> None:
+        """Encolar el borrado de una página (se envía en el mismo lote que las altas)."""
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._run())
+        await self._queue.put({"url": url, "deleted": True})
+
+    async def _run(self) -> None:
+        """Enviar los documentos encolados en lotes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0 or self._wakeup.is_set():
+                    break
+                getter = asyncio.ensure_future(self._queue.get())
+                waker = asyncio.ensure_future(self._wakeup.wait())
+                await asyncio.wait({getter, waker}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                waker.cancel()
+                if not getter.cancel():
+                    batch.append(getter.result())
+                else:
+                    break
+            try:
+                await self._bulk(batch)
+            except Exception as e:
+                self.errors += len(batch)
+                logger.error(f"Error inesperado al indexar {len(batch)} páginas: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                if self._queue.empty():
+                    self._wakeup.clear()
+
+    async def _bulk(self, batch: List[Dict]) -> None:
+        await self.ensure_index()
+        operations = []
+        for doc in batch:
+            if doc.get("deleted"):
+                operations.append({"delete": {"_index": self.index, "_id": doc["url"]}})
+                continue
+            operations.append({"index": {"_index": self.index, "_id": doc["url"]}})
+            operations.append(doc)
+        with tracer.start_as_current_span("es.bulk") as span:
+            span.set_attribute("es.documents", len(batch))
+            try:
+                response = await self.client.bulk(operations=operations)
+            except ES_ERRORS as e:
+                self.errors += len(batch)
+                logger.warning(f"Error en la indexación bulk de {len(batch)} páginas: {e}")
+                return
+        results = [next(iter(item.values())) for item in response.get("items", [])]
+        failed = [result for result in results if result.get("error")]
+        self.errors += len(failed)
+        self.indexed += len(batch) - len(failed)
+        self._dirty = True
+        if failed:
+            logger.warning(f"{len(failed)} páginas no se indexaron en Elasticsearch: {failed[0]['error']}")
+
+    async def flush(self) -> None:
+        """Esperar a que se envíen los documentos encolados y hacerlos visibles para búsqueda."""
+        if self._flusher is not None and not self._flusher.done():
+            self._wakeup.set()
+            await self._queue.join()
+        if self._dirty:
+            self._dirty = False
+            try:
+                await self.client.indices.refresh(index=self.index)
+            except ES_ERRORS as e:
+                logger.warning(f"Error al refrescar el índice {self.index}: {e}")
+
+    async def search(self, query: str, limit: int = 10) -> Optional[List[dict]]:
+        """Buscar páginas con resaltado del contenido. None si Elasticsearch no responde.
+
+        Returns:
+            Lista de resultados con título, URL, relevancia y snippet
+        """
+        with tracer.start_as_current_span("es.search"):
+            try:
+                response = await self.client.search(
+                    index=self.index,
+                    size=limit,
+                    query={
+                        "multi_match": {
+                            "query": query,
+                            "fields": ["title^3", "headings^2", "content", "links.text"],
+                        }
+                    },
+                    highlight={
+                        "fields": {"content": {"fragment_size": 200, "number_of_fragments": 1}},
+                        "pre_tags": [""],
+                        "post_tags": [""],
+                    },
+                    source_includes=["title", "url", "content"],
+                )
+            except ES_ERRORS as e:
+                logger.warning(f"Error al buscar en Elasticsearch: {e}")
+                return None
+        results = []
+        for hit in response["hits"]["hits"]:
+            source = hit["_source"]
+            fragments = hit.get("highlight", {}).get("content") or [source.get("content", "")[:200]]
+            results.append({
+                "title": source.get("title", ""),
+                "url": source["url"],
+                "relevance": round(hit["_score"] or 0.0, 4),
+                "snippet": f"...{fragments[0].strip()}...",
+            })
+        return results
+
+    async def clear(self) -> None:
+        """Borrar todos los documentos del índice."""
+        try:
+            await self.client.delete_by_query(index=self.index, query={"match_all": {}}, refresh=True)
+        except ES_ERRORS as e:
+            logger.warning(f"Error al vaciar el índice {self.index}: {e}")
+
+    async def aclose(self) -> None:
+        """Enviar lo pendiente y cerrar la conexión."""
+        if self._flusher is not None:
+            if not self._flusher.done() and self._queue.qsize():
+                self._wakeup.set()
+                try:
+                    await asyncio.wait_for(self._queue.join(), self.flush_interval * 5)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Se descartan {self._queue.qsize()} páginas pendientes de indexar")
+            self._flusher.cancel()
+        await self.client.close()
@@ -0,0 +1,161 @@
+"""Índice invertido con puntuación BM25 para la búsqueda de páginas."""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from app.core.metrics import tracer
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Dividir un texto en términos normalizados (minúsculas, alfanuméricos)."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Índice invertido en memoria con postings por término y ranking BM25.
+
+    Los documentos se identifican por su URL completa y se pueden añadir,
+    reemplazar o eliminar de forma incremental: al reindexar una URL se
+    retiran primero sus postings anteriores.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, title_weight: int = 3) -> None:
+        """Inicializar el índice.
+
+        Args:
+            k1: Saturación de la frecuencia de término en BM25
+            b: Normalización por longitud de documento en BM25
+            title_weight: Veces que cuenta cada término del título frente al contenido
+        """
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, Dict] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._docs
+
+    def add(self, url: str, title: str, content: str) -> None:
+        """Indexar (o reindexar) una página."""
+        self.remove(url)
+        title = title or ""
+        content = content or ""
+        frequencies = Counter(tokenize(content))
+        for term in tokenize(title):
+            frequencies[term] += self.title_weight
+        length = sum(frequencies.values())
+
+        for term, tf in frequencies.items():
+            self._postings.setdefault(term, {})[url] = tf
+        self._docs[url] = {
+            "title": title,
+            "content": content,
+            "length": length,
+            "terms": tuple(frequencies),
+        }
+        self._total_length += length
+
+    def remove(self, url: str) -> bool:
+        """Eliminar una página del índice. Devuelve False si no estaba indexada."""
+        doc = self._docs.pop(url, None)
+        if doc is None:
+            return False
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(url, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= doc["length"]
+        return True
+
+    def clear(self) -> None:
+        """Vaciar el índice."""
+        self._postings.clear()
+        self._docs.clear()
+        self._total_length = 0
+
+    def score(self, terms: Iterable[str], only: Optional[str] = None) -> Dict[str, float]:
+        """Calcular la puntuación BM25 de cada documento que contiene algún término.
+
+        Args:
+            terms: Términos de la consulta
+            only: Limitar el cálculo a un único documento (URL)
+        """
+        n_docs = len(self._docs)
+        if not n_docs:
+            return {}
+        avg_length = self._total_length / n_docs or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            if only is not None:
+                postings = {only: postings[only]} if only in postings else {}
+            for url, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._docs[url]["length"] / avg_length)
+                scores[url] = scores.get(url, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[dict]:
+        """Buscar páginas que coincidan con la consulta, ordenadas por relevancia.
+
+        Args:
+            query: Texto de la consulta
+            limit: Número máximo de resultados (None para todos)
+
+        Returns:
+            Lista de resultados con título, URL, relevancia y snippet
+        """
+        terms = tokenize(query)
+        with tracer.start_as_current_span("search.score") as span:
+            span.set_attribute("search.terms", len(terms))
+            span.set_attribute("search.documents", len(self._docs))
+            scores = self.score(terms)
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            span.set_attribute("search.matches", len(ranked))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.hit(url, query, score, terms) for url, score in ranked]
+
+    def match(self, url: str, query: str) -> Optional[dict]:
+        """Puntuar un único documento frente a la consulta. None si no coincide."""
+        terms = tokenize(query)
+        score = self.score(terms, only=url).get(url)
+        if score is None:
+            return None
+        return self.hit(url, query, score, terms)
+
+    def hit(self, url: str, query: str, relevance: float, terms: Optional[List[str]] = None) -> dict:
+        """Resultado de búsqueda de un documento con la relevancia indicada."""
+        return {
+            "title": self._docs[url]["title"],
+            "url": url,
+            "relevance": round(relevance, 4),
+            "snippet": self.snippet(url, query, tokenize(query) if terms is None else terms),
+        }
+
+    def snippet(self, url: str, query: str, terms: List[str], width: int = 100) -> str:
+        """Extraer un fragmento del contenido alrededor de la primera coincidencia."""
+        content = self._docs[url]["content"]
+        lowered = content.lower()
+        index = lowered.find(query.lower())
+        if index < 0:
+            positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+            index = min(positions) if positions else 0
+        start = max(0, index - width)
+        end = min(len(content), index + width)
+        return f"...{content[start:end].strip()}..."
@@ -0,0 +1,153 @@
+"""Métricas Prometheus y trazas OpenTelemetry del servidor."""
+
+import functools
+import inspect
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+from opentelemetry import trace
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+logger = logging.getLogger("mcp-nav")
+
+# Sin proveedor configurado el tracer es un proxy que no registra nada; setup_tracing le da uno real
+tracer = trace.get_tracer("mcp-nav")
+
+# Buckets en segundos, desde análisis de páginas pequeñas hasta descargas lentas
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+FETCH_SECONDS = Histogram(
+    "mcp_nav_fetch_seconds", "Latencia de las peticiones al origen", ["status"], buckets=LATENCY_BUCKETS
+)
+FETCH_BYTES = Counter("mcp_nav_fetch_bytes_total", "Bytes de cuerpo descargados del origen")
+FETCH_RETRIES = Counter("mcp_nav_fetch_retries_total", "Reintentos de peticiones al origen")
+FETCH_HEDGED = Counter("mcp_nav_fetch_hedged_total", "Peticiones duplicadas al superar el p95 de latencia")
+FETCH_TIMEOUTS = Counter("mcp_nav_fetch_timeouts_total", "Intentos abortados por el timeout adaptativo")
+CIRCUIT_REJECTED = Counter("mcp_nav_circuit_rejected_total", "Peticiones rechazadas con el circuito abierto")
+PAGES_UNCHANGED = Counter(
+    "mcp_nav_pages_unchanged_total", "Páginas revalidadas sin cambios, sin reanalizar ni reindexar", ["reason"]
+)
+STALE_SERVED = Counter("mcp_nav_stale_served_total", "Páginas obsoletas servidas porque el origen falló")
+PARSE_SECONDS = Histogram(
+    "mcp_nav_parse_seconds", "Tiempo de análisis del HTML (árbol y extracción)", ["parser"], buckets=LATENCY_BUCKETS
+)
+CONVERT_SECONDS = Histogram(
+    "mcp_nav_convert_seconds", "Tiempo de conversión del HTML a Markdown", ["parser"], buckets=LATENCY_BUCKETS
+)
+TOOL_SECONDS = Histogram(
+    "mcp_nav_tool_seconds", "Latencia de las tools MCP", ["tool", "status"], buckets=LATENCY_BUCKETS
+)
+ADMISSION_REJECTED = Counter(
+    "mcp_nav_admission_rejected_total", "Peticiones rechazadas por el control de admisión", ["scope"]
+)
+UPSTREAM_INFLIGHT = Gauge("mcp_nav_upstream_inflight", "Peticiones al origen en curso")
+UPSTREAM_QUEUE_DEPTH = Gauge("mcp_nav_upstream_queue_depth", "Peticiones al origen esperando turno")
+
+
+class CacheCollector:
+    """Exponer las estadísticas del caché en memoria en cada lectura de /metrics."""
+
+    COUNTERS = ("hits", "misses", "stale_hits", "revalidations", "evictions", "expirations")
+
+    def __init__(self, stats: Callable[[], Dict]) -> None:
+        self._stats = stats
+
+    def describe(self) -> Iterator:
+        # Sin describe(), el registro llamaría a collect() (y a `stats`) al registrarse
+        yield GaugeMetricFamily("mcp_nav_cache_entries", "Entradas en el caché")
+        yield GaugeMetricFamily("mcp_nav_cache_bytes", "Bytes estimados en el caché")
+        yield GaugeMetricFamily("mcp_nav_cache_hit_ratio", "Proporción de aciertos del caché")
+        for name in self.COUNTERS:
+            yield CounterMetricFamily(f"mcp_nav_cache_{name}", f"Caché: {name}")
+
+    def collect(self) -> Iterator:
+        stats = self._stats()
+        yield GaugeMetricFamily("mcp_nav_cache_entries", "Entradas en el caché", value=stats["entries"])
+        yield GaugeMetricFamily("mcp_nav_cache_bytes", "Bytes estimados en el caché", value=stats["bytes"])
+        yield GaugeMetricFamily("mcp_nav_cache_hit_ratio", "Proporción de aciertos del caché", value=stats["hit_ratio"])
+        for name in self.COUNTERS:
+            yield CounterMetricFamily(f"mcp_nav_cache_{name}", f"Caché: {name}", value=stats[name])
+
+
+def register_cache(stats: Callable[[], Dict]) -> CacheCollector:
+    """Registrar el colector de estadísticas del caché."""
+    collector = CacheCollector(stats)
+    REGISTRY.register(collector)
+    return collector
+
+
+def setup_tracing():
+    """Exportar las trazas por OTLP/HTTP si `OTEL_EXPORTER_OTLP_ENDPOINT` está definida.
+
+    El exportador lee del entorno el resto de su configuración (cabeceras,
+    timeout, etc.). El nombre del servicio es `OTEL_SERVICE_NAME` o `mcp-nav`.
+
+    Returns:
+        El TracerProvider instalado (para cerrarlo al apagar), o None si no se exporta
+    """
+    if not os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return None
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT definida sin el extra `otlp` instalado: trazas desactivadas")
+        return None
+    resource = Resource.create({"service.name": os.environ.get("OTEL_SERVICE_NAME", "mcp-nav")})
+    provider = TracerProvider(resource=resource)
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+def observe_tool(fn: Callable) -> Callable:
+    """Decorador que mide la latencia de una tool (síncrona o asíncrona) y la traza."""
+    name = fn.__name__
+
+    def record(started: float, result) -> None:
+        status = "ok"
+        if isinstance(result, dict) and "error" in result:
+            status = "rejected" if result.get("status") in (429, 503) else "error"
+        TOOL_SECONDS.labels(name, status).observe(time.perf_counter() - started)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = None
+            with tracer.start_as_current_span(f"tool.{name}"):
+                try:
+                    result = await fn(*args, **kwargs)
+                    return result
+                except BaseException:
+                    result = {"error": True}
+                    raise
+                finally:
+                    record(started, result)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = None
+        with tracer.start_as_current_span(f"tool.{name}"):
+            try:
+                result = fn(*args, **kwargs)
+                return result
+            except BaseException:
+                result = {"error": True}
+                raise
+            finally:
+                record(started, result)
+    return wrapper
+
+
+def render() -> bytes:
+    """Serializar todas las métricas en el formato de texto de Prometheus."""
+    return generate_latest(REGISTRY)
+
@@ -0,0 +1,577 @@
+"""Extracción de páginas HTML: título, contenido principal en Markdown y enlaces.
+
+Hay varios backends intercambiables (ver `PARSERS`):
+
+- ``lxml`` y ``selectolax``: parsers en C. Un único recorrido del árbol obtiene
+  el título, el contenedor principal y los enlaces, y el contenedor se convierte
+  a Markdown directamente desde el árbol, sin volver a serializarlo a HTML.
+- ``html.parser``: BeautifulSoup + html2text, la implementación original.
+
+`StreamingParser` analiza el cuerpo a medida que se descarga (incremental con
+lxml), sin llegar a tener la página completa en memoria.
+"""
+
+import re
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import html2text
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax es opcional
+    LexborHTMLParser = None
+
+# Orden de preferencia del contenedor principal
+CONTENT_CANDIDATES = ("main", "article", "div.content", "body")
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "head", "title"}
+BLOCK_TAGS = {
+    "p", "div", "section", "header", "footer", "nav", "main", "article", "aside",
+    "figure", "figcaption", "details", "summary", "dl", "dt", "dd", "form", "body",
+}
+# Etiquetas cuyo contenido se descarta en cuanto se cierran al analizar en streaming
+DROP_TAGS = ("script", "style", "noscript", "template", "svg", "iframe")
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+WHITESPACE_RE = re.compile(r"\s+")
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+ZERO_WIDTH_RE = re.compile("[\u200b-\u200d\u2060\ufeff]")
+# Texto habitual de los enlaces permanentes junto a un encabezado
+PERMALINK_TEXT = {"", "#", "¶", "§", "🔗", "∞"}
+
+
+class TreeBackend:
+    """Acceso uniforme a los nodos de un árbol HTML de un parser concreto."""
+
+    def parse(self, html: Union[str, bytes]):
+        """Analizar el documento y devolver el nodo raíz."""
+        raise NotImplementedError
+
+    def iter_elements(self, root) -> Iterator:
+        """Recorrer todos los elementos del documento en orden."""
+        raise NotImplementedError
+
+    def tag(self, node) -> Optional[str]:
+        """Nombre de la etiqueta en minúsculas, o None para comentarios y similares."""
+        raise NotImplementedError
+
+    def get(self, node, attr: str) -> Optional[str]:
+        """Valor de un atributo."""
+        raise NotImplementedError
+
+    def contents(self, node) -> Iterator:
+        """Hijos del nodo en orden: cadenas para el texto y nodos para los elementos."""
+        raise NotImplementedError
+
+    def text(self, node) -> str:
+        """Texto completo del nodo y sus descendientes."""
+        raise NotImplementedError
+
+    def html(self, node) -> str:
+        """HTML serializado del nodo."""
+        raise NotImplementedError
+
+
+class LxmlBackend(TreeBackend):
+    """Backend sobre lxml.html (libxml2)."""
+
+    def parse(self, html):
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml rechaza cadenas Unicode con declaración de codificación XML
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+
+    def iter_elements(self, root):
+        return root.iter()
+
+    def tag(self, node):
+        return node.tag.lower() if isinstance(node.tag, str) else None
+
+    def get(self, node, attr):
+        return node.get(attr)
+
+    def contents(self, node):
+        if node.text:
+            yield node.text
+        for child in node:
+            yield child
+            if child.tail:
+                yield child.tail
+
+    def text(self, node):
+        return node.text_content()
+
+    def html(self, node):
+        return lxml.html.tostring(node, encoding="unicode")
+
+
+class LexborBackend(TreeBackend):
+    """Backend sobre selectolax (Lexbor)."""
+
+    def parse(self, html):
+        return LexborHTMLParser(html).root
+
+    def iter_elements(self, root):
+        yield root
+        yield from root.traverse(include_text=False)
+
+    def tag(self, node):
+        return None if node.tag.startswith(("-", "_")) else node.tag
+
+    def get(self, node, attr):
+        return node.attributes.get(attr)
+
+    def contents(self, node):
+        for child in node.iter(include_text=True):
+            if child.tag == "-text":
+                yield child.text_content
+            else:
+                yield child
+
+    def text(self, node):
+        return node.text(deep=True)
+
+    def html(self, node):
+        return node.html
+
+
+class MarkdownConverter:
+    """Conversor de un subárbol HTML a Markdown en un solo recorrido recursivo."""
+
+    def __init__(self, backend: TreeBackend) -> None:
+        self.backend = backend
+        # Encabezados con ancla HTML (`id`), en orden: {"title", "anchor"}
+        self.anchors: List[Dict[str, str]] = []
+        self._in_heading = False
+
+    def convert(self, node) -> str:
+        """Convertir un nodo (normalmente el contenedor principal) a Markdown."""
+        lines = []
+        in_code = False
+        for line in self._node(node).split("\n"):
+            if line.startswith("```"):
+                in_code = not in_code
+            elif not in_code and line.startswith(" ") and not line.startswith("  "):
+                # Espacio sobrante entre elementos de bloque
+                line = line[1:]
+            lines.append(line.rstrip())
+        return BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip() + "\n"
+
+    def _children(self, node) -> str:
+        parts = []
+        for item in self.backend.contents(node):
+            if isinstance(item, str):
+                parts.append(WHITESPACE_RE.sub(" ", item))
+            else:
+                parts.append(self._node(item))
+        return "".join(parts)
+
+    def _node(self, node) -> str:
+        backend = self.backend
+        tag = backend.tag(node)
+        if tag is None or tag in SKIP_TAGS:
+            return ""
+        if tag in HEADINGS:
+            text = self._heading_text(node)
+            if not text:
+                return ""
+            anchor = self._anchor(node)
+            if anchor:
+                self.anchors.append({"title": text, "anchor": anchor})
+            return f"\n\n{'#' * HEADINGS[tag]} {text}\n\n"
+        if tag in BLOCK_TAGS:
+            return f"\n\n{self._children(node).strip()}\n\n"
+        if tag == "br":
+            return "\n"
+        if tag == "hr":
+            return "\n\n* * *\n\n"
+        if tag == "pre":
+            return self._pre(node)
+        if tag == "code":
+            text = backend.text(node)
+            return f"`{text}`" if text else ""
+        if tag in ("strong", "b"):
+            text = self._children(node).strip()
+            return f"**{text}**" if text else ""
+        if tag in ("em", "i"):
+            text = self._children(node).strip()
+            return f"_{text}_" if text else ""
+        if tag == "a":
+            text = self._children(node).strip()
+            href = backend.get(node, "href")
+            if self._in_heading and href and href.startswith("#"):
+                # Enlace permanente al propio encabezado: cuenta como ancla, no como texto
+                return "" if ZERO_WIDTH_RE.sub("", text).strip() in PERMALINK_TEXT else text
+            return f"[{text}]({href})" if text and href else text
+        if tag == "img":
+            src = backend.get(node, "src")
+            return f"![{backend.get(node, 'alt') or ''}]({src})" if src else ""
+        if tag in ("ul", "ol"):
+            return self._list(node, ordered=tag == "ol")
+        if tag == "blockquote":
+            body = self._children(node).strip()
+            quoted = "\n".join(f"> {line}" if line else ">" for line in body.split("\n"))
+            return f"\n\n{quoted}\n\n"
+        if tag == "table":
+            return self._table(node)
+        return self._children(node)
+
+    def _heading_text(self, node) -> str:
+        """Texto de un encabezado en una sola línea, sin enlaces permanentes ni caracteres de ancho cero."""
+        self._in_heading = True
+        try:
+            text = self._children(node)
+        finally:
+            self._in_heading = False
+        return WHITESPACE_RE.sub(" ", ZERO_WIDTH_RE.sub("", text)).strip()
+
+    def _anchor(self, node) -> Optional[str]:
+        """Ancla de un encabezado: su `id`, el de un descendiente o el de un enlace `#...` a sí mismo."""
+        backend = self.backend
+        for element in backend.iter_elements(node):
+            anchor = backend.get(element, "id")
+            if anchor:
+                return anchor
+            href = backend.get(element, "href") or ""
+            if href.startswith("#") and len(href) > 1:
+                return href[1:]
+        return None
+
+    def _pre(self, node) -> str:
+        backend = self.backend
+        classes = backend.get(node, "class") or ""
+        for item in backend.contents(node):
+            if not isinstance(item, str) and backend.tag(item) == "code":
+                classes += " " + (backend.get(item, "class") or "")
+        language = next(
+            (cls[len("language-"):] for cls in classes.split() if cls.startswith("language-")), ""
+        )
+        code = backend.text(node).strip("\n")
+        return f"\n\n```{language}\n{code}\n```\n\n"
+
+    def _list(self, node, ordered: bool) -> str:
+        items = []
+        number = 0
+        for item in self.backend.contents(node):
+            if isinstance(item, str) or self.backend.tag(item) != "li":
+                continue
+            number += 1
+            marker = f"{number}." if ordered else "*"
+            body = re.sub(r"\n{2,}", "\n", self._children(item).strip())
+            lines = body.split("\n")
+            indent = " " * (len(marker) + 1)
+            items.append("\n".join([f"{marker} {lines[0]}", *(indent + line for line in lines[1:])]))
+        return "\n\n" + "\n".join(items) + "\n\n" if items else ""
+
+    def _table(self, node) -> str:
+        backend = self.backend
+        rows = []
+        for element in backend.iter_elements(node):
+            if backend.tag(element) != "tr":
+                continue
+            cells = [
+                self._children(cell).strip().replace("\n", " ")
+                for cell in backend.contents(element)
+                if not isinstance(cell, str) and backend.tag(cell) in ("td", "th")
+            ]
+            rows.append("| " + " | ".join(cells) + " |")
+            if len(rows) == 1:
+                rows.append("|" + "---|" * len(cells))
+        return "\n\n" + "\n".join(rows) + "\n\n" if rows else ""
+
+
+def _is_internal(href: str, base_url: str) -> bool:
+    return href.startswith("/") or href.startswith(base_url)
+
+
+def _parse_tree(
+    backend: TreeBackend,
+    html: Union[str, bytes],
+    url: str,
+    base_url: str,
+    keep_html: bool,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Analizar el documento y extraer título, contenido principal y enlaces."""
+    if not html.strip():
+        return _empty_page(url)
+    return _extract(backend, backend.parse(html), url, base_url, keep_html, timings)
+
+
+def _empty_page(url: str) -> Dict:
+    return {"url": url, "title": "Sin título", "content": "", "links": []}
+
+
+def _extract(
+    backend: TreeBackend,
+    root,
+    url: str,
+    base_url: str,
+    keep_html: bool,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Extraer título, contenido principal y enlaces recorriendo el árbol una sola vez."""
+    title = None
+    candidates: Dict[str, object] = {}
+    links: List[Dict[str, str]] = []
+    for element in backend.iter_elements(root):
+        tag = backend.tag(element)
+        if tag == "a":
+            href = backend.get(element, "href")
+            # Solo incluir enlaces al mismo dominio
+            if href and _is_internal(href, base_url):
+                links.append({"text": backend.text(element).strip(), "url": href})
+        elif tag == "title":
+            if title is None:
+                title = backend.text(element).strip()
+        elif tag in ("main", "article", "body"):
+            candidates.setdefault(tag, element)
+        elif tag == "div" and "div.content" not in candidates:
+            if "content" in (backend.get(element, "class") or "").split():
+                candidates["div.content"] = element
+
+    content = next((candidates[name] for name in CONTENT_CANDIDATES if name in candidates), None)
+    started = time.perf_counter()
+    converter = MarkdownConverter(backend)
+    markdown = converter.convert(content) if content is not None else ""
+    if timings is not None:
+        timings["convert"] = time.perf_counter() - started
+    result = {
+        "url": url,
+        "title": title or "Sin título",
+        "content": markdown,
+        "links": links,
+    }
+    if converter.anchors:
+        result["anchors"] = converter.anchors
+    if keep_html and content is not None:
+        result["html"] = backend.html(content)
+    return result
+
+
+def parse_lxml(
+    html: Union[str, bytes],
+    url: str,
+    base_url: str,
+    keep_html: bool = False,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Analizar una página con lxml."""
+    return _parse_tree(LxmlBackend(), html, url, base_url, keep_html, timings)
+
+
+def parse_selectolax(
+    html: Union[str, bytes],
+    url: str,
+    base_url: str,
+    keep_html: bool = False,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Analizar una página con selectolax (Lexbor)."""
+    if LexborHTMLParser is None:
+        raise RuntimeError("El parser 'selectolax' requiere instalar el paquete selectolax")
+    return _parse_tree(LexborBackend(), html, url, base_url, keep_html, timings)
+
+
+def parse_html_parser(
+    html: Union[str, bytes],
+    url: str,
+    base_url: str,
+    keep_html: bool = False,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Analizar una página con BeautifulSoup y convertirla con html2text."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Extraer contenido principal
+    content = soup.find("main") or soup.find("article") or soup.find("div", class_="content") or soup.find("body")
+
+    # Convertir HTML a Markdown
+    started = time.perf_counter()
+    converter = html2text.HTML2Text()
+    converter.ignore_links = False
+    converter.ignore_images = False
+    markdown_content = converter.handle(str(content)) if content else ""
+    if timings is not None:
+        timings["convert"] = time.perf_counter() - started
+
+    # Extraer enlaces de la página
+    links = []
+    for a in soup.find_all("a", href=True):
+        href = a["href"]
+        # Solo incluir enlaces al mismo dominio
+        if _is_internal(href, base_url):
+            links.append({
+                "text": a.get_text().strip(),
+                "url": href
+            })
+
+    result = {
+        "url": url,
+        "title": soup.title.string if soup.title else "Sin título",
+        "content": markdown_content,
+        "links": links,
+    }
+
+    # Opcionalmente incluir HTML original
+    if keep_html and content:
+        result["html"] = str(content)
+
+    return result
+
+
+PARSERS: Dict[str, Callable[..., Dict]] = {
+    "lxml": parse_lxml,
+    "selectolax": parse_selectolax,
+    "html.parser": parse_html_parser,
+}
+
+
+def parse_page(
+    html: Union[str, bytes],
+    url: str,
+    base_url: str,
+    keep_html: bool = False,
+    parser: str = "lxml",
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Analizar una página con el backend indicado.
+
+    Args:
+        html: HTML de la página
+        url: URL completa de la página
+        base_url: URL base del sitio, para filtrar enlaces internos
+        keep_html: Incluir el HTML del contenido principal en el resultado
+        parser: Nombre del backend (ver PARSERS)
+        timings: Si se indica, recibe el tiempo de conversión a Markdown (`convert`, segundos)
+
+    Returns:
+        Diccionario con url, title, content (Markdown), links y opcionalmente html
+    """
+    try:
+        parse = PARSERS[parser]
+    except KeyError:
+        raise ValueError(f"Parser desconocido: {parser!r} (disponibles: {', '.join(PARSERS)})") from None
+    return parse(html, url, base_url, keep_html, timings)
+
+
+def parse_page_bytes(
+    body: bytes,
+    encoding: Optional[str],
+    url: str,
+    base_url: str,
+    keep_html: bool = False,
+    parser: str = "lxml",
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict:
+    """Decodificar el cuerpo de la respuesta y analizarlo con `parse_page`.
+
+    Pensada para ejecutarse en un proceso aparte: recibe solo bytes y tipos
+    simples y devuelve un diccionario compacto, baratos de serializar.
+    """
+    html = body.decode(encoding or "utf-8", errors="replace")
+    return parse_page(html, url, base_url, keep_html, parser, timings)
+
+
+def parse_page_timed(
+    body: bytes,
+    encoding: Optional[str],
+    url: str,
+    base_url: str,
+    keep_html: bool = False,
+    parser: str = "lxml",
+) -> Tuple[Dict, Dict[str, float]]:
+    """Como `parse_page_bytes`, devolviendo además los tiempos en segundos.
+
+    `parse` cubre la decodificación, el árbol y la extracción; `convert`, la
+    conversión a Markdown. Los tiempos viajan con el resultado para poder
+    medirlos también cuando el análisis se hace en otro proceso.
+    """
+    stream = StreamingParser(url, base_url, encoding, keep_html, parser)
+    stream.feed(body)
+    return stream.close()
+
+
+class StreamingParser:
+    """Análisis de una página a medida que llega su cuerpo, trozo a trozo.
+
+    Con lxml cada trozo pasa directamente a libxml2, que decodifica los bytes
+    una sola vez y construye el árbol sobre la marcha: el cuerpo completo no
+    llega a estar en memoria ni como bytes ni como str, y el contenido de
+    `script`, `style` y similares se descarta en cuanto se cierra la etiqueta.
+    Los demás backends no analizan de forma incremental; con ellos los trozos
+    se acumulan y se analizan al cerrar.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        base_url: str,
+        encoding: Optional[str] = None,
+        keep_html: bool = False,
+        parser: str = "lxml",
+    ) -> None:
+        """Preparar el análisis.
+
+        Args:
+            url: URL completa de la página
+            base_url: URL base del sitio, para filtrar enlaces internos
+            encoding: Codificación del cuerpo (la de la respuesta HTTP)
+            keep_html: Incluir el HTML del contenido principal en el resultado
+            parser: Nombre del backend (ver PARSERS)
+        """
+        if parser not in PARSERS:
+            raise ValueError(f"Parser desconocido: {parser!r} (disponibles: {', '.join(PARSERS)})")
+        self.url = url
+        self.base_url = base_url
+        self.encoding = encoding
+        self.keep_html = keep_html
+        self.parser = parser
+        self.size = 0
+        self._elapsed = 0.0
+        self._chunks: List[bytes] = []
+        self._tree = None
+        if parser == "lxml":
+            self._tree = etree.HTMLPullParser(
+                events=("end",), tag=DROP_TAGS, encoding=encoding or "utf-8", remove_comments=True
+            )
+            self._tree.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+
+    def feed(self, data: bytes) -> None:
+        """Añadir el siguiente trozo del cuerpo."""
+        self.size += len(data)
+        if self._tree is None:
+            self._chunks.append(data)
+            return
+        started = time.perf_counter()
+        self._tree.feed(data)
+        for _, element in self._tree.read_events():
+            element.clear(keep_tail=True)
+        self._elapsed += time.perf_counter() - started
+
+    def close(self) -> Tuple[Dict, Dict[str, float]]:
+        """Terminar el análisis y devolver el resultado y los tiempos (como `parse_page_timed`)."""
+        timings = {"convert": 0.0}
+        started = time.perf_counter()
+        if self._tree is None:
+            body = b"".join(self._chunks)
+            self._chunks.clear()
+            result = parse_page_bytes(
+                body, self.encoding, self.url, self.base_url, self.keep_html, self.parser, timings
+            )
+        else:
+            try:
+                root = self._tree.close()
+            except etree.XMLSyntaxError:
+                root = None
+            self._tree = None
+            if root is None:
+                result = _empty_page(self.url)
+            else:
+                result = _extract(LxmlBackend(), root, self.url, self.base_url, self.keep_html, timings)
+        timings["parse"] = self._elapsed + time.perf_counter() - started - timings["convert"]
+        return result, timings
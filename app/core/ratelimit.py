@@ -0,0 +1,223 @@
+"""Control de admisión: token buckets por cliente y límite global de peticiones al origen."""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+
+from app.core.metrics import ADMISSION_REJECTED, UPSTREAM_INFLIGHT, UPSTREAM_QUEUE_DEPTH
+
+logger = logging.getLogger("mcp-nav")
+
+# Rellena y consume un token de forma atómica; usa el reloj de Redis para que
+# todas las réplicas vean el mismo bucket
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class Decision(NamedTuple):
+    """Resultado de pedir un token: si se admite, tokens restantes y espera sugerida."""
+
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class UpstreamOverloaded(Exception):
+    """La cola de peticiones al origen está llena; se rechaza sin esperar."""
+
+    def __init__(self, queued: int) -> None:
+        super().__init__(f"Demasiadas peticiones al origen en espera ({queued})")
+        self.queued = queued
+
+
+class RateLimiter:
+    """Token bucket por cliente: `requests` peticiones por `window` segundos.
+
+    Cada cliente dispone de hasta `requests` tokens que se reponen a ritmo
+    constante, así que se admiten ráfagas del tamaño de la ventana y el ritmo
+    sostenido queda acotado a `requests / window` por segundo.
+
+    Con un cliente de Redis los buckets se comparten entre réplicas; si Redis
+    falla se usan los buckets locales, de forma que una caída de Redis no
+    bloquea las peticiones.
+    """
+
+    def __init__(
+        self,
+        requests: int,
+        window: float,
+        client: Optional["redis.Redis"] = None,
+        prefix: str = "mcp-nav:ratelimit:",
+        max_clients: int = 10000,
+    ) -> None:
+        """Inicializar el limitador.
+
+        Args:
+            requests: Peticiones admitidas por ventana (0 desactiva el límite)
+            window: Duración de la ventana en segundos
+            client: Cliente asíncrono de Redis para compartir los buckets
+            prefix: Prefijo de las claves en Redis
+            max_clients: Buckets locales que se conservan (se descartan los más antiguos)
+        """
+        self.capacity = float(requests)
+        self.rate = requests / window if window > 0 else float(requests)
+        self.client = client
+        self.prefix = prefix
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+
+    @classmethod
+    def from_url(cls, url: str, requests: int, window: float, **kwargs) -> "RateLimiter":
+        """Crear un limitador compartido a partir de una URL de Redis (`settings.get_redis_url()`)."""
+        return cls(requests, window, client=redis.from_url(url), **kwargs)
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _take_local(self, key: Hashable) -> Decision:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.capacity, now]
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return Decision(True, bucket[0], 0.0)
+        bucket[0] = tokens
+        return Decision(False, tokens, (1 - tokens) / self.rate)
+
+    async def acquire(self, key: Hashable) -> Decision:
+        """Consumir un token del cliente `key`."""
+        if not self.enabled:
+            return Decision(True, float("inf"), 0.0)
+        if self.client is not None:
+            try:
+                allowed, remaining, retry_after = await self.client.eval(
+                    TOKEN_BUCKET_SCRIPT, 1, f"{self.prefix}{key}", self.rate, self.capacity
+                )
+                return Decision(bool(allowed), float(remaining), float(retry_after))
+            except RedisError as e:
+                logger.warning(f"Error en el rate limit de Redis, se usa el local: {e}")
+        return self._take_local(key)
+
+    async def aclose(self) -> None:
+        """Cerrar la conexión con Redis."""
+        if self.client is not None:
+            await self.client.aclose()
+
+
+class UpstreamGate:
+    """Límite global de peticiones simultáneas al origen con cola acotada.
+
+    Hasta `max_concurrency` peticiones en curso; las siguientes esperan turno
+    mientras haya sitio en la cola (`max_queue`) y, si no, se rechazan al
+    instante con `UpstreamOverloaded` en lugar de acumular latencia.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int) -> None:
+        """Inicializar el límite.
+
+        Args:
+            max_concurrency: Peticiones al origen simultáneas (0 sin límite)
+            max_queue: Peticiones que pueden esperar turno
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self.inflight = 0
+        self.queued = 0
+
+    async def __aenter__(self) -> "UpstreamGate":
+        if self._slots is not None and self._slots.locked():
+            if self.queued >= self.max_queue:
+                ADMISSION_REJECTED.labels("upstream").inc()
+                raise UpstreamOverloaded(self.queued)
+            self.queued += 1
+            UPSTREAM_QUEUE_DEPTH.inc()
+            try:
+                await self._slots.acquire()
+            finally:
+                self.queued -= 1
+                UPSTREAM_QUEUE_DEPTH.dec()
+        elif self._slots is not None:
+            await self._slots.acquire()
+        self.inflight += 1
+        UPSTREAM_INFLIGHT.inc()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.inflight -= 1
+        UPSTREAM_INFLIGHT.dec()
+        if self._slots is not None:
+            self._slots.release()
+
+    @property
+    def saturated(self) -> bool:
+        """True si una petición nueva tendría que esperar turno."""
+        return self._slots is not None and self._slots.locked()
+
+    def stats(self) -> Dict[str, int]:
+        """Peticiones en curso y en espera."""
+        return {"inflight": self.inflight, "queued": self.queued, "max_concurrency": self.max_concurrency}
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI que aplica un `RateLimiter` por dirección del cliente.
+
+    Las peticiones sin token se responden al momento con un 429 y la cabecera
+    `Retry-After`, sin llegar a la aplicación.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, exempt=("/ping", "/metrics")) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.exempt = set(exempt)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        decision = await self.limiter.acquire(client[0] if client else "anonymous")
+        if not decision.allowed:
+            ADMISSION_REJECTED.labels("client").inc()
+            response = JSONResponse(
+                {"detail": "Too Many Requests", "retry_after": round(decision.retry_after, 3)},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(decision.retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,158 @@
+"""Resiliencia de las peticiones al origen: timeouts adaptativos, hedging y circuit breaker."""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("mcp-nav")
+
+
+class CircuitOpen(Exception):
+    """El circuito del host está abierto: la petición se rechaza sin llegar al origen."""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"El origen {host} no responde; se reintentará en {retry_after:.0f} s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def is_transient(error: BaseException) -> bool:
+    """Si un error indica un problema del origen (timeout, conexión, 5xx, 408 o 429) y no de la petición."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status >= 500 or status in (408, 429)
+    return isinstance(error, (httpx.TransportError, TimeoutError))
+
+
+class LatencyTracker:
+    """Latencias recientes de un host y los plazos que se derivan de sus percentiles.
+
+    Con menos de `min_samples` muestras no hay percentiles fiables: el timeout
+    es el máximo configurado y no se hacen peticiones duplicadas.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        factor: float = 3.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 30.0,
+    ) -> None:
+        """Inicializar el registro.
+
+        Args:
+            window: Número de latencias recientes que se conservan
+            min_samples: Muestras necesarias para usar los percentiles
+            factor: Multiplicador del p99 para el timeout de cada intento
+            min_timeout: Timeout mínimo (segundos)
+            max_timeout: Timeout máximo, y el que se usa sin muestras suficientes
+        """
+        self.min_samples = min_samples
+        self.factor = factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._sorted: Optional[list] = None
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float) -> None:
+        """Anotar la duración de una petición completada."""
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil `q` (0-100) de las latencias recientes, o None sin muestras suficientes."""
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self._samples)
+        position = max(0, math.ceil(q / 100 * len(self._sorted)) - 1)
+        return self._sorted[position]
+
+    def timeout(self) -> float:
+        """Plazo para un intento: `factor` veces el p99, acotado entre el mínimo y el máximo."""
+        p99 = self.percentile(99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.factor))
+
+    def hedge_delay(self) -> Optional[float]:
+        """Espera antes de lanzar una petición duplicada (el p95), o None si aún no se sabe."""
+        return self.percentile(95)
+
+
+class CircuitBreaker:
+    """Circuit breaker de un host: cerrado, abierto o semiabierto.
+
+    Tras `failures` fallos transitorios seguidos el circuito se abre y las
+    peticiones se rechazan al instante durante `reset_timeout` segundos; después
+    se deja pasar una sola petición de prueba (semiabierto), que lo cierra si
+    tiene éxito o lo vuelve a abrir si falla.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, host: str, failures: int = 5, reset_timeout: float = 30.0) -> None:
+        """Inicializar el circuito.
+
+        Args:
+            host: Host al que protege (para los mensajes)
+            failures: Fallos seguidos que abren el circuito (0 lo desactiva)
+            reset_timeout: Segundos que permanece abierto antes de probar de nuevo
+        """
+        self.host = host
+        self.max_failures = failures
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def check(self) -> None:
+        """Admitir una petición o lanzar CircuitOpen si el circuito no la deja pasar."""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        now = time.monotonic()
+        # Una prueba cancelada no termina nunca: pasado otro plazo se admite una nueva
+        if state == self.HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.reset_timeout):
+            self._probe_at = now
+            return
+        retry_after = max(0.0, self._opened_at + self.reset_timeout - now)
+        raise CircuitOpen(self.host, retry_after)
+
+    def record_success(self) -> None:
+        """El origen respondió: cerrar el circuito."""
+        if self._opened_at is not None:
+            logger.info(f"Circuito cerrado para {self.host}")
+        self.failures = 0
+        self._opened_at = None
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        """Anotar un fallo transitorio; abre el circuito al llegar al límite o si falla la prueba."""
+        self.failures += 1
+        if self.max_failures <= 0:
+            return
+        if self._probe_at is not None or (self._opened_at is None and self.failures >= self.max_failures):
+            logger.warning(f"Circuito abierto para {self.host} tras {self.failures} fallos seguidos")
+            self._opened_at = time.monotonic()
+            self._probe_at = None
+
+    def stats(self) -> Dict:
+        """Estado y fallos seguidos."""
+        return {"state": self.state, "failures": self.failures}
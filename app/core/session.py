@@ -0,0 +1,109 @@
+"""Estado de navegación por sesión MCP (URL actual e historial)."""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List
+
+
+class NavigationState:
+    """Cursor e historial de navegación de un cliente.
+
+    El historial conserva el orden de la primera visita, está acotado a
+    `max_history` URLs (se descartan las más antiguas) y comprueba la
+    pertenencia en O(1).
+    """
+
+    def __init__(self, start_url: str, max_history: int = 100) -> None:
+        """Inicializar el estado.
+
+        Args:
+            start_url: URL inicial
+            max_history: Número máximo de URLs en el historial
+        """
+        self.current_url = start_url
+        self.max_history = max_history
+        self._history: "OrderedDict[str, None]" = OrderedDict([(start_url, None)])
+        self.last_seen = time.monotonic()
+
+    @property
+    def history(self) -> List[str]:
+        """URLs visitadas, en orden de primera visita."""
+        return list(self._history)
+
+    def visit(self, url: str) -> None:
+        """Registrar la navegación a una URL."""
+        self.current_url = url
+        if url not in self._history:
+            self._history[url] = None
+            if len(self._history) > self.max_history:
+                self._history.popitem(last=False)
+
+
+class SessionRegistry:
+    """Estados de navegación por sesión, con expulsión de sesiones inactivas.
+
+    Las sesiones sin actividad durante `idle_ttl` segundos se eliminan en
+    barridos periódicos, y si se supera `max_sessions` se expulsa la usada
+    hace más tiempo.
+    """
+
+    def __init__(
+        self,
+        start_url: str,
+        max_history: int = 100,
+        idle_ttl: float = 1800,
+        max_sessions: int = 1000,
+    ) -> None:
+        """Inicializar el registro.
+
+        Args:
+            start_url: URL inicial de cada sesión nueva
+            max_history: Tamaño máximo del historial de cada sesión
+            idle_ttl: Segundos de inactividad tras los que se expulsa una sesión
+            max_sessions: Número máximo de sesiones simultáneas
+        """
+        self.start_url = start_url
+        self.max_history = max_history
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[Hashable, NavigationState]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._sessions
+
+    def get(self, key: Hashable) -> NavigationState:
+        """Obtener (o crear) el estado de una sesión y marcarla como activa."""
+        now = time.monotonic()
+        if now - self._last_sweep >= self.idle_ttl / 4:
+            self.evict_idle(now)
+        state = self._sessions.get(key)
+        if state is None:
+            state = self._sessions[key] = NavigationState(self.start_url, self.max_history)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(key)
+        state.last_seen = now
+        return state
+
+    def evict_idle(self, now: float = None) -> int:
+        """Eliminar las sesiones inactivas. Devuelve cuántas se eliminaron."""
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        evicted = 0
+        # Las sesiones están ordenadas de menos a más reciente
+        while self._sessions:
+            key, state = next(iter(self._sessions.items()))
+            if now - state.last_seen < self.idle_ttl:
+                break
+            del self._sessions[key]
+            evicted += 1
+        return evicted
+
+    def stats(self) -> Dict[str, int]:
+        """Obtener el número de sesiones activas."""
+        return {"sessions": len(self._sessions), "max_sessions": self.max_sessions}
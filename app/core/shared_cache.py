@@ -0,0 +1,188 @@
+"""Caché de páginas compartido entre réplicas (segundo nivel en Redis)."""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+import zlib
+from typing import Dict, Iterable, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("mcp-nav")
+
+# Libera el lock solo si sigue perteneciendo a quien lo adquirió
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class RedisPageCache:
+    """Segundo nivel de caché en Redis con resultados comprimidos.
+
+    Cada entrada guarda el resultado de la página, sus validadores HTTP y el
+    instante en que se almacenó, serializados en JSON y comprimidos con zlib.
+    Un lock por URL (`SET NX PX`) permite que solo una réplica descargue una
+    página ausente mientras las demás esperan su resultado.
+
+    Los errores de Redis se registran y se tratan como fallos de caché, de
+    forma que una caída de Redis no interrumpe la navegación.
+    """
+
+    def __init__(
+        self,
+        client: "redis.Redis",
+        ttl: int,
+        stale_ttl: int = 0,
+        prefix: str = "mcp-nav:page:",
+        lock_ttl: float = 30,
+        compress_level: int = 6,
+    ) -> None:
+        """Inicializar el caché compartido.
+
+        Args:
+            client: Cliente asíncrono de Redis
+            ttl: Segundos que una entrada se considera válida
+            stale_ttl: Segundos adicionales que Redis conserva una entrada caducada
+            prefix: Prefijo de las claves en Redis
+            lock_ttl: Duración máxima (segundos) del lock de descarga
+            compress_level: Nivel de compresión zlib
+        """
+        self.client = client
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.prefix = prefix
+        self.lock_ttl = lock_ttl
+        self.compress_level = compress_level
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisPageCache":
+        """Crear el caché a partir de una URL de conexión (`settings.get_redis_url()`)."""
+        return cls(redis.from_url(url), **kwargs)
+
+    def _key(self, url: str) -> str:
+        return f"{self.prefix}{url}"
+
+    def _lock_key(self, url: str) -> str:
+        return f"{self.prefix}lock:{url}"
+
+    def _dumps(self, entry: Dict) -> bytes:
+        return zlib.compress(json.dumps(entry).encode("utf-8"), self.compress_level)
+
+    def _loads(self, raw: Optional[bytes]) -> Optional[Dict]:
+        if raw is None:
+            return None
+        entry = json.loads(zlib.decompress(raw))
+        entry["age"] = max(0.0, time.time() - entry["stored_at"])
+        entry["fresh"] = entry["age"] < self.ttl
+        return entry
+
+    async def get(self, url: str) -> Optional[Dict]:
+        """Obtener una entrada (`data`, `validators`, `age`, `fresh`) o None."""
+        try:
+            return self._loads(await self.client.get(self._key(url)))
+        except RedisError as e:
+            logger.warning(f"Error al leer {url} de Redis: {e}")
+            return None
+
+    async def get_many(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """Obtener varias entradas en un solo viaje de ida y vuelta (MGET)."""
+        urls = list(urls)
+        if not urls:
+            return {}
+        try:
+            raws = await self.client.mget([self._key(url) for url in urls])
+        except RedisError as e:
+            logger.warning(f"Error en MGET de Redis: {e}")
+            return {}
+        entries = {url: self._loads(raw) for url, raw in zip(urls, raws)}
+        return {url: entry for url, entry in entries.items() if entry is not None}
+
+    async def set(self, url: str, data: Dict, validators: Optional[Dict[str, str]] = None) -> None:
+        """Guardar el resultado de una página durante `ttl + stale_ttl` segundos."""
+        entry = {"data": data, "validators": validators or {}, "stored_at": time.time()}
+        try:
+            await self.client.set(self._key(url), self._dumps(entry), ex=self.ttl + self.stale_ttl)
+        except RedisError as e:
+            logger.warning(f"Error al guardar {url} en Redis: {e}")
+
+    async def touch(self, url: str) -> bool:
+        """Renovar `stored_at` y la caducidad de una entrada que sigue vigente en el origen."""
+        try:
+            raw = await self.client.get(self._key(url))
+            if raw is None:
+                return False
+            entry = json.loads(zlib.decompress(raw))
+            entry["stored_at"] = time.time()
+            await self.client.set(self._key(url), self._dumps(entry), ex=self.ttl + self.stale_ttl)
+            return True
+        except RedisError as e:
+            logger.warning(f"Error al renovar {url} en Redis: {e}")
+            return False
+
+    async def delete(self, url: str) -> None:
+        """Eliminar la página guardada de una URL."""
+        try:
+            await self.client.delete(self._key(url))
+        except RedisError as e:
+            logger.warning(f"Error al borrar {url} de Redis: {e}")
+
+    async def acquire(self, url: str) -> Optional[str]:
+        """Intentar adquirir el lock de descarga de una URL. Devuelve el token o None.
+
+        Si Redis no está disponible se devuelve un token igualmente, para que
+        la réplica descargue la página por su cuenta.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.set(
+                self._lock_key(url), token, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except RedisError as e:
+            logger.warning(f"Error al adquirir el lock de {url} en Redis: {e}")
+            return token
+        return token if acquired else None
+
+    async def release(self, url: str, token: str) -> None:
+        """Liberar el lock de descarga si sigue perteneciendo a `token`."""
+        try:
+            await self.client.eval(RELEASE_SCRIPT, 1, self._lock_key(url), token)
+        except RedisError as e:
+            logger.warning(f"Error al liberar el lock de {url} en Redis: {e}")
+
+    async def wait_for(self, url: str, timeout: float, interval: float = 0.1) -> Optional[Dict]:
+        """Esperar a que otra réplica publique una entrada válida de la URL."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            entry = await self.get(url)
+            if entry is not None and entry["fresh"]:
+                return entry
+            try:
+                locked = await self.client.exists(self._lock_key(url))
+            except RedisError:
+                return None
+            if not locked:
+                # El lock se liberó: puede que justo se haya publicado la entrada
+                entry = await self.get(url)
+                return entry if entry is not None and entry["fresh"] else None
+            await asyncio.sleep(interval)
+        return None
+
+    async def clear(self) -> int:
+        """Eliminar todas las páginas guardadas con el prefijo. Devuelve cuántas."""
+        deleted = 0
+        try:
+            async for key in self.client.scan_iter(match=f"{self.prefix}*", count=500):
+                deleted += await self.client.delete(key)
+        except RedisError as e:
+            logger.warning(f"Error al limpiar Redis: {e}")
+        return deleted
+
+    async def aclose(self) -> None:
+        """Cerrar la conexión con Redis."""
+        await self.client.aclose()
@@ -0,0 +1,347 @@
+"""Almacén persistente de páginas en disco, direccionado por contenido."""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("mcp-nav")
+
+# Cabecera de cada registro del segmento: sha256 del contenido + longitud comprimida
+RECORD_HEADER = struct.Struct("<32sI")
+
+
+class PageStore:
+    """Almacén de resultados de páginas con segmento de solo-anexado y lectura por mmap.
+
+    - ``segment.dat``: registros ``cabecera + JSON comprimido`` con el resultado
+      de cada página (sin la URL). Cada contenido distinto se guarda una sola
+      vez, identificado por su hash, aunque se haya llegado a él por varias URLs.
+    - ``urls.jsonl``: índice compacto URL -> hash, validadores HTTP e instante
+      de descarga; la última línea de cada URL es la vigente.
+
+    Al abrirse solo se recorren las cabeceras del segmento y el índice, por lo
+    que el arranque cuesta milisegundos; el contenido se descomprime al leerlo.
+
+    Varios procesos (los workers del servidor) pueden compartir el mismo
+    almacén: las escrituras se serializan con un `flock` sobre ``store.lock`` y
+    cada proceso incorpora, antes de leer, lo que los demás hayan añadido desde
+    la última vez (solo lo nuevo de cada fichero) o, si otro compactó, vuelve a
+    abrirlo. Así el segmento, leído por mmap desde la caché de páginas del
+    sistema operativo, hace de caché compartido entre workers.
+    """
+
+    SEGMENT = "segment.dat"
+    URLS = "urls.jsonl"
+    LOCK = "store.lock"
+
+    def __init__(self, path: str, compress_level: int = 6) -> None:
+        """Abrir (o crear) el almacén en un directorio.
+
+        Args:
+            path: Directorio del almacén
+            compress_level: Nivel de compresión zlib
+        """
+        self.path = path
+        self.compress_level = compress_level
+        os.makedirs(path, exist_ok=True)
+        self._blobs: Dict[bytes, Tuple[int, int]] = {}
+        self._urls: Dict[str, Dict] = {}
+        self._url_lines = 0
+        self._scanned = 0
+        self._url_offset = 0
+        self._changed: Set[str] = set()
+        self._mmap: Optional[mmap.mmap] = None
+        self._lock_file = open(os.path.join(path, self.LOCK), "a")
+        self._open()
+        self._load()
+        if self._url_lines > 2 * len(self._urls) + 100:
+            self.compact()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._urls
+
+    def _open(self) -> None:
+        self._segment = open(os.path.join(self.path, self.SEGMENT), "a+b")
+        self._url_log = open(os.path.join(self.path, self.URLS), "a", encoding="utf-8")
+        self._inodes = self._file_ids()
+
+    def _file_ids(self) -> Tuple[int, int]:
+        return (
+            os.stat(os.path.join(self.path, self.SEGMENT)).st_ino,
+            os.stat(os.path.join(self.path, self.URLS)).st_ino,
+        )
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusión entre procesos para escribir en el almacén."""
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _remap(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._segment.flush()
+        if os.fstat(self._segment.fileno()).st_size:
+            self._mmap = mmap.mmap(self._segment.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _load(self) -> None:
+        """Leer las cabeceras del segmento y el índice de URLs desde el principio."""
+        self._blobs.clear()
+        self._urls.clear()
+        self._url_lines = 0
+        self._scanned = 0
+        self._url_offset = 0
+        self._scan_segment()
+        if self._scanned < os.fstat(self._segment.fileno()).st_size:
+            logger.warning(f"Registro incompleto al final de {self.SEGMENT}; se ignora")
+        self._scan_urls()
+        self._changed.clear()
+
+    def _scan_segment(self) -> None:
+        """Incorporar los registros completos añadidos al segmento desde la última lectura."""
+        size = os.fstat(self._segment.fileno()).st_size
+        if size <= self._scanned:
+            return
+        self._remap()
+        offset = self._scanned
+        while offset + RECORD_HEADER.size <= size:
+            digest, length = RECORD_HEADER.unpack_from(self._mmap, offset)
+            if offset + RECORD_HEADER.size + length > size:
+                break
+            self._blobs[digest] = (offset + RECORD_HEADER.size, length)
+            offset += RECORD_HEADER.size + length
+        self._scanned = offset
+
+    def _scan_urls(self) -> None:
+        """Incorporar las líneas completas añadidas al índice de URLs desde la última lectura."""
+        if os.fstat(self._url_log.fileno()).st_size <= self._url_offset:
+            return
+        with open(os.path.join(self.path, self.URLS), "rb") as url_log:
+            url_log.seek(self._url_offset)
+            for line in url_log:
+                if not line.endswith(b"\n"):
+                    break
+                self._url_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._url_lines += 1
+                if entry["hash"] is None:
+                    # Página eliminada del sitio
+                    if self._urls.pop(entry["url"], None) is not None:
+                        self._changed.add(entry["url"])
+                    continue
+                digest = bytes.fromhex(entry["hash"])
+                if digest not in self._blobs:
+                    self._scan_segment()
+                if digest in self._blobs:
+                    self._urls[entry["url"]] = entry
+                    self._changed.add(entry["url"])
+
+    def _sync(self) -> None:
+        """Incorporar lo que otros procesos hayan escrito (o reabrir si otro compactó)."""
+        try:
+            replaced = self._file_ids() != self._inodes
+        except FileNotFoundError:
+            return
+        if replaced:
+            before = {url: entry["stored_at"] for url, entry in self._urls.items()}
+            changed = self._changed
+            self._close_files()
+            self._open()
+            self._load()
+            changed.update(url for url, entry in self._urls.items() if before.get(url) != entry["stored_at"])
+            changed.update(url for url in before if url not in self._urls)
+            self._changed = changed
+            return
+        self._scan_segment()
+        self._scan_urls()
+
+    def refresh(self) -> List[str]:
+        """URLs guardadas o renovadas por otros procesos desde la llamada anterior."""
+        self._sync()
+        changed = list(self._changed)
+        self._changed.clear()
+        return changed
+
+    def _read_blob(self, digest: bytes) -> Dict:
+        offset, length = self._blobs[digest]
+        if self._mmap is None or offset + length > len(self._mmap):
+            self._remap()
+        return json.loads(zlib.decompress(self._mmap[offset:offset + length]))
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Obtener una página guardada (`data`, `hash`, `validators`, `age`) o None."""
+        self._sync()
+        entry = self._urls.get(url)
+        if entry is None:
+            return None
+        data = self._read_blob(bytes.fromhex(entry["hash"]))
+        data["url"] = url
+        return {"data": data, **self._info(entry)}
+
+    def info(self, url: str) -> Optional[Dict]:
+        """Hash del contenido, validadores y edad de una URL, sin leer la página. None si no está."""
+        self._sync()
+        entry = self._urls.get(url)
+        return None if entry is None else self._info(entry)
+
+    @staticmethod
+    def _info(entry: Dict) -> Dict:
+        return {
+            "hash": entry["hash"],
+            "validators": entry["validators"],
+            "age": max(0.0, time.time() - entry["stored_at"]),
+        }
+
+    def put(self, url: str, data: Dict, validators: Optional[Dict[str, str]] = None) -> bool:
+        """Guardar una página. Devuelve True si su contenido no estaba ya almacenado."""
+        body = {key: value for key, value in data.items() if key != "url"}
+        raw = json.dumps(body, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(raw).digest()
+        payload = None
+        if digest not in self._blobs:
+            payload = zlib.compress(raw, self.compress_level)
+        with self._locked():
+            self._sync()
+            is_new = digest not in self._blobs
+            if is_new:
+                self._segment.seek(0, os.SEEK_END)
+                offset = self._segment.tell()
+                if offset > self._scanned:
+                    # Resto de una escritura interrumpida: nadie más escribe mientras se tiene el lock
+                    self._segment.truncate(self._scanned)
+                    offset = self._scanned
+                if payload is None:
+                    payload = zlib.compress(raw, self.compress_level)
+                self._segment.write(RECORD_HEADER.pack(digest, len(payload)) + payload)
+                self._segment.flush()
+                self._blobs[digest] = (offset + RECORD_HEADER.size, len(payload))
+                self._scanned = offset + RECORD_HEADER.size + len(payload)
+            self._append_url(url, digest.hex(), validators or {})
+        return is_new
+
+    def touch(self, url: str) -> bool:
+        """Renovar el instante de descarga de una URL (revalidada con un 304)."""
+        with self._locked():
+            self._sync()
+            entry = self._urls.get(url)
+            if entry is None:
+                return False
+            self._append_url(url, entry["hash"], entry["validators"])
+        return True
+
+    def delete(self, url: str) -> bool:
+        """Olvidar una URL (su contenido se libera en la siguiente compactación)."""
+        with self._locked():
+            self._sync()
+            if url not in self._urls:
+                return False
+            self._append_url(url, None, {})
+        return True
+
+    def _append_url(self, url: str, digest: Optional[str], validators: Dict[str, str]) -> None:
+        """Añadir una línea al índice de URLs (con el lock tomado y el índice al día); sin hash, la borra."""
+        entry = {"url": url, "hash": digest, "validators": validators, "stored_at": time.time()}
+        line = json.dumps(entry) + "\n"
+        self._url_log.write(line)
+        self._url_log.flush()
+        self._url_offset += len(line.encode("utf-8"))
+        if digest is None:
+            self._urls.pop(url, None)
+        else:
+            self._urls[url] = entry
+        self._url_lines += 1
+        if self._url_lines > 2 * len(self._urls) + 100:
+            # Las renovaciones (touch) solo añaden líneas: se reescribe el índice sin tocar el segmento
+            self._compact_urls()
+
+    def _compact_urls(self) -> None:
+        """Reescribir el índice de URLs solo con las entradas vigentes (con el lock tomado)."""
+        urls_tmp = os.path.join(self.path, self.URLS + ".tmp")
+        with open(urls_tmp, "w", encoding="utf-8") as url_log:
+            for entry in self._urls.values():
+                url_log.write(json.dumps(entry) + "\n")
+        self._url_log.close()
+        os.replace(urls_tmp, os.path.join(self.path, self.URLS))
+        self._url_log = open(os.path.join(self.path, self.URLS), "a", encoding="utf-8")
+        self._inodes = self._file_ids()
+        self._url_offset = os.fstat(self._url_log.fileno()).st_size
+        self._url_lines = len(self._urls)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Recorrer todas las páginas guardadas como pares (url, entrada)."""
+        self._sync()
+        for url in list(self._urls):
+            entry = self.get(url)
+            if entry is not None:
+                yield url, entry
+
+    def stats(self) -> Dict:
+        """Obtener el tamaño del almacén."""
+        return {
+            "urls": len(self._urls),
+            "blobs": len(self._blobs),
+            "segment_bytes": os.fstat(self._segment.fileno()).st_size,
+        }
+
+    def clear(self) -> None:
+        """Olvidar todas las URLs y vaciar los ficheros (los demás procesos lo ven como borrados)."""
+        with self._locked():
+            self._sync()
+            self._urls.clear()
+            self._compact()
+
+    def compact(self) -> None:
+        """Reescribir el segmento y el índice solo con los contenidos y URLs vigentes."""
+        with self._locked():
+            self._sync()
+            self._compact()
+
+    def _compact(self) -> None:
+        live = {bytes.fromhex(entry["hash"]) for entry in self._urls.values()}
+        segment_tmp = os.path.join(self.path, self.SEGMENT + ".tmp")
+        urls_tmp = os.path.join(self.path, self.URLS + ".tmp")
+        with open(segment_tmp, "wb") as segment:
+            for digest in live:
+                offset, length = self._blobs[digest]
+                if self._mmap is None or offset + length > len(self._mmap):
+                    self._remap()
+                segment.write(RECORD_HEADER.pack(digest, length) + self._mmap[offset:offset + length])
+        with open(urls_tmp, "w", encoding="utf-8") as url_log:
+            for entry in self._urls.values():
+                url_log.write(json.dumps(entry) + "\n")
+
+        self._close_files()
+        os.replace(urls_tmp, os.path.join(self.path, self.URLS))
+        os.replace(segment_tmp, os.path.join(self.path, self.SEGMENT))
+        self._open()
+        self._load()
+
+    def _close_files(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._segment.close()
+        self._url_log.close()
+
+    def close(self) -> None:
+        """Cerrar los ficheros del almacén."""
+        self._close_files()
+        self._lock_file.close()
@@ -0,0 +1,290 @@
+"""Búsqueda semántica: embeddings de fragmentos de página en una matriz NumPy."""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.core.chunks import ChunkedContent
+from app.core.index import tokenize
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover - dependencia opcional
+    SentenceTransformer = None
+
+logger = logging.getLogger("mcp-nav")
+
+SUFFIXES = ("ations", "ation", "ings", "ing", "ers", "er", "ies", "ed", "es", "s")
+
+
+def _stem(term: str) -> str:
+    """Recortar sufijos frecuentes para que variantes de una palabra compartan dimensión."""
+    for suffix in SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 3:
+            return term[:-len(suffix)]
+    return term
+
+
+class HashingEmbedder:
+    """Embeddings sin modelo: términos y bigramas con hashing trick y tf sublineal.
+
+    No captura sinónimos como un modelo neuronal, pero el recorte de sufijos,
+    los bigramas y la comparación por fragmentos (y no por página) encuentran
+    reformulaciones que la búsqueda por términos exactos pierde.
+    """
+
+    def __init__(self, dim: int = 1024) -> None:
+        self.dim = dim
+        self.identity = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Vectores normalizados (L2) de cada texto."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            terms = [_stem(term) for term in tokenize(text)]
+            features = Counter(terms)
+            features.update(f"{a} {b}" for a, b in zip(terms, terms[1:]))
+            for feature, count in features.items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings con un modelo local de sentence-transformers (CPU)."""
+
+    def __init__(self, model: str) -> None:
+        if SentenceTransformer is None:
+            raise RuntimeError("Los embeddings con modelo requieren instalar sentence-transformers")
+        self.model = SentenceTransformer(model, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.identity = f"st-{model}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Vectores normalizados (L2) de cada texto."""
+        return self.model.encode(texts, normalize_embeddings=True, convert_to_numpy=True).astype(np.float32)
+
+
+def make_embedder(model: str = ""):
+    """Embedder para un nombre de modelo (vacío o `hashing` para el de hashing)."""
+    if not model or model == "hashing":
+        return HashingEmbedder()
+    return SentenceTransformerEmbedder(model)
+
+
+def hybrid_scores(lexical: Dict[str, float], semantic: Dict[str, float], alpha: float = 0.5) -> Dict[str, float]:
+    """Combinar puntuaciones BM25 (normalizadas por la máxima) y similitudes coseno.
+
+    Args:
+        lexical: Puntuación BM25 por URL
+        semantic: Similitud coseno por URL
+        alpha: Peso de la parte semántica (0 solo léxica, 1 solo semántica)
+    """
+    top = max(lexical.values(), default=0.0) or 1.0
+    return {
+        url: alpha * max(semantic.get(url, 0.0), 0.0) + (1 - alpha) * lexical.get(url, 0.0) / top
+        for url in set(lexical) | set(semantic)
+    }
+
+
+class VectorIndex:
+    """Índice de fragmentos de página con sus embeddings en una matriz NumPy.
+
+    Cada página se divide en fragmentos (ver `ChunkedContent`) y cada
+    fragmento es una fila de la matriz. Al reindexar una URL solo se vuelven a
+    calcular sus embeddings si su contenido cambió; las filas liberadas se
+    reutilizan. La búsqueda es un único producto matriz-vector (coseno, los
+    vectores están normalizados) seguido de la mejor fila de cada página.
+
+    Con `path`, el índice se guarda en ``vectors.npy`` + ``vectors.json`` y se
+    recarga al crearse si se generó con el mismo embedder. Guardar y cargar
+    toman un `flock` sobre ``vectors.lock``, de modo que varios procesos que
+    comparten el directorio nunca mezclan la matriz de uno con los metadatos
+    de otro.
+    """
+
+    MATRIX = "vectors.npy"
+    META = "vectors.json"
+    LOCK = "vectors.lock"
+
+    def __init__(self, embedder=None, path: Optional[str] = None, chunk_bytes: int = 1024) -> None:
+        """Inicializar el índice.
+
+        Args:
+            embedder: Embedder (por defecto, HashingEmbedder)
+            path: Directorio donde persistir el índice
+            chunk_bytes: Tamaño máximo de cada fragmento en bytes
+        """
+        self.embedder = embedder or HashingEmbedder()
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self._matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._owner = np.zeros(0, dtype=np.int32)
+        self._texts: List[str] = []
+        self._size = 0
+        self._free: List[int] = []
+        self._url_ids: Dict[str, int] = {}
+        self._docs: Dict[str, Dict] = {}
+        self.dirty = False
+        if path:
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._docs
+
+    def _allocate(self, count: int) -> List[int]:
+        rows = [self._free.pop() for _ in range(min(count, len(self._free)))]
+        needed = count - len(rows)
+        if self._size + needed > len(self._matrix):
+            capacity = max(64, len(self._matrix) * 2, self._size + needed)
+            matrix = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            owner = np.full(capacity, -1, dtype=np.int32)
+            owner[:self._size] = self._owner[:self._size]
+            self._matrix, self._owner = matrix, owner
+            self._texts.extend([""] * (capacity - len(self._texts)))
+        rows.extend(range(self._size, self._size + needed))
+        self._size += needed
+        return rows
+
+    def add(self, url: str, title: str, content: str) -> bool:
+        """Indexar (o reindexar) una página. Devuelve False si su contenido no cambió."""
+        digest = hashlib.sha256(f"{title}\n{content}".encode("utf-8")).hexdigest()
+        doc = self._docs.get(url)
+        if doc is not None and doc["hash"] == digest:
+            return False
+        self.remove(url)
+        chunks = [chunk for chunk in ChunkedContent(content or "", self.chunk_bytes).texts() if chunk.strip()]
+        chunks = chunks or [""]
+        vectors = self.embedder.embed([f"{title}\n{chunk}" for chunk in chunks])
+        rows = self._allocate(len(chunks))
+        url_id = self._url_ids.setdefault(url, len(self._url_ids))
+        self._matrix[rows] = vectors
+        self._owner[rows] = url_id
+        for row, chunk in zip(rows, chunks):
+            self._texts[row] = chunk.strip()[:500]
+        self._docs[url] = {"hash": digest, "title": title, "rows": rows}
+        self.dirty = True
+        return True
+
+    def remove(self, url: str) -> bool:
+        """Eliminar una página del índice. Devuelve False si no estaba indexada."""
+        doc = self._docs.pop(url, None)
+        if doc is None:
+            return False
+        rows = doc["rows"]
+        self._matrix[rows] = 0
+        self._owner[rows] = -1
+        for row in rows:
+            self._texts[row] = ""
+        self._free.extend(rows)
+        self.dirty = True
+        return True
+
+    def _similarities(self, query: str) -> np.ndarray:
+        query_vector = self.embedder.embed([query])[0]
+        return self._matrix[:self._size] @ query_vector
+
+    def url_scores(self, query: str, limit: Optional[int] = None) -> Dict[str, float]:
+        """Similitud de la consulta con el mejor fragmento de cada página (las `limit` mejores)."""
+        if not self._docs:
+            return {}
+        similarities = self._similarities(query)
+        best = np.full(len(self._url_ids), -1.0, dtype=np.float32)
+        live = self._owner[:self._size] >= 0
+        np.maximum.at(best, self._owner[:self._size][live], similarities[live])
+        ids = {url_id: url for url, url_id in self._url_ids.items() if url in self._docs}
+        candidates = np.fromiter(ids, dtype=np.int64)
+        order = candidates[np.argsort(-best[candidates], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return {ids[int(url_id)]: float(best[url_id]) for url_id in order}
+
+    def hit(self, url: str, query: str, relevance: float) -> dict:
+        """Resultado de búsqueda con el fragmento de la página más parecido a la consulta."""
+        rows = self._docs[url]["rows"]
+        similarities = self._matrix[rows] @ self.embedder.embed([query])[0]
+        text = self._texts[rows[int(np.argmax(similarities))]]
+        return {
+            "title": self._docs[url]["title"],
+            "url": url,
+            "relevance": round(relevance, 4),
+            "snippet": f"...{text[:200]}...",
+        }
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Buscar las páginas con los fragmentos más parecidos a la consulta (coseno)."""
+        return [self.hit(url, query, score) for url, score in self.url_scores(query, limit).items() if score > 0]
+
+    @contextlib.contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        """Exclusión entre procesos sobre los ficheros del índice (LOCK_SH o LOCK_EX)."""
+        with open(os.path.join(self.path, self.LOCK), "a") as lock_file:
+            fcntl.flock(lock_file, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        """Guardar el índice en disco (de forma atómica) si cambió desde la última vez."""
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        matrix_tmp = os.path.join(self.path, f"{self.MATRIX}.{os.getpid()}.tmp")
+        meta_tmp = os.path.join(self.path, f"{self.META}.{os.getpid()}.tmp")
+        with open(matrix_tmp, "wb") as matrix_file:
+            np.save(matrix_file, self._matrix[:self._size])
+        meta = {
+            "embedder": self.embedder.identity,
+            "chunk_bytes": self.chunk_bytes,
+            "docs": self._docs,
+            "texts": self._texts[:self._size],
+        }
+        with open(meta_tmp, "w", encoding="utf-8") as meta_file:
+            json.dump(meta, meta_file)
+        # Los dos ficheros se sustituyen juntos: nadie lee ni escribe entre medias
+        with self._locked(fcntl.LOCK_EX):
+            os.replace(matrix_tmp, os.path.join(self.path, self.MATRIX))
+            os.replace(meta_tmp, os.path.join(self.path, self.META))
+        self.dirty = False
+
+    def load(self) -> bool:
+        """Cargar el índice guardado. Devuelve False si no existe o es de otro embedder."""
+        matrix_path = os.path.join(self.path, self.MATRIX)
+        meta_path = os.path.join(self.path, self.META)
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return False
+        with self._locked(fcntl.LOCK_SH):
+            with open(meta_path, encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            if meta["embedder"] != self.embedder.identity or meta["chunk_bytes"] != self.chunk_bytes:
+                logger.info("El índice vectorial guardado es de otro embedder; se reconstruirá")
+                return False
+            matrix = np.load(matrix_path)
+        self._size = len(matrix)
+        self._matrix = matrix.astype(np.float32, copy=False)
+        self._owner = np.full(self._size, -1, dtype=np.int32)
+        self._texts = meta["texts"]
+        self._docs = meta["docs"]
+        self._url_ids = {}
+        for url, doc in self._docs.items():
+            self._owner[doc["rows"]] = self._url_ids.setdefault(url, len(self._url_ids))
+        self._free = [int(row) for row in np.flatnonzero(self._owner < 0)]
+        self.dirty = False
+        logger.info(f"Índice vectorial cargado: {len(self._docs)} páginas, {self._size} fragmentos")
+        return True
@@ -0,0 +1,161 @@
+"""Coordinación entre los workers del servidor (modo multiproceso)."""
+
+import asyncio
+import contextlib
+import fcntl
+import logging
+import os
+from typing import Optional, TextIO
+from uuid import UUID
+
+from mcp import types
+from mcp.server.sse import SseServerTransport
+from pydantic import ValidationError
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger("mcp-nav")
+
+
+class LeaderLock:
+    """Elección de un único worker líder con un `flock` no bloqueante.
+
+    El primer proceso que toma el lock es el líder y lo conserva mientras viva;
+    si muere, el sistema operativo libera el lock y otro worker puede tomarlo
+    en su siguiente intento.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Preparar la elección.
+
+        Args:
+            path: Fichero de lock, compartido por todos los workers
+        """
+        self.path = path
+        self._file: Optional[TextIO] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        """Intentar ser el líder sin esperar. Devuelve True si este proceso lo es."""
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(f"{os.getpid()}\n")
+        lock_file.flush()
+        self._file = lock_file
+        logger.info(f"El worker {os.getpid()} es el líder (rastreo y refresco)")
+        return True
+
+    def release(self) -> None:
+        """Dejar de ser el líder."""
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class SessionRelay:
+    """Reenvío de los mensajes MCP entre workers hasta el que tiene la sesión.
+
+    Con el transporte SSE, el cliente abre la sesión con `GET /sse` en un
+    worker y envía cada mensaje con `POST /messages/?session_id=...`, que el
+    socket compartido puede entregar a otro worker distinto. Cada worker
+    escucha en un socket Unix del directorio compartido; si la sesión de un
+    POST no es suya, lo reenvía a los demás hasta que uno la reconoce.
+    """
+
+    def __init__(self, directory: str, transport: SseServerTransport) -> None:
+        """Preparar el reenvío.
+
+        Args:
+            directory: Directorio compartido por los workers para sus sockets
+            transport: Transporte SSE de este worker (el de `mcp.sse_app()`)
+        """
+        self.directory = directory
+        self.transport = transport
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        """Escuchar los mensajes reenviados por otros workers."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def aclose(self) -> None:
+        """Dejar de escuchar y borrar el socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    async def deliver(self, session_id: UUID, body: bytes) -> int:
+        """Entregar un mensaje a una sesión de este worker. Devuelve el estado HTTP."""
+        writer = self.transport._read_stream_writers.get(session_id)
+        if writer is None:
+            return 404
+        try:
+            message = types.JSONRPCMessage.model_validate_json(body)
+        except ValidationError as err:
+            await writer.send(err)
+            return 400
+        await writer.send(message)
+        return 202
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            session_id = UUID(hex=(await reader.readline()).decode().strip())
+            status = await self.deliver(session_id, await reader.read())
+        except ValueError:
+            status = 400
+        writer.write(f"{status}\n".encode())
+        await writer.drain()
+        writer.close()
+
+    async def forward(self, session_id: UUID, body: bytes) -> int:
+        """Reenviar un mensaje a los demás workers. 404 si ninguno tiene la sesión."""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+            except OSError:
+                continue
+            try:
+                writer.write(session_id.hex.encode() + b"\n" + body)
+                writer.write_eof()
+                await writer.drain()
+                status = int((await reader.readline()) or 0)
+            except (OSError, ValueError):
+                status = 0
+            finally:
+                writer.close()
+            if status in (202, 400):
+                return status
+        return 404
+
+    async def __call__(self, scope, receive, send) -> None:
+        """App ASGI para `POST /messages/`: sesiones propias al transporte, el resto a otros workers."""
+        request = Request(scope, receive)
+        try:
+            session_id = UUID(hex=request.query_params.get("session_id", ""))
+        except ValueError:
+            session_id = None
+        if session_id is None or session_id in self.transport._read_stream_writers:
+            await self.transport.handle_post_message(scope, receive, send)
+            return
+        status = await self.forward(session_id, await request.body())
+        text = {202: "Accepted", 400: "Could not parse message"}.get(status, "Could not find session")
+        await Response(text, status_code=status)(scope, receive, send)
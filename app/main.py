@@ -3,6 +3,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .core.config import settings
+from .core.ratelimit import RateLimiter, RateLimitMiddleware
 from .routes import user
 
 app = FastAPI(
@@ -20,6 +22,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rate limiting por cliente (compartido en Redis si MCP_NAV_RATE_LIMIT_REDIS=1)
+if settings.RATE_LIMIT_REDIS:
+    limiter = RateLimiter.from_url(settings.get_redis_url(), settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_WINDOW)
+else:
+    limiter = RateLimiter(settings.RATE_LIMIT_REQUESTS, settings.RATE_LIMIT_WINDOW)
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
 # Rutas
 app.include_router(user.router)
 
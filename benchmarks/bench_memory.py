@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""Pico de memoria (RSS) por página descargada y analizada.
+
+Cada medida se hace en un proceso nuevo: tras cargar el código y obtener una
+página pequeña (para que el intérprete y las librerías ya estén en memoria), se
+anota el pico de RSS, se obtiene la página y se resta. Casos:
+
+- ``peak_rss_buffered``: el camino anterior (``response.text`` completo y
+  ``parse_page`` sobre el str)
+- ``peak_rss_streaming``: ``WebsiteNavigator.fetch_page``, que lee el cuerpo por
+  trozos y lo analiza de forma incremental
+
+Las páginas del corpus son demasiado pequeñas para mover el pico de RSS, así
+que se miden páginas sintéticas de varios tamaños (``--sizes``, en MiB), con
+navegación, scripts y un contenido principal largo.
+
+Uso:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sizes 1,8 --repeat 5
+    python benchmarks/results.py memory          # comparar con la ejecución anterior
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import pathlib
+import resource
+import sys
+
+import httpx
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from app import CONFIG, WebsiteNavigator  # noqa: E402
+from app.core.parser import parse_page  # noqa: E402
+from fixture_site import CORPUS_DIR, FixtureSite  # noqa: E402
+from results import save, summarize  # noqa: E402
+
+MODES = ("buffered", "streaming")
+
+
+def large_page(size: int) -> bytes:
+    """Página de unos `size` bytes con navegación, scripts y un contenido principal largo."""
+    section = (
+        "<h2>Transports</h2><p>The client and the server exchange <strong>JSON-RPC</strong> messages "
+        "over a transport. <a href=\"/docs/concepts/transports\">Transports</a> handle framing.</p>"
+        "<script>window.analytics = [" + ",".join(["0"] * 200) + "];</script>"
+    )
+    count = max(1, size // len(section))
+    return (
+        "<!DOCTYPE html><html><head><title>Large page</title></head><body>"
+        "<nav><a href=\"/docs\">Docs</a></nav><main><h1>Large page</h1>"
+        + section * count
+        + "</main></body></html>"
+    ).encode("utf-8")
+
+
+def peak_rss_kib() -> int:
+    """Pico de RSS del proceso en KiB (ru_maxrss está en bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def _fetch(mode: str, url: str, warmup_url: str) -> int:
+    if mode == "streaming":
+        navigator = WebsiteNavigator()
+        try:
+            await navigator.fetch_page(warmup_url)
+            baseline = peak_rss_kib()
+            page = await navigator.fetch_page(url)
+        finally:
+            await navigator.aclose()
+    else:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(warmup_url)
+            parse_page(response.text, warmup_url, CONFIG["BASE_URL"], parser=CONFIG["PARSER"])
+            baseline = peak_rss_kib()
+            response = await client.get(url)
+            html = response.text
+            page = parse_page(html, url, CONFIG["BASE_URL"], parser=CONFIG["PARSER"])
+    if "error" in page:
+        raise RuntimeError(f"{url}: {page['error']}")
+    return peak_rss_kib() - baseline
+
+
+def _measure(mode: str, url: str, warmup_url: str, base_url: str, parser: str, queue) -> None:
+    """Medir en este proceso (nuevo) el aumento del pico de RSS al obtener `url`."""
+    logging.getLogger().setLevel(logging.WARNING)
+    CONFIG["BASE_URL"] = base_url
+    CONFIG["PARSER"] = parser
+    queue.put(asyncio.run(_fetch(mode, url, warmup_url)))
+
+
+def measure(mode: str, url: str, warmup_url: str, base_url: str, parser: str) -> int:
+    """Aumento del pico de RSS (KiB) al obtener `url`, medido en un proceso nuevo."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(mode, url, warmup_url, base_url, parser, queue))
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"La medida de {url} ({mode}) terminó con código {process.exitcode}")
+    return queue.get()
+
+
+def run(args) -> dict:
+    """Medir cada modo con cada tamaño de página sintética."""
+    with FixtureSite(args.corpus) as site:
+        warmup = min(site.pages, key=lambda path: len(site.pages[path]))
+        results = {}
+        for size in args.sizes:
+            path = f"/large-{size:g}mb"
+            site.pages[path] = large_page(int(size * 1024 * 1024))
+            site.etags[path] = f'"{path}"'
+            for mode in MODES:
+                samples = [
+                    measure(mode, site.url + path, site.url + warmup, site.url, args.parser)
+                    for _ in range(args.repeat)
+                ]
+                results[f"peak_rss_{mode}_{size:g}mb"] = summarize(samples)
+        return results
+
+
+def main():
+    """Ejecutar las medidas, imprimir los resultados y guardarlos."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", type=pathlib.Path, default=CORPUS_DIR, help="Directorio del corpus")
+    arg_parser.add_argument(
+        "--sizes", type=lambda value: [float(size) for size in value.split(",")], default=[1.0, 4.0],
+        help="Tamaños de página en MiB, separados por comas",
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Procesos por caso")
+    arg_parser.add_argument("--parser", default=CONFIG["PARSER"], help="Backend de análisis")
+    arg_parser.add_argument("--no-save", action="store_true", help="No guardar los resultados")
+    args = arg_parser.parse_args()
+
+    results = run(args)
+    print(f"{'caso':<30} {'media KiB':>10} {'p50 KiB':>10} {'p99 KiB':>10} {'n':>6}")
+    for case, stats in results.items():
+        print(f"{case:<30} {stats['mean']:>10.0f} {stats['p50']:>10.0f} {stats['p99']:>10.0f} {stats['n']:>6}")
+    if not args.no_save:
+        params = {"sizes": args.sizes, "repeat": args.repeat, "parser": args.parser}
+        print(f"\nResultados guardados en {save('memory', results, params)}")
+
+
+if __name__ == "__main__":
+    main()
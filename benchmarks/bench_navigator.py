@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""Microbenchmarks de `get_page_content` y `search` contra el sitio local de fixtures.
+
+Mide, por página:
+- ``parse`` / ``convert``: análisis del HTML y conversión a Markdown (sin red)
+- ``get_page_content_cold``: descarga + análisis con el caché vacío
+- ``get_page_content_warm``: la misma página servida desde el caché
+
+y, por consulta, ``search_cold`` (caché e índice vacíos) y ``search_warm``.
+
+Uso:
+    python benchmarks/bench_navigator.py
+    python benchmarks/bench_navigator.py --repeat 10 --latency 0.02 --parser selectolax
+    python benchmarks/results.py navigator          # comparar con la ejecución anterior
+"""
+
+import argparse
+import asyncio
+import logging
+import pathlib
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from app import CONFIG, WebsiteNavigator  # noqa: E402
+from app.core.parser import parse_page_timed  # noqa: E402
+from fixture_site import CORPUS_DIR, FixtureSite  # noqa: E402
+from results import save, summarize  # noqa: E402
+
+QUERIES = ["tools", "transport session", "progress notification", "json rpc schema"]
+
+
+def bench_parse(site: FixtureSite, repeat: int) -> dict:
+    """Tiempos de análisis y conversión por página, sin red ni caché."""
+    parse, convert = [], []
+    for _ in range(repeat):
+        for path, body in site.pages.items():
+            _, timings = parse_page_timed(body, "utf-8", site.url + path, site.url, False, CONFIG["PARSER"])
+            parse.append(timings["parse"] * 1000)
+            convert.append(timings["convert"] * 1000)
+    return {"parse": summarize(parse), "convert": summarize(convert)}
+
+
+async def bench_get_page_content(site: FixtureSite, repeat: int) -> dict:
+    """Latencia de get_page_content por página con el caché vacío y con el caché lleno."""
+    cold, warm = [], []
+    navigator = WebsiteNavigator()
+    try:
+        for _ in range(repeat):
+            navigator.cache.clear()
+            navigator.index.clear()
+            for samples in (cold, warm):
+                for path in site.pages:
+                    start = time.perf_counter()
+                    page = await navigator.get_page_content(path)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    if "error" in page:
+                        raise RuntimeError(f"{path}: {page['error']}")
+    finally:
+        await navigator.aclose()
+    return {"get_page_content_cold": summarize(cold), "get_page_content_warm": summarize(warm)}
+
+
+async def bench_search(repeat: int) -> dict:
+    """Latencia de search con un navegador nuevo (frío) y tras indexar (caliente)."""
+    cold, warm = [], []
+    for _ in range(repeat):
+        navigator = WebsiteNavigator()
+        try:
+            for query in QUERIES:
+                samples = cold if query == QUERIES[0] else warm
+                start = time.perf_counter()
+                await navigator.index_site()
+                navigator.index.search(query)
+                samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            await navigator.aclose()
+    return {"search_cold": summarize(cold), "search_warm": summarize(warm)}
+
+
+async def run(args) -> dict:
+    """Ejecutar todos los casos con el sitio local en marcha."""
+    with FixtureSite(args.corpus, latency=args.latency) as site:
+        CONFIG["BASE_URL"] = site.url
+        CONFIG["PARSER"] = args.parser
+        results = bench_parse(site, args.repeat)
+        results.update(await bench_get_page_content(site, args.repeat))
+        results.update(await bench_search(args.repeat))
+        return results
+
+
+def main():
+    """Ejecutar los benchmarks, imprimir los resultados y guardarlos."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", type=pathlib.Path, default=CORPUS_DIR, help="Directorio del corpus")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Repeticiones de cada caso")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Latencia simulada del origen (segundos)")
+    arg_parser.add_argument("--parser", default=CONFIG["PARSER"], help="Backend de análisis")
+    arg_parser.add_argument("--no-save", action="store_true", help="No guardar los resultados")
+    args = arg_parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    print(f"{'caso':<24} {'media ms':>10} {'p50 ms':>10} {'p99 ms':>10} {'n':>6}")
+    for case, stats in results.items():
+        print(f"{case:<24} {stats['mean']:>10.3f} {stats['p50']:>10.3f} {stats['p99']:>10.3f} {stats['n']:>6}")
+    if not args.no_save:
+        params = {"repeat": args.repeat, "latency": args.latency, "parser": args.parser}
+        print(f"\nResultados guardados en {save('navigator', results, params)}")
+
+
+if __name__ == "__main__":
+    main()
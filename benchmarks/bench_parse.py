@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Benchmark del análisis + conversión a Markdown por página para cada backend.
+
+Uso:
+    python benchmarks/bench_parse.py                      # páginas reales de modelcontextprotocol.io
+    python benchmarks/bench_parse.py --corpus pages/      # ficheros .html guardados
+    python benchmarks/bench_parse.py https://modelcontextprotocol.io/docs/concepts/tools
+"""
+
+import argparse
+import pathlib
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from app.core.parser import PARSERS, parse_page  # noqa: E402
+
+BASE_URL = "https://modelcontextprotocol.io"
+DEFAULT_URLS = [
+    f"{BASE_URL}/introduction",
+    f"{BASE_URL}/quickstart/server",
+    f"{BASE_URL}/docs/concepts/architecture",
+    f"{BASE_URL}/docs/concepts/tools",
+    f"{BASE_URL}/docs/concepts/resources",
+    f"{BASE_URL}/specification/2025-03-26/basic/lifecycle",
+]
+
+
+def load_pages(args) -> dict:
+    """Cargar las páginas del corpus local o descargarlas."""
+    if args.corpus:
+        return {path.name: path.read_text("utf-8") for path in sorted(pathlib.Path(args.corpus).glob("**/*.html"))}
+    pages = {}
+    with httpx.Client(follow_redirects=True, timeout=30) as client:
+        for url in args.urls or DEFAULT_URLS:
+            pages[url] = client.get(url).raise_for_status().text
+    return pages
+
+
+def bench(parser: str, pages: dict, repeat: int) -> list:
+    """Medir el tiempo (ms) de cada pasada completa sobre todas las páginas, por página."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, html in pages.items():
+            parse_page(html, url, BASE_URL, parser=parser)
+        timings.append((time.perf_counter() - start) * 1000 / len(pages))
+    return timings
+
+
+def main():
+    """Ejecutar el benchmark e imprimir los resultados."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("urls", nargs="*", help="URLs a descargar y medir")
+    arg_parser.add_argument("--corpus", help="Directorio con ficheros .html")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por backend")
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args)
+    size = sum(len(html.encode("utf-8")) for html in pages.values()) / len(pages)
+    print(f"{len(pages)} páginas, {size / 1024:.1f} KiB de media\n")
+
+    results = {}
+    for parser in PARSERS:
+        try:
+            results[parser] = statistics.median(bench(parser, pages, args.repeat))
+        except RuntimeError as e:
+            print(f"{parser}: omitido ({e})")
+
+    baseline = results.get("html.parser")
+    print(f"{'parser':<12} {'ms/página':>10} {'speedup':>8}")
+    for parser, ms in results.items():
+        speedup = f"{baseline / ms:.1f}x" if baseline else "-"
+        print(f"{parser:<12} {ms:>10.2f} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
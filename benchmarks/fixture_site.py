@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+"""Sitio HTTP local que sirve un corpus grabado de páginas tipo modelcontextprotocol.io.
+
+Uso:
+    python benchmarks/fixture_site.py record                 # grabar el sitio real en benchmarks/corpus/
+    python benchmarks/fixture_site.py generate --pages 80    # corpus sintético (sin red)
+    python benchmarks/fixture_site.py serve --port 8765      # servir el corpus
+
+Con el sitio en marcha, el servidor MCP se apunta a él con MCP_NAV_BASE_URL.
+"""
+
+import argparse
+import hashlib
+import json
+import pathlib
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import httpx
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from app.core.parser import parse_page  # noqa: E402
+
+CORPUS_DIR = pathlib.Path(__file__).resolve().parent / "corpus"
+MANIFEST = "manifest.json"
+SITE_URL = "https://modelcontextprotocol.io"
+
+SECTIONS = {
+    "docs/concepts": ["architecture", "tools", "resources", "prompts", "sampling", "roots", "transports"],
+    "specification/2025-03-26/basic": ["lifecycle", "transports", "authorization", "utilities/progress"],
+    "specification/2025-03-26/server": ["tools", "resources", "prompts", "utilities/logging"],
+    "quickstart": ["server", "client", "user"],
+    "tutorials": ["building-mcp-with-llms", "debugging", "inspector"],
+}
+WORDS = (
+    "server client tool resource prompt request response notification transport session "
+    "capability schema message progress cancellation sampling roots lifecycle json rpc "
+    "stdio sse streaming authorization token context model protocol host integration"
+).split()
+
+
+def _page_path(url_path: str) -> str:
+    """Nombre de fichero del corpus para una ruta del sitio."""
+    name = url_path.strip("/").replace("/", "__") or "index"
+    return f"{name}.html"
+
+
+def load_manifest(corpus: pathlib.Path = CORPUS_DIR) -> Dict[str, str]:
+    """Leer el mapa ruta -> fichero del corpus."""
+    return json.loads((corpus / MANIFEST).read_text("utf-8"))
+
+
+def _write_corpus(corpus: pathlib.Path, pages: Dict[str, str]) -> None:
+    corpus.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for path, html in pages.items():
+        manifest[path] = _page_path(path)
+        (corpus / manifest[path]).write_text(html, "utf-8")
+    (corpus / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True), "utf-8")
+
+
+def generate_corpus(corpus: pathlib.Path = CORPUS_DIR, pages: int = 60, seed: int = 42) -> int:
+    """Generar un corpus sintético y determinista con la estructura de la documentación real.
+
+    Cada página tiene navegación lateral con enlaces internos, encabezados,
+    párrafos, listas, tablas y bloques de código, como las páginas de Mintlify.
+    """
+    rng = random.Random(seed)
+    paths = [f"/{section}/{name}" for section, names in SECTIONS.items() for name in names]
+    while len(paths) < pages - 1:
+        section = rng.choice(list(SECTIONS))
+        paths.append(f"/{section}/{rng.choice(WORDS)}-{len(paths)}")
+    paths = ["/"] + paths[:pages - 1]
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+    nav = "".join(f'<li><a href="{path}">{path.rsplit("/", 1)[-1] or "Home"}</a></li>' for path in paths)
+    html_pages = {}
+    for path in paths:
+        title = path.rsplit("/", 1)[-1].replace("-", " ").title() or "Introduction"
+        body = [f"<h1>{title}</h1>"]
+        for section in range(rng.randint(3, 7)):
+            body.append(f"<h2>{rng.choice(WORDS).title()} {section}</h2>")
+            body.extend(f"<p>{sentence()} {sentence()}</p>" for _ in range(rng.randint(2, 5)))
+            body.append("<ul>" + "".join(f"<li><code>{rng.choice(WORDS)}</code> {sentence()}</li>" for _ in range(3)) + "</ul>")
+            if rng.random() < 0.5:
+                rows = "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{sentence()}</td></tr>" for _ in range(4))
+                body.append(f"<table><tr><th>Field</th><th>Description</th></tr>{rows}</table>")
+            if rng.random() < 0.6:
+                code = "\n".join(f'  "{rng.choice(WORDS)}": "{rng.choice(WORDS)}",' for _ in range(6))
+                body.append(f'<pre><code class="language-json">{{\n{code}\n}}</code></pre>')
+            links = rng.sample(paths, 3)
+            body.append("<p>See " + ", ".join(f'<a href="{link}">{link}</a>' for link in links) + ".</p>")
+        html_pages[path] = (
+            f"<!DOCTYPE html><html><head><title>{title} - Model Context Protocol</title>"
+            f"<script>window.__data = {{}};</script><style>body {{}}</style></head>"
+            f"<body><nav><ul>{nav}</ul></nav><main><article>{''.join(body)}</article></main>"
+            f"<footer><a href=\"https://github.com/modelcontextprotocol\">GitHub</a></footer></body></html>"
+        )
+    _write_corpus(corpus, html_pages)
+    return len(html_pages)
+
+
+def record_corpus(corpus: pathlib.Path = CORPUS_DIR, base_url: str = SITE_URL, max_pages: int = 80) -> int:
+    """Grabar páginas del sitio real (BFS por enlaces internos).
+
+    Los enlaces absolutos al sitio se reescriben como rutas relativas para que
+    el corpus funcione servido desde cualquier dirección.
+    """
+    pages: Dict[str, str] = {}
+    queue = deque(["/"])
+    seen = {"/"}
+    with httpx.Client(follow_redirects=True, timeout=30) as client:
+        while queue and len(pages) < max_pages:
+            path = queue.popleft()
+            response = client.get(base_url + path)
+            if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+                continue
+            html = response.text.replace(f'href="{base_url}/', 'href="/')
+            pages[path] = html
+            print(f"{len(pages):3d} {path}", file=sys.stderr)
+            for link in parse_page(html, base_url + path, base_url)["links"]:
+                target = urllib.parse.urlsplit(link["url"]).path.rstrip("/") or "/"
+                if target.startswith("/") and target not in seen:
+                    seen.add(target)
+                    queue.append(target)
+    _write_corpus(corpus, pages)
+    return len(pages)
+
+
+def ensure_corpus(corpus: pathlib.Path = CORPUS_DIR) -> pathlib.Path:
+    """Devolver el corpus, generando uno sintético si todavía no existe."""
+    if not (corpus / MANIFEST).exists():
+        generate_corpus(corpus)
+    return corpus
+
+
+class FixtureSite:
+    """Servidor HTTP en un hilo que sirve el corpus, con ETag y latencia simulada.
+
+    Uso:
+        with FixtureSite(latency=0.02) as site:
+            ...  # site.url -> "http://127.0.0.1:<puerto>"
+    """
+
+    def __init__(
+        self,
+        corpus: pathlib.Path = CORPUS_DIR,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        """Preparar el sitio.
+
+        Args:
+            corpus: Directorio del corpus (se genera uno sintético si falta)
+            host: Dirección de escucha
+            port: Puerto (0 para uno libre)
+            latency: Retardo añadido a cada respuesta, en segundos
+        """
+        corpus = ensure_corpus(corpus)
+        self.pages = {
+            path: (corpus / name).read_bytes() for path, name in load_manifest(corpus).items()
+        }
+        self.etags = {path: '"%s"' % hashlib.sha256(body).hexdigest()[:16] for path, body in self.pages.items()}
+        self.latency = latency
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                path = urllib.parse.urlsplit(self.path).path.rstrip("/") or "/"
+                body = site.pages.get(path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = site.etags[path]
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FixtureSite":
+        """Arrancar el servidor en segundo plano."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Detener el servidor."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureSite":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    """Grabar, generar o servir el corpus."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", type=pathlib.Path, default=CORPUS_DIR, help="Directorio del corpus")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Grabar páginas del sitio real")
+    record.add_argument("--base-url", default=SITE_URL)
+    record.add_argument("--max-pages", type=int, default=80)
+    generate = commands.add_parser("generate", help="Generar un corpus sintético")
+    generate.add_argument("--pages", type=int, default=60)
+    generate.add_argument("--seed", type=int, default=42)
+    serve = commands.add_parser("serve", help="Servir el corpus por HTTP")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="Retardo por respuesta (segundos)")
+    args = arg_parser.parse_args()
+
+    if args.command == "record":
+        print(f"{record_corpus(args.corpus, args.base_url, args.max_pages)} páginas grabadas en {args.corpus}")
+    elif args.command == "generate":
+        print(f"{generate_corpus(args.corpus, args.pages, args.seed)} páginas generadas en {args.corpus}")
+    else:
+        site = FixtureSite(args.corpus, args.host, args.port, args.latency)
+        print(f"Sirviendo {len(site.pages)} páginas en {site.url} (MCP_NAV_BASE_URL={site.url})")
+        try:
+            site._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""Generador de carga multi-cliente por SSE contra el servidor MCP.
+
+Arranca el sitio local de fixtures y un servidor MCP apuntado a él (o usa uno
+ya en marcha con --server), abre N sesiones MCP simultáneas y llama a las tools
+en bucle durante el tiempo indicado. Informa, por tool, de p50/p99 y throughput.
+
+Uso:
+    python benchmarks/load_sse.py --clients 20 --duration 30
+    python benchmarks/load_sse.py --server http://localhost:9090 --clients 50
+    python benchmarks/load_sse.py --workers 4 --clients 40     # servidor con 4 workers
+    python benchmarks/results.py load               # comparar con la ejecución anterior
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import pathlib
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+from fixture_site import CORPUS_DIR, FixtureSite  # noqa: E402
+from results import save, summarize  # noqa: E402
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+QUERIES = ["tools", "transport", "progress notification", "session lifecycle", "json rpc schema"]
+
+# Peso de cada tool en la mezcla de carga
+MIX = {"navigate": 5, "current_page": 2, "extract_links": 1, "search": 2}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(base_url: str, port: int, workers: int = 1) -> subprocess.Popen:
+    """Arrancar `python -m app` apuntado al sitio local y esperar a /ping."""
+    # Sin rate limit por defecto, para medir el servidor y no el limitador
+    env = {
+        "MCP_NAV_RATE_LIMIT": "0",
+        **os.environ,
+        "MCP_NAV_BASE_URL": base_url,
+        "MCP_NAV_PORT": str(port),
+        "MCP_NAV_WORKERS": str(workers),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El servidor MCP terminó al arrancar")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/ping", timeout=1).text == "pong":
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("El servidor MCP no respondió a /ping")
+
+
+def _arguments(tool: str, paths: List[str], rng: random.Random) -> Dict:
+    if tool == "navigate":
+        return {"url": rng.choice(paths)}
+    if tool == "search":
+        return {"query": rng.choice(QUERIES), "limit": 5}
+    return {}
+
+
+async def client(
+    server: str,
+    paths: List[str],
+    deadline: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+    seed: int,
+) -> None:
+    """Una sesión MCP que llama a las tools de la mezcla hasta el plazo."""
+    rng = random.Random(seed)
+    tools, weights = zip(*MIX.items())
+    async with sse_client(f"{server}/sse") as streams, ClientSession(*streams) as session:
+        await session.initialize()
+        while time.monotonic() < deadline:
+            tool = rng.choices(tools, weights)[0]
+            start = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, _arguments(tool, paths, rng))
+                if result.isError:
+                    errors[tool] += 1
+                    continue
+            except Exception:
+                errors[tool] += 1
+                continue
+            latencies[tool].append((time.perf_counter() - start) * 1000)
+
+
+async def run_load(server: str, paths: List[str], clients: int, duration: float) -> Dict[str, Dict[str, float]]:
+    """Lanzar los clientes y resumir las latencias por tool."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    deadline = time.monotonic() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client(server, paths, deadline, latencies, errors, seed) for seed in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for tool in MIX:
+        stats = summarize(latencies[tool])
+        stats.update(throughput=len(latencies[tool]) / elapsed, errors=errors[tool])
+        results[tool] = stats
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    results["total"] = {
+        **summarize(all_samples),
+        "throughput": len(all_samples) / elapsed,
+        "errors": sum(errors.values()),
+    }
+    return results
+
+
+def main():
+    """Ejecutar la prueba de carga, imprimir los resultados y guardarlos."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--server", help="URL de un servidor MCP ya en marcha (si no, se arranca uno)")
+    arg_parser.add_argument("--corpus", type=pathlib.Path, default=CORPUS_DIR, help="Directorio del corpus")
+    arg_parser.add_argument("--clients", type=int, default=10, help="Sesiones MCP simultáneas")
+    arg_parser.add_argument("--duration", type=float, default=20, help="Duración de la prueba (segundos)")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Latencia simulada del origen (segundos)")
+    arg_parser.add_argument("--workers", type=int, default=1, help="Workers del servidor arrancado")
+    arg_parser.add_argument("--no-save", action="store_true", help="No guardar los resultados")
+    args = arg_parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    site: Optional[FixtureSite] = None
+    process: Optional[subprocess.Popen] = None
+    server = args.server
+    try:
+        site = FixtureSite(args.corpus, latency=args.latency).start()
+        if server is None:
+            port = _free_port()
+            process = start_server(site.url, port, args.workers)
+            server = f"http://127.0.0.1:{port}"
+        results = asyncio.run(run_load(server, list(site.pages), args.clients, args.duration))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(5)
+            except subprocess.TimeoutExpired:
+                # uvicorn espera a que se cierren las conexiones SSE abiertas
+                process.kill()
+                process.wait()
+        if site is not None:
+            site.stop()
+
+    print(f"{'tool':<16} {'p50 ms':>10} {'p99 ms':>10} {'req/s':>10} {'n':>8} {'errores':>8}")
+    for tool, stats in results.items():
+        print(
+            f"{tool:<16} {stats['p50']:>10.2f} {stats['p99']:>10.2f} "
+            f"{stats['throughput']:>10.1f} {stats['n']:>8} {stats['errors']:>8}"
+        )
+    if not args.no_save:
+        params = {"clients": args.clients, "duration": args.duration, "latency": args.latency, "workers": args.workers}
+        print(f"\nResultados guardados en {save('load', results, params)}")
+
+
+if __name__ == "__main__":
+    main()
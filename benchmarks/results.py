@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Guardar resultados de benchmarks por commit y compararlos entre ejecuciones.
+
+Cada ejecución se añade como una línea JSON a ``benchmarks/results/<suite>.jsonl``
+con el commit, la fecha y las métricas (en ms salvo que el nombre diga otra cosa).
+
+Uso:
+    python benchmarks/results.py navigator                   # última ejecución frente a la anterior
+    python benchmarks/results.py load --baseline 1a2b3c4     # última frente a un commit concreto
+"""
+
+import argparse
+import datetime
+import json
+import math
+import pathlib
+import platform
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+RESULTS_DIR = pathlib.Path(__file__).resolve().parent / "results"
+
+# Métricas en las que un valor mayor es mejor (el resto son latencias)
+HIGHER_IS_BETTER = ("throughput", "speedup")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Percentil por rango más cercano (q entre 0 y 100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, min(len(ordered), math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Resumir una serie de latencias (ms): media, p50, p99 y número de muestras."""
+    return {
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "p50": percentile(samples, 50),
+        "p99": percentile(samples, 99),
+        "n": len(samples),
+    }
+
+
+def git_commit() -> str:
+    """Commit actual (con `+` si hay cambios sin confirmar)."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit + ("+" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save(suite: str, results: Dict[str, Dict[str, float]], params: Optional[Dict] = None) -> pathlib.Path:
+    """Añadir una ejecución al histórico de la suite."""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = RESULTS_DIR / f"{suite}.jsonl"
+    record = {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": params or {},
+        "results": results,
+    }
+    with open(path, "a", encoding="utf-8") as history:
+        history.write(json.dumps(record, sort_keys=True) + "\n")
+    return path
+
+
+def load(suite: str) -> List[Dict]:
+    """Leer todas las ejecuciones de una suite, de la más antigua a la más reciente."""
+    path = RESULTS_DIR / f"{suite}.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text("utf-8").splitlines() if line.strip()]
+
+
+def compare(base: Dict, head: Dict) -> List[str]:
+    """Comparar dos ejecuciones métrica a métrica (variación en %)."""
+    lines = [f"{base['commit']} ({base['date']}) -> {head['commit']} ({head['date']})"]
+    for case, values in head["results"].items():
+        for metric, value in values.items():
+            before = base["results"].get(case, {}).get(metric)
+            if metric == "n" or not isinstance(value, (int, float)) or not before:
+                continue
+            change = (value - before) / before * 100
+            better = change > 0 if metric.startswith(HIGHER_IS_BETTER) else change < 0
+            flag = "" if abs(change) < 5 else ("  mejora" if better else "  REGRESIÓN")
+            lines.append(f"  {case:<28} {metric:<14} {before:>10.2f} -> {value:>10.2f} ({change:+6.1f}%){flag}")
+    return lines
+
+
+def main():
+    """Mostrar la comparación de la última ejecución con la anterior o con un commit."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("suite", help="Suite: navigator, load, parse...")
+    arg_parser.add_argument("--baseline", help="Commit con el que comparar (por defecto, la ejecución anterior)")
+    args = arg_parser.parse_args()
+
+    runs = load(args.suite)
+    if len(runs) < 2:
+        sys.exit(f"Se necesitan al menos dos ejecuciones de '{args.suite}' en {RESULTS_DIR}")
+    head = runs[-1]
+    if args.baseline:
+        candidates = [run for run in runs[:-1] if run["commit"].startswith(args.baseline)]
+        if not candidates:
+            sys.exit(f"No hay ejecuciones de '{args.suite}' para el commit {args.baseline}")
+        base = candidates[-1]
+    else:
+        base = runs[-2]
+    print("\n".join(compare(base, head)))
+
+
+if __name__ == "__main__":
+    main()
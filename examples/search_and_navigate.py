@@ -19,7 +19,7 @@ async def simulate_mcp_client():
     
     # Simular la herramienta navigate
     print("=== Navegando a la página de inicio ===")
-    home_page = navigator.get_page_content("https://modelcontextprotocol.io")
+    home_page = await navigator.get_page_content("https://modelcontextprotocol.io")
     print(f"Título: {home_page['title']}")
     print(f"URL: {home_page['url']}")
     print(f"Primeros 200 caracteres del contenido:")
@@ -37,7 +37,7 @@ async def simulate_mcp_client():
     results = []
     for link in home_page['links']:
         if query.lower() in link['text'].lower():
-            page = navigator.get_page_content(link['url'])
+            page = await navigator.get_page_content(link['url'])
             results.append({
                 'title': link['text'],
                 'url': link['url'],
@@ -52,7 +52,7 @@ async def simulate_mcp_client():
     # Navegar a un resultado si lo encontramos
     if results:
         print(f"\n=== Navegando al primer resultado: {results[0]['url']} ===")
-        page = navigator.get_page_content(results[0]['url'])
+        page = await navigator.get_page_content(results[0]['url'])
         print(f"Título: {page['title']}")
         print(f"Contenido (primeros 300 caracteres):")
         print(page['content'][:300] + "...")
@@ -61,6 +61,8 @@ async def simulate_mcp_client():
     print("\n=== Historial de navegación ===")
     for i, url in enumerate(navigator.history):
         print(f"{i+1}. {url}")
+    
+    await navigator.aclose()
 
 
 if __name__ == "__main__":
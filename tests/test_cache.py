@@ -0,0 +1,71 @@
+"""Pruebas para el caché de páginas."""
+
+import unittest
+from unittest.mock import patch
+
+from app.core.cache import Cache, estimate_size
+
+
+class TestCache(unittest.TestCase):
+    """Pruebas para la clase Cache."""
+
+    def test_lru_eviction_by_entries(self):
+        """Probar que se desaloja la entrada usada hace más tiempo."""
+        cache = Cache(ttl=60, max_entries=2)
+        cache.set("a", {"content": "a"})
+        cache.set("b", {"content": "b"})
+        cache.get("a")
+        cache.set("c", {"content": "c"})
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_eviction_by_bytes(self):
+        """Probar el límite de tamaño y la contabilidad de bytes."""
+        page = {"content": "x" * 100}
+        size = estimate_size(page)
+        cache = Cache(ttl=60, max_bytes=size * 2)
+        for key in ("a", "b", "c"):
+            cache.set(key, page)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.bytes, size * 2)
+        cache.set("huge", {"content": "x" * 1000})
+        self.assertNotIn("huge", cache)
+
+    def test_expiration_and_counters(self):
+        """Probar la expiración en lectura, la purga y los contadores."""
+        cache = Cache(ttl=10)
+        with patch("app.core.cache.time.monotonic", return_value=0):
+            cache.set("a", {"content": "a"})
+            cache.set("b", {"content": "b"})
+            self.assertEqual(cache.get("a"), {"content": "a"})
+        with patch("app.core.cache.time.monotonic", return_value=11):
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.purge_expired(), 1)
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 1, 2))
+        self.assertEqual((stats["entries"], stats["bytes"]), (0, 0))
+
+    def test_on_remove_callback(self):
+        """Probar que se avisa de cada entrada que sale del caché, pero no al reemplazarla."""
+        removed = []
+        cache = Cache(ttl=10, max_entries=2, max_bytes=1000, on_remove=removed.append)
+        with patch("app.core.cache.time.monotonic", return_value=0):
+            cache.set("a", {"content": "a"})
+            cache.set("a", {"content": "a2"})
+            cache.set("b", {"content": "b"})
+            cache.set("c", {"content": "c"})
+            cache.set("huge", {"content": "x" * 1000})
+        with patch("app.core.cache.time.monotonic", return_value=11):
+            cache.purge_expired()
+        cache.set("d", {"content": "d"})
+        cache.clear()
+
+        self.assertEqual(removed, ["a", "huge", "b", "c", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
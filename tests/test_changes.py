@@ -0,0 +1,165 @@
+"""Pruebas para la detección de cambios por sitemap.xml."""
+
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fakeredis.aioredis import FakeRedis
+
+from app import CONFIG, WebsiteNavigator
+from app.core.changes import parse_sitemap
+from app.core.shared_cache import RedisPageCache
+from app.core.store import PageStore
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{entries}
+</urlset>
+"""
+
+
+def sitemap(entries):
+    """Sitemap con las URLs indicadas (`lastmod` en epoch o None)."""
+    rows = []
+    for path, lastmod in entries.items():
+        stamp = ""
+        if lastmod is not None:
+            stamp = f"<lastmod>{time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(lastmod))}</lastmod>"
+        rows.append(f"<url><loc>https://modelcontextprotocol.io{path}</loc>{stamp}</url>")
+    return SITEMAP.format(entries="\n".join(rows))
+
+
+class TestSitemap(unittest.TestCase):
+    """Pruebas para parse_sitemap."""
+
+    def test_parse_urlset_and_index(self):
+        """Probar la lectura de URLs con `lastmod` (fecha u hora) y de índices de sitemaps."""
+        pages, children = parse_sitemap(
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b"<url><loc> https://example.com/a </loc><lastmod>2024-01-02</lastmod></url>"
+            b"<url><loc>https://example.com/b</loc><lastmod>2024-01-02T01:00:00Z</lastmod></url>"
+            b"<url><loc>https://example.com/c</loc><lastmod>yesterday</lastmod></url>"
+            b"</urlset>"
+        )
+        self.assertEqual(pages, {
+            "https://example.com/a": 1704153600.0,
+            "https://example.com/b": 1704157200.0,
+            "https://example.com/c": None,
+        })
+        self.assertEqual(children, [])
+
+        pages, children = parse_sitemap(
+            b"<sitemapindex><sitemap><loc>https://example.com/docs.xml</loc></sitemap></sitemapindex>"
+        )
+        self.assertEqual((pages, children), ({}, ["https://example.com/docs.xml"]))
+
+
+class TestChangeDetector(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del refresco incremental del navegador."""
+
+    async def asyncSetUp(self):
+        """Servir un sitio con sitemap, contenido y páginas eliminables."""
+        self.requests = []
+        self.entries = {"/a": None, "/b": None, "/c": None}
+        self.contents = {"/a": "one", "/b": "two", "/c": "three"}
+        self.failing = False
+
+        def handler(request):
+            path = request.url.path
+            if path == "/sitemap.xml":
+                return httpx.Response(200, text=sitemap(self.entries))
+            self.requests.append(path)
+            if self.failing:
+                return httpx.Response(503)
+            if path not in self.contents:
+                return httpx.Response(404)
+            return httpx.Response(200, text=f"<html><title>{path}</title><main><p>{self.contents[path]}</p></main></html>")
+
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        for path in self.contents:
+            await self.navigator.fetch_page(path)
+        self.requests.clear()
+
+    async def asyncTearDown(self):
+        """Cerrar el navegador."""
+        await self.navigator.aclose()
+
+    async def test_refetch_only_changed_pages(self):
+        """Probar que solo se descargan las páginas con un lastmod posterior y se eliminan las desaparecidas."""
+        self.entries = {"/a": time.time() + 60, "/b": time.time() - 3600, "/c": None}
+        self.contents["/a"] = "updated"
+        first = await self.navigator.changes.check()
+
+        self.assertEqual(self.requests, ["/a"])
+        self.assertEqual((first["changed"], first["unchanged"]), (1, 1))
+        self.assertIn("updated", self.navigator.cache.get("https://modelcontextprotocol.io/a")["content"])
+        self.assertEqual(self.navigator.index.search("updated")[0]["url"], "https://modelcontextprotocol.io/a")
+
+        # Mismo lastmod en la siguiente comprobación: sin peticiones; /c desaparece del sitio
+        del self.entries["/c"], self.contents["/c"]
+        second = await self.navigator.changes.check()
+
+        self.assertEqual(self.requests, ["/a", "/c"])
+        self.assertEqual((second["changed"], second["removed"]), (0, 1))
+        self.assertNotIn("https://modelcontextprotocol.io/c", self.navigator.cache)
+        self.assertNotIn("https://modelcontextprotocol.io/c", self.navigator.index)
+
+    @patch.dict(CONFIG, {"RETRY_DELAY": 0})
+    async def test_failed_refresh_is_retried(self):
+        """Probar que una página que no se pudo refrescar cuenta como error y se reintenta en la siguiente comprobación."""
+        url = "https://modelcontextprotocol.io/a"
+        self.entries = {"/a": time.time() + 60}
+        self.contents["/a"] = "updated"
+        self.failing = True
+        first = await self.navigator.changes.check()
+
+        self.assertEqual((first["changed"], first["errors"]), (0, 1))
+        self.assertIn("one", self.navigator.cache.get_entry(url)["data"]["content"])
+
+        self.failing = False
+        second = await self.navigator.changes.check()
+
+        self.assertEqual((second["changed"], second["unchanged"]), (1, 0))
+        self.assertIn("updated", self.navigator.cache.get(url)["content"])
+
+    async def test_renewal_reaches_store_and_shared_cache(self):
+        """Probar que una página sin cambios renueva su vigencia también en el almacén y en Redis."""
+        url = "https://modelcontextprotocol.io/a"
+        self.entries = {"/a": time.time() - 3600}
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(CONFIG, {"STORE_DIR": tmp}):
+            navigator = WebsiteNavigator(
+                transport=self.navigator.client._transport,
+                shared=RedisPageCache(FakeRedis(), ttl=60),
+            )
+            follower = PageStore(tmp)
+            try:
+                with patch("app.core.shared_cache.time.time", return_value=time.time() - 50):
+                    await navigator.fetch_page("/a")
+                follower.refresh()
+                self.requests.clear()
+
+                stats = await navigator.changes.check()
+
+                self.assertEqual((stats["unchanged"], self.requests), (1, []))
+                # Los demás workers ven la renovación al sincronizarse con el almacén
+                self.assertEqual(follower.refresh(), [url])
+                self.assertLess((await navigator.shared.get(url))["age"], 5)
+            finally:
+                follower.close()
+                await navigator.aclose()
+
+    async def test_unchanged_content_is_not_reindexed(self):
+        """Probar que una descarga con el mismo contenido conserva la página sin reindexarla."""
+        before = self.navigator.cache.get("https://modelcontextprotocol.io/b")
+        with patch.object(self.navigator, "_index_page") as index_page:
+            same = await self.navigator.fetch_page("/b", revalidate=True)
+
+        index_page.assert_not_called()
+        self.assertIs(same, before)
+        self.assertEqual(self.requests, ["/b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
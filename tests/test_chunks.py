@@ -0,0 +1,124 @@
+"""Pruebas para la división del contenido en fragmentos y la paginación de las tools."""
+
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+import app
+from app import CONFIG
+from app.core.chunks import ChunkedContent
+
+CONTENT = "# Spec\n\nIntro.\n\n## Tools\n\n" + "Tools line.\n" * 10 + "```\n# comment\n```\n\n## Prompts\n\n" + "ñandú " * 3
+
+
+class TestChunkedContent(unittest.TestCase):
+    """Pruebas para la clase ChunkedContent."""
+
+    def test_chunks_cover_content_and_prefer_headings(self):
+        """Probar que los fragmentos son contiguos, acotados y empiezan en encabezados si es posible."""
+        chunked = ChunkedContent(CONTENT, max_bytes=80)
+        raw = CONTENT.encode("utf-8")
+
+        self.assertEqual("".join(chunked.texts()), CONTENT)
+        self.assertTrue(all(end - start <= 80 for start, end in chunked.bounds))
+        self.assertEqual(chunked.bounds[1][0], raw.index(b"## Tools"))
+        self.assertEqual([entry["title"] for entry in chunked.outline], ["Spec", "Tools", "Prompts"])
+        for entry in chunked.outline:
+            start, end = chunked.bounds[entry["chunk"]]
+            self.assertTrue(start <= entry["offset"] < end)
+            self.assertTrue(raw[entry["offset"]:].startswith(b"#"))
+
+    def test_read_respects_character_boundaries(self):
+        """Probar que la lectura por bytes no corta caracteres multibyte."""
+        chunked = ChunkedContent("ñandú", max_bytes=4)
+        part = chunked.read(1, 3)
+
+        self.assertEqual(part, {"content": "ña", "start": 0, "end": 3})
+        self.assertEqual("".join(chunked.texts()), "ñandú")
+        self.assertEqual(chunked.read(4, 100), {"content": "dú", "start": 4, "end": 7})
+        self.assertFalse(hasattr(chunked, "raw"))
+
+    def test_sections_by_anchor_and_title(self):
+        """Probar que cada sección llega hasta el siguiente encabezado de su nivel e incluye sus subsecciones."""
+        content = "# Spec\n\nIntro.\n\n## Tool definition\n\nA.\n\n### Input schema\n\nB.\n\n## Errors\n\nC.\n"
+        chunked = ChunkedContent(content, anchors=[{"title": "Errors", "anchor": "error-handling"}])
+
+        section = chunked.section("#tool-definition")
+        self.assertEqual(section["content"], "## Tool definition\n\nA.\n\n### Input schema\n\nB.\n\n")
+        self.assertEqual([entry["title"] for entry in section["outline"]], ["Input schema"])
+        self.assertEqual(chunked.section("Errors")["heading"]["anchor"], "error-handling")
+        self.assertEqual(chunked.section("error-handling")["content"], "## Errors\n\nC.\n")
+        self.assertEqual(chunked.section("input-schema", limit=6)["content"], "### In")
+        self.assertEqual(chunked.section("Spec")["end"], len(content))
+        self.assertIsNone(chunked.section("missing"))
+
+
+class TestPaginatedTools(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la paginación de contenido y enlaces en las tools."""
+
+    async def asyncSetUp(self):
+        """Sustituir el navegador global por uno con una página larga."""
+        links = "".join(f'<a href="/l{i}">L{i}</a>' for i in range(30))
+        sections = "".join(f"<h2>Section {i}</h2><p>{'text ' * 40}</p>" for i in range(6))
+        html = f"<html><title>Long</title><main>{sections}{links}</main></html>"
+        self.navigator = app.WebsiteNavigator(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=html)))
+        self.patcher = patch.object(app, "navigator", self.navigator)
+        self.patcher.start()
+
+    async def asyncTearDown(self):
+        """Restaurar el navegador global."""
+        self.patcher.stop()
+        await self.navigator.aclose()
+
+    @patch.dict(CONFIG, {"CONTENT_CHUNK_BYTES": 512, "MAX_LINKS": 20})
+    async def test_navigate_chunks_and_links(self):
+        """Probar que navigate devuelve fragmentos, índice y enlaces paginados desde la división cacheada."""
+        first = await app.navigate("/long")
+        chunked = self.navigator._chunked[first["url"]]
+
+        self.assertGreater(first["chunks"], 1)
+        self.assertLessEqual(len(first["content"].encode("utf-8")), 512)
+        self.assertEqual(len(first["outline"]), 6)
+        self.assertEqual((len(first["links"]), first["links_total"], first["next_links_offset"]), (20, 30, 20))
+
+        second = await app.current_page(chunk=first["next_chunk"], links_offset=20)
+        self.assertIs(self.navigator._chunked[first["url"]], chunked)
+        self.assertEqual(second["range"]["start"], first["range"]["end"])
+        self.assertEqual([link["url"] for link in second["links"]], [f"/l{i}" for i in range(20, 30)])
+        self.assertIsNone(second["next_links_offset"])
+
+        by_offset = await app.current_page(offset=first["outline"][3]["offset"], limit=64)
+        self.assertTrue(by_offset["content"].startswith("## Section 3"))
+        self.assertIsNone(by_offset["chunk"])
+
+        # Los límites pedidos por el cliente no superan los configurados
+        everything = await app.current_page(offset=0, limit=10**9, links_limit=10**9)
+        self.assertLessEqual(len(everything["content"].encode("utf-8")), 512)
+        self.assertIsNotNone(everything["next_offset"])
+        self.assertEqual(len(everything["links"]), 20)
+
+    async def test_fragment_and_get_section(self):
+        """Probar que navigate con #fragmento y get_section devuelven solo la sección pedida."""
+        page = await app.navigate("/long#section-2")
+        self.assertEqual(page["section"]["title"], "Section 2")
+        self.assertTrue(page["content"].startswith("## Section 2"))
+        self.assertNotIn("Section 3", page["content"])
+        self.assertIn("links", page)
+
+        with patch.dict(CONFIG, {"CONTENT_CHUNK_BYTES": 64}):
+            capped = await app.get_section("/long", "Section 2", limit=10**9)
+        self.assertEqual(len(capped["content"].encode("utf-8")), 64)
+        self.assertIsNotNone(capped["next_offset"])
+
+        section = await app.get_section("/long", "Section 3")
+        self.assertEqual(section["section"]["anchor"], "section-3")
+        self.assertNotIn("Section 4", section["content"])
+
+        missing = await app.get_section("/long", "missing")
+        self.assertIn("error", missing)
+        self.assertEqual(len(missing["sections"]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
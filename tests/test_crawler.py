@@ -0,0 +1,83 @@
+"""Pruebas para el rastreador del sitio."""
+
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app import CONFIG, WebsiteNavigator
+from app.core.crawler import SiteCrawler
+
+BASE_URL = "https://modelcontextprotocol.io"
+
+SITE = {
+    "/": ["/a", "/b", "https://example.com/external"],
+    "/a": ["/c", "/"],
+    "/b": ["/private/secret", "/a"],
+    "/c": ["/d"],
+    "/d": [],
+}
+
+
+class TestSiteCrawler(unittest.IsolatedAsyncioTestCase):
+    """Pruebas para la clase SiteCrawler."""
+
+    def setUp(self):
+        """Configurar un sitio de prueba con robots.txt."""
+        self.requested = []
+        self.agents = set()
+        self.robots = "User-agent: *\nDisallow: /private/\n"
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(self.handler))
+
+    async def asyncTearDown(self):
+        """Cerrar el cliente HTTP."""
+        await self.navigator.aclose()
+
+    def handler(self, request):
+        """Servir el grafo de enlaces de SITE."""
+        path = request.url.path
+        self.agents.add(request.headers["user-agent"])
+        if path == "/robots.txt":
+            return httpx.Response(200, text=self.robots)
+        self.requested.append(path)
+        if path not in SITE:
+            return httpx.Response(404)
+        links = "".join(f'<a href="{href}">{href}</a>' for href in SITE[path])
+        return httpx.Response(200, text=f"<html><title>{path}</title><main>{links}</main></html>")
+
+    async def test_bfs_with_depth_limit_and_robots(self):
+        """Probar el recorrido en anchura con límite de profundidad y robots.txt."""
+        crawler = SiteCrawler(self.navigator, BASE_URL, max_depth=2, concurrency=2, delay=0)
+
+        stats = await crawler.crawl()
+
+        self.assertEqual(sorted(self.requested), ["/", "/a", "/b", "/c"])
+        self.assertEqual((stats["pages"], stats["errors"], stats["max_depth"]), (4, 0, 2))
+        self.assertIn(f"{BASE_URL}/c", self.navigator.index)
+        self.assertEqual(self.navigator.current_url, BASE_URL)
+
+    async def test_page_limit(self):
+        """Probar el límite de páginas por recorrido."""
+        crawler = SiteCrawler(self.navigator, BASE_URL, max_pages=2, delay=0)
+
+        stats = await crawler.crawl()
+
+        self.assertEqual(stats["pages"], 2)
+        self.assertEqual(len(self.requested), 2)
+
+    async def test_robots_for_own_user_agent(self):
+        """Probar que robots.txt se aplica al User-Agent que se envía y que respeta MAX_BODY_BYTES."""
+        self.robots = "User-agent: mcp-nav\nDisallow: /b\n\nUser-agent: *\nDisallow: /\n"
+        crawler = SiteCrawler(self.navigator, BASE_URL, max_depth=1, delay=0, user_agent=CONFIG["USER_AGENT"])
+
+        await crawler.crawl()
+        self.assertEqual(sorted(self.requested), ["/", "/a"])
+        self.assertEqual(self.agents, {CONFIG["USER_AGENT"]})
+
+        self.robots += "#" * 100
+        with patch.dict(CONFIG, {"MAX_BODY_BYTES": 64}):
+            self.assertIsNone(await crawler._load_robots())
+
+
+if __name__ == "__main__":
+    unittest.main()
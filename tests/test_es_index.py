@@ -0,0 +1,144 @@
+"""Pruebas para el índice de búsqueda en Elasticsearch."""
+
+import asyncio
+import types
+import unittest
+
+import httpx
+from elasticsearch.exceptions import TransportError
+
+from app import WebsiteNavigator
+from app.core.es_index import ElasticsearchIndex
+
+
+class FakeElasticsearch:
+    """Cliente mínimo en memoria con la parte de la API que usa ElasticsearchIndex."""
+
+    def __init__(self):
+        self.docs = {}
+        self.batches = []
+        self.fail_search = False
+        self.refreshes = 0
+        self.bulk_gate = None
+        self.indices = types.SimpleNamespace(
+            exists=self._exists, create=self._create, refresh=self._refresh
+        )
+        self.created = False
+
+    async def _exists(self, index):
+        return self.created
+
+    async def _create(self, index, mappings):
+        self.created = True
+
+    async def _refresh(self, index):
+        self.refreshes += 1
+
+    async def bulk(self, operations):
+        await asyncio.sleep(0.01)
+        if self.bulk_gate is not None:
+            await self.bulk_gate.wait()
+        items = []
+        operations = iter(operations)
+        for action in operations:
+            if "delete" in action:
+                found = self.docs.pop(action["delete"]["_id"], None) is not None
+                items.append({"delete": {"status": 200 if found else 404}})
+            else:
+                self.docs[action["index"]["_id"]] = next(operations)
+                items.append({"index": {"status": 201}})
+        self.batches.append(len(items))
+        return {"errors": False, "items": items}
+
+    async def search(self, index, size, query, highlight, source_includes):
+        if self.fail_search:
+            raise TransportError("connection refused")
+        term = query["multi_match"]["query"].lower()
+        hits = [
+            {
+                "_score": 1.0 + doc["title"].lower().count(term),
+                "_source": {"url": doc["url"], "title": doc["title"], "content": doc["content"]},
+                "highlight": {"content": [line for line in doc["content"].splitlines() if term in line.lower()][:1]},
+            }
+            for doc in self.docs.values()
+            if term in (doc["title"] + doc["content"]).lower()
+        ]
+        hits.sort(key=lambda hit: hit["_score"], reverse=True)
+        return {"hits": {"hits": hits[:size]}}
+
+    async def close(self):
+        pass
+
+
+class TestElasticsearchIndex(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la indexación por lotes y la búsqueda con resaltado."""
+
+    async def asyncSetUp(self):
+        """Crear un navegador con el índice de Elasticsearch simulado."""
+        def handler(request):
+            path = request.url.path
+            return httpx.Response(
+                200,
+                text=f"<html><title>{path}</title><main><h2>Tools {path}</h2><p>About tools and {path}.</p>"
+                f'<a href="/next">Next</a></main></html>',
+            )
+
+        self.es_client = FakeElasticsearch()
+        self.es = ElasticsearchIndex(self.es_client, batch_size=2, flush_interval=5, max_pending=2)
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler), es=self.es)
+
+    async def asyncTearDown(self):
+        """Cerrar el navegador."""
+        await self.navigator.aclose()
+
+    async def test_bulk_batches_and_search_with_highlight(self):
+        """Probar que las páginas se envían en lotes acotados y se buscan con su fragmento resaltado."""
+        async for _ in self.navigator.fetch_many([f"/p{i}" for i in range(5)]):
+            pass
+        await self.es.flush()
+        results = await self.navigator.search("tools", limit=3)
+
+        self.assertEqual(sum(self.es_client.batches), 5)
+        self.assertTrue(all(size <= 2 for size in self.es_client.batches))
+        self.assertTrue(self.es_client.created)
+        doc = self.es_client.docs["https://modelcontextprotocol.io/p0"]
+        self.assertEqual(doc["headings"], ["Tools /p0"])
+        self.assertEqual(doc["links"], [{"text": "Next", "url": "/next"}])
+        self.assertEqual(len(results), 3)
+        self.assertIn("tools", results[0]["snippet"].lower())
+
+    async def test_search_does_not_wait_for_pending_bulk(self):
+        """Probar que una búsqueda no espera a la cola de indexación ni fuerza un refresh."""
+        await self.navigator.fetch_page("/p1")
+        await self.es.flush()
+        refreshes = self.es_client.refreshes
+        self.es_client.bulk_gate = asyncio.Event()
+        await self.navigator.fetch_page("/p2")
+
+        results = await asyncio.wait_for(self.es.search("tools"), timeout=1)
+
+        self.assertEqual([result["url"] for result in results], ["https://modelcontextprotocol.io/p1"])
+        self.assertEqual(self.es_client.refreshes, refreshes)
+        self.es_client.bulk_gate.set()
+
+    async def test_falls_back_to_memory_index(self):
+        """Probar que, si Elasticsearch no responde, se busca en el índice en memoria."""
+        await self.navigator.fetch_page("/p1")
+        self.es_client.fail_search = True
+
+        results = await self.navigator.search("tools")
+
+        self.assertEqual([result["url"] for result in results], ["https://modelcontextprotocol.io/p1"])
+
+    async def test_forget_removes_document(self):
+        """Probar que una página eliminada del sitio se borra también de Elasticsearch."""
+        await self.navigator.fetch_page("/p1")
+        await self.navigator.forget("https://modelcontextprotocol.io/p1")
+        await self.es.flush()
+
+        self.assertEqual(self.es_client.docs, {})
+        self.assertEqual(self.es.errors, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Pruebas para el índice invertido de búsqueda."""
+
+import unittest
+
+from app.core.index import SearchIndex, tokenize
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Pruebas para la clase SearchIndex."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba."""
+        self.index = SearchIndex()
+        self.index.add("https://example.com/python", "Python SDK", "Install the Python SDK with pip.")
+        self.index.add("https://example.com/tools", "Tools", "Tools let servers expose functions. Python is optional.")
+        self.index.add("https://example.com/prompts", "Prompts", "Prompts are reusable templates.")
+
+    def test_tokenize(self):
+        """Probar la normalización de términos."""
+        self.assertEqual(tokenize("Hola, MCP-Nav 2!"), ["hola", "mcp", "nav", "2"])
+
+    def test_search_ranks_title_matches_first(self):
+        """Probar que las coincidencias en el título puntúan más alto."""
+        results = self.index.search("python sdk")
+        self.assertEqual([r["url"] for r in results][:2], ["https://example.com/python", "https://example.com/tools"])
+        self.assertGreater(results[0]["relevance"], results[1]["relevance"])
+        self.assertIn("Python SDK", results[0]["snippet"])
+
+    def test_reindex_replaces_postings(self):
+        """Probar que reindexar una URL elimina sus términos anteriores."""
+        self.index.add("https://example.com/prompts", "Prompts", "Sampling requests.")
+        self.assertEqual(self.index.search("templates"), [])
+        self.assertEqual(self.index.search("sampling")[0]["url"], "https://example.com/prompts")
+        self.assertEqual(len(self.index), 3)
+
+    def test_remove(self):
+        """Probar la eliminación de documentos."""
+        self.assertTrue(self.index.remove("https://example.com/python"))
+        self.assertFalse(self.index.remove("https://example.com/python"))
+        self.assertNotIn("https://example.com/python", self.index)
+        self.assertEqual([r["url"] for r in self.index.search("sdk")], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
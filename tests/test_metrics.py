@@ -0,0 +1,83 @@
+"""Pruebas para las métricas Prometheus."""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import httpx
+from prometheus_client import REGISTRY
+
+import app
+from app import CONFIG
+from app.core.metrics import setup_tracing
+
+PAGE = "<html><title>Metrics</title><main><p>Body</p></main></html>"
+
+
+def sample(name, **labels):
+    """Valor actual de una métrica (0 si aún no tiene muestras)."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class TestMetrics(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la instrumentación del camino de descarga y análisis."""
+
+    async def asyncSetUp(self):
+        """Sustituir el navegador global por uno con transporte simulado."""
+        responses = [httpx.Response(503), httpx.Response(200, text=PAGE)]
+        self.navigator = app.WebsiteNavigator(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        self.patcher = patch.object(app, "navigator", self.navigator)
+        self.patcher.start()
+
+    async def asyncTearDown(self):
+        """Restaurar el navegador global."""
+        self.patcher.stop()
+        await self.navigator.aclose()
+
+    @patch.dict(CONFIG, {"RETRY_DELAY": 0})
+    async def test_fetch_parse_and_tool_metrics(self):
+        """Probar que una navegación registra latencias, reintentos, bytes y aciertos del caché."""
+        parser = CONFIG["PARSER"]
+        before = {
+            "retries": sample("mcp_nav_fetch_retries_total"),
+            "bytes": sample("mcp_nav_fetch_bytes_total"),
+            "fetch_ok": sample("mcp_nav_fetch_seconds_count", status="200"),
+            "parse": sample("mcp_nav_parse_seconds_count", parser=parser),
+            "convert": sample("mcp_nav_convert_seconds_count", parser=parser),
+            "tool": sample("mcp_nav_tool_seconds_count", tool="navigate", status="ok"),
+        }
+
+        await app.navigate("/metrics-page")
+        await app.navigate("/metrics-page")
+
+        self.assertEqual(sample("mcp_nav_fetch_retries_total") - before["retries"], 1)
+        self.assertEqual(sample("mcp_nav_fetch_bytes_total") - before["bytes"], len(PAGE))
+        self.assertEqual(sample("mcp_nav_fetch_seconds_count", status="200") - before["fetch_ok"], 1)
+        self.assertEqual(sample("mcp_nav_parse_seconds_count", parser=parser) - before["parse"], 1)
+        self.assertEqual(sample("mcp_nav_convert_seconds_count", parser=parser) - before["convert"], 1)
+        self.assertEqual(sample("mcp_nav_tool_seconds_count", tool="navigate", status="ok") - before["tool"], 2)
+        self.assertEqual(sample("mcp_nav_cache_hit_ratio"), 0.5)
+
+        response = await app.metrics_response(None)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"mcp_nav_fetch_seconds_bucket", response.body)
+
+
+
+class TestTracing(unittest.TestCase):
+    """Pruebas de la configuración del exportador de trazas."""
+
+    def test_exporter_only_with_endpoint(self):
+        """Probar que sin endpoint, o sin el extra `otlp`, no se instala ningún proveedor."""
+        with patch.dict(os.environ, clear=True):
+            self.assertIsNone(setup_tracing())
+
+        missing = {"opentelemetry.exporter.otlp.proto.http.trace_exporter": None}
+        with patch.dict(os.environ, {"OTEL_EXPORTER_OTLP_ENDPOINT": "http://localhost:4318"}), \
+                patch.dict(sys.modules, missing), self.assertLogs("mcp-nav", "WARNING"):
+            self.assertIsNone(setup_tracing())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,29 +1,16 @@
 """Pruebas para el módulo WebsiteNavigator."""
 
+import asyncio
+import types
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
-from app import WebsiteNavigator
+import httpx
 
+import app
+from app import CONFIG, WebsiteNavigator
 
-class TestWebsiteNavigator(unittest.TestCase):
-    """Pruebas para la clase WebsiteNavigator."""
-
-    def setUp(self):
-        """Configurar el entorno de prueba."""
-        self.navigator = WebsiteNavigator()
-    
-    def test_init(self):
-        """Probar la inicialización correcta."""
-        self.assertEqual(self.navigator.current_url, "https://modelcontextprotocol.io")
-        self.assertEqual(self.navigator.history, ["https://modelcontextprotocol.io"])
-    
-    @patch('requests.Session.get')
-    def test_get_page_content(self, mock_get):
-        """Probar la obtención de contenido de página."""
-        # Configurar el mock
-        mock_response = MagicMock()
-        mock_response.text = """
+TEST_PAGE = """
         <html>
             <head><title>Test Page</title></head>
             <body>
@@ -35,10 +22,33 @@ class TestWebsiteNavigator(unittest.TestCase):
             </body>
         </html>
         """
-        mock_get.return_value = mock_response
-        
-        # Llamar a la función a probar
-        result = self.navigator.get_page_content("/test-page")
+
+
+class TestWebsiteNavigator(unittest.IsolatedAsyncioTestCase):
+    """Pruebas para la clase WebsiteNavigator."""
+
+    def setUp(self):
+        """Configurar el entorno de prueba."""
+        self.requests = []
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(self.handler))
+
+    async def asyncTearDown(self):
+        """Cerrar el cliente HTTP."""
+        await self.navigator.aclose()
+
+    def handler(self, request):
+        """Responder a las peticiones con la página de prueba."""
+        self.requests.append(request)
+        return httpx.Response(200, text=TEST_PAGE)
+    
+    def test_init(self):
+        """Probar la inicialización correcta."""
+        self.assertEqual(self.navigator.current_url, "https://modelcontextprotocol.io")
+        self.assertEqual(self.navigator.history, ["https://modelcontextprotocol.io"])
+    
+    async def test_get_page_content(self):
+        """Probar la obtención de contenido de página."""
+        result = await self.navigator.get_page_content("/test-page")
         
         # Verificar resultados
         self.assertEqual(result["title"], "Test Page")
@@ -47,7 +57,311 @@ class TestWebsiteNavigator(unittest.TestCase):
         self.assertEqual(result["links"][0]["url"], "/test")
         self.assertEqual(self.navigator.current_url, "https://modelcontextprotocol.io/test-page")
         self.assertEqual(len(self.navigator.history), 2)
+        self.assertIn("https://modelcontextprotocol.io/test-page", self.navigator.index)
+
+    
+    @patch.dict(CONFIG, {"RETRY_DELAY": 0})
+    async def test_make_request_retries(self):
+        """Probar que los errores transitorios se reintentan."""
+        responses = [httpx.Response(503), httpx.Response(200, text=TEST_PAGE)]
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        
+        response, body = await self.navigator._make_request("https://modelcontextprotocol.io/")
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Test Page", body)
+        self.assertEqual(responses, [])
+
+    @patch.dict(CONFIG, {"RETRY_DELAY": 0})
+    async def test_client_errors_are_not_retried(self):
+        """Probar que un 4xx se devuelve sin reintentos y sin contar como fallo del origen."""
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(404)
+
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+
+        result = await self.navigator.fetch_page("/missing")
+
+        self.assertIn("404", result["error"])
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.navigator.breakers["modelcontextprotocol.io"].failures, 0)
+
+    @patch.dict(CONFIG, {"HEDGE_REQUESTS": True, "LATENCY_MIN_SAMPLES": 5})
+    async def test_hedged_request_after_p95(self):
+        """Probar que una petición lenta se duplica al superar el p95 y gana la primera en terminar."""
+        async def handler(request):
+            self.requests.append(request)
+            if request.url.path == "/slow" and len(self.requests) == 1:
+                await asyncio.sleep(5)
+            return httpx.Response(200, text=TEST_PAGE)
+
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        for _ in range(5):
+            await self.navigator._make_request("https://modelcontextprotocol.io/warmup")
+        self.requests.clear()
+
+        result = await asyncio.wait_for(self.navigator.fetch_page("/slow"), timeout=2)
+
+        self.assertEqual(result["title"], "Test Page")
+        self.assertEqual(len(self.requests), 2)
+
+    @patch.dict(CONFIG, {"LATENCY_MIN_SAMPLES": 5})
+    async def test_local_queueing_is_not_upstream_latency(self):
+        """Probar que la espera de turno local no cuenta para el plazo, el hedging ni el circuit breaker."""
+        async def handler(request):
+            self.requests.append(request)
+            await asyncio.sleep(0.1)
+            return httpx.Response(200, text=TEST_PAGE)
+
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        for _ in range(5):
+            await self.navigator._make_request("https://modelcontextprotocol.io/warmup")
+        self.requests.clear()
+
+        # 150 páginas con 10 conexiones por host: la cola local supera el plazo adaptativo (1 s)
+        pages = await asyncio.gather(*(self.navigator.fetch_page(f"/burst-{i}") for i in range(150)))
+
+        self.assertEqual([page for page in pages if "error" in page], [])
+        self.assertEqual(len(self.requests), 150)
+        self.assertEqual(self.navigator.breakers["modelcontextprotocol.io"].stats(), {"state": "closed", "failures": 0})
+
+    @patch.dict(CONFIG, {"RETRY_DELAY": 0, "BREAKER_FAILURES": 2, "HEDGE_REQUESTS": False})
+    async def test_circuit_breaker_serves_stale(self):
+        """Probar que con el circuito abierto se sirve lo obsoleto o se falla sin contactar con el origen."""
+        failing = []
+
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(503) if failing else httpx.Response(200, text=TEST_PAGE)
+
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        self.navigator.cache.ttl = 0
+        first = await self.navigator.fetch_page("/test-page")
+        failing.append(True)
+
+        stale = await self.navigator.fetch_page("/test-page")  # dos 503: el circuito se abre
+        self.assertIs(stale, first)
+        self.assertEqual(len(self.requests), 3)
+
+        again = await self.navigator.fetch_page("/test-page")
+        missing = await self.navigator.fetch_page("/other")
+        self.assertIs(again, first)
+        self.assertEqual(missing["status"], 503)
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_body_size_cap(self):
+        """Probar que las respuestas mayores que MAX_BODY_BYTES se abortan sin reintentos ni caché."""
+        async def stream():
+            for _ in range(4):
+                yield b"<p>" + b"x" * 1000 + b"</p>"
+
+        async def handler(request):
+            self.requests.append(request)
+            if request.url.path == "/declared":
+                return httpx.Response(200, text=TEST_PAGE + " " * 5000)
+            return httpx.Response(200, content=stream())
+
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        with patch.dict(CONFIG, {"MAX_BODY_BYTES": 2048}):
+            declared = await self.navigator.fetch_page("/declared")
+            chunked = await self.navigator.fetch_page("/chunked")
+
+        self.assertIn("tamaño máximo", declared["error"])
+        self.assertIn("tamaño máximo", chunked["error"])
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(len(self.navigator.cache), 0)
+
+    
+    async def test_index_site_fetches_links_concurrently(self):
+        """Probar que los enlaces de la portada se obtienen en paralelo y con límite."""
+        home = "".join(f'<a href="/page-{i}">Page {i}</a>' for i in range(6))
+        in_flight = []
+        peak = []
+        
+        async def handler(request):
+            if request.url.path == "/":
+                return httpx.Response(200, text=f"<html><body><main>{home}</main></body></html>")
+            in_flight.append(request)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.05)
+            in_flight.remove(request)
+            if request.url.path == "/page-5":
+                await asyncio.sleep(1)
+            return httpx.Response(200, text=f"<html><title>{request.url.path}</title><main>mcp</main></html>")
+        
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        
+        urls = [f"/page-{i}" for i in range(6)]
+        pages = [page async for page in self.navigator.fetch_many(urls, concurrency=3, timeout=0.5)]
+        
+        self.assertEqual(max(peak), 3)
+        self.assertEqual(pages[-1], {"error": "timeout", "url": "https://modelcontextprotocol.io/page-5"})
+        self.assertEqual(len(self.navigator.index), 5)
+        self.assertEqual(self.navigator.current_url, "https://modelcontextprotocol.io")
+
+    
+    async def test_search_stream_sends_hits_and_stops_early(self):
+        """Probar que cada resultado se notifica al encontrarse y que max_results corta la búsqueda."""
+        home = "".join(f'<a href="/page-{i}">Page {i}</a>' for i in range(4))
+        
+        async def handler(request):
+            self.requests.append(request)
+            if request.url.path == "/":
+                return httpx.Response(200, text=f"<html><title>Home</title><main>{home}</main></html>")
+            if request.url.path == "/page-3":
+                await asyncio.sleep(5)
+            return httpx.Response(200, text=f"<html><title>{request.url.path}</title><main>tools</main></html>")
+        
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        notifications = []
+        
+        async def send_notification(notification):
+            notifications.append(notification.root.params)
+        
+        ctx = types.SimpleNamespace(
+            request_context=types.SimpleNamespace(meta=types.SimpleNamespace(progressToken="t")),
+            session=types.SimpleNamespace(send_notification=send_notification),
+        )
+        with patch.object(app, "navigator", self.navigator):
+            results = await asyncio.wait_for(app.search_stream("tools", ctx, max_results=3), timeout=2)
+        
+        self.assertEqual([params.progress for params in notifications], [1, 2, 3])
+        self.assertTrue(all(params.hit["relevance"] > 0 for params in notifications))
+        self.assertEqual(len(results), 3)
+        self.assertNotIn("https://modelcontextprotocol.io/page-3", self.navigator.index)
+
+    async def test_navigate_many_keeps_order_and_state(self):
+        """Probar que navigate_many devuelve las páginas en orden, con errores por página y sin navegar."""
+        async def handler(request):
+            if request.url.path == "/slow":
+                await asyncio.sleep(0.05)
+            if request.url.path == "/missing":
+                return httpx.Response(404)
+            body = "x" * 100
+            return httpx.Response(200, text=f"<html><title>{request.url.path}</title><main><h2>Intro</h2><p>{body}</p></main></html>")
+
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        with patch.object(app, "navigator", self.navigator), patch.dict(CONFIG, {"RETRY_DELAY": 0}):
+            result = await app.navigate_many(["/slow", "/missing", "/fast"], max_bytes=20)
+            titles = await app.navigate_many(["/fast"], mode="titles")
+            invalid = await app.navigate_many(["/fast"], mode="html")
+            with patch.dict(CONFIG, {"BATCH_MAX_BYTES": 30}):
+                capped = await app.navigate_many(["/fast"], max_bytes=10**9)
+
+        pages = result["pages"]
+        self.assertEqual([page["url"] for page in pages], [
+            "https://modelcontextprotocol.io/slow",
+            "https://modelcontextprotocol.io/missing",
+            "https://modelcontextprotocol.io/fast",
+        ])
+        self.assertIn("error", pages[1])
+        self.assertEqual(len(pages[0]["content"].encode()), 20)
+        self.assertTrue(pages[0]["truncated"])
+        self.assertEqual(pages[2]["outline"][0]["title"], "Intro")
+        self.assertEqual(set(titles["pages"][0]), {"url", "title", "total_bytes"})
+        self.assertIn("error", invalid)
+        self.assertLessEqual(len(capped["pages"][0]["content"].encode()), 30)
+        self.assertTrue(capped["pages"][0]["truncated"])
+        self.assertEqual(self.navigator.history, ["https://modelcontextprotocol.io"])
+
+    async def test_revalidation_not_modified(self):
+        """Probar que un 304 renueva la entrada sin volver a analizar la página."""
+        def handler(request):
+            self.requests.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=TEST_PAGE, headers={"ETag": '"v1"'})
+        
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        self.navigator.cache.ttl = 0
+        
+        first = await self.navigator.fetch_page("/test-page")
+        with patch.object(self.navigator, "_parse_page") as parse:
+            second = await self.navigator.fetch_page("/test-page")
+        
+        parse.assert_not_called()
+        self.assertIs(second, first)
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.navigator.cache.stats()["revalidations"], 1)
+    
+    @patch.dict(CONFIG, {"STALE_WHILE_REVALIDATE": True})
+    async def test_stale_while_revalidate(self):
+        """Probar que una entrada caducada se sirve y se refresca en segundo plano."""
+        self.navigator.cache.ttl = 0
+        first = await self.navigator.fetch_page("/test-page")
+        
+        second = await self.navigator.fetch_page("/test-page")
+        self.assertIs(second, first)
+        self.assertEqual(len(self.requests), 1)
+        
+        await asyncio.gather(*self.navigator._refreshing.values())
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.navigator._refreshing, {})
+
+    
+    @patch.dict(CONFIG, {"RETRY_DELAY": 0})
+    async def test_concurrent_misses_are_coalesced(self):
+        """Probar que las peticiones simultáneas a la misma URL comparten una descarga."""
+        failures = [httpx.Response(503) for _ in range(CONFIG["MAX_RETRIES"])]
+        
+        async def handler(request):
+            self.requests.append(request)
+            await asyncio.sleep(0.05)
+            return failures.pop() if failures else httpx.Response(200, text=TEST_PAGE)
+        
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+        
+        errors = await asyncio.gather(*(self.navigator.fetch_page(url) for url in ("/test-page", "/test-page#a", "/test-page")))
+        self.assertEqual(len(self.requests), CONFIG["MAX_RETRIES"])  # una sola carga con sus reintentos
+        self.assertTrue(all("503" in error["error"] for error in errors))
+        self.assertNotIn("https://modelcontextprotocol.io/test-page", self.navigator.cache)
+        
+        pages = await asyncio.gather(*(self.navigator.fetch_page("/test-page") for _ in range(3)))
+        self.assertEqual(len(self.requests), CONFIG["MAX_RETRIES"] + 1)
+        self.assertTrue(all(page is pages[0] for page in pages))
+        self.assertEqual(self.navigator._inflight, {})
+
+    
+    async def test_index_follows_cache_evictions(self):
+        """Probar que las páginas desalojadas del caché salen también del índice de búsqueda."""
+        self.navigator.cache.max_entries = 2
+        for path in ("/a", "/b", "/c"):
+            await self.navigator.fetch_page(path)
+
+        self.assertEqual(len(self.navigator.index), 2)
+        self.assertNotIn("https://modelcontextprotocol.io/a", self.navigator.index)
+
+        with patch.object(app, "navigator", self.navigator):
+            await app.clear_cache()
+        self.assertEqual(len(self.navigator.index), 0)
+
+    @patch.dict(CONFIG, {"PARSE_WORKERS": 1})
+    async def test_parse_in_process_pool(self):
+        """Probar el análisis de páginas en un pool de procesos."""
+        await self.navigator.aclose()
+        self.navigator = WebsiteNavigator(transport=httpx.MockTransport(self.handler))
+        
+        result = await self.navigator.fetch_page("/test-page")
+        
+        self.assertIsNotNone(self.navigator._parse_pool)
+        self.assertEqual(result["title"], "Test Page")
+        self.assertIn("Main content", result["content"])
+        # Los procesos del pool importan el paquete sin crear el navegador global
+        in_worker = self.navigator._parse_pool.submit(eval, '__import__("sys").modules["app"].navigator is None')
+        self.assertTrue(await asyncio.wrap_future(in_worker))
 
 
 if __name__ == "__main__":
-    unittest.main() 
\ No newline at end of file
+    unittest.main() 
@@ -0,0 +1,109 @@
+"""Pruebas para la extracción de páginas HTML."""
+
+import unittest
+
+from app.core.chunks import ChunkedContent
+from app.core.parser import PARSERS, StreamingParser, parse_page
+
+BASE_URL = "https://modelcontextprotocol.io"
+
+PAGE = """<!DOCTYPE html>
+<html>
+    <head><title>Tools</title><script>var tracking = 1;</script></head>
+    <body>
+        <nav><a href="/docs">Docs</a><a href="https://github.com/modelcontextprotocol">GitHub</a></nav>
+        <main>
+            <h1>Tools</h1>
+            <p>Tools let <a href="/docs/concepts/servers">servers</a> expose <strong>functions</strong>.</p>
+            <h2 id="overview-section">Overview</h2>
+            <ul><li>Discovery<ul><li>tools/list</li></ul></li><li>Invocation via <code>tools/call</code></li></ul>
+            <pre><code class="language-python">def add(a, b):
+    return a + b
+</code></pre>
+        </main>
+    </body>
+</html>
+"""
+
+
+class TestParser(unittest.TestCase):
+    """Pruebas para parse_page y sus backends."""
+
+    def test_single_pass_extraction(self):
+        """Probar título, enlaces internos y Markdown con el backend lxml."""
+        result = parse_page(PAGE, f"{BASE_URL}/tools", BASE_URL, keep_html=True)
+
+        self.assertEqual(result["title"], "Tools")
+        self.assertEqual([link["url"] for link in result["links"]], ["/docs", "/docs/concepts/servers"])
+        self.assertEqual(result["content"], (
+            "# Tools\n\n"
+            "Tools let [servers](/docs/concepts/servers) expose **functions**.\n\n"
+            "## Overview\n\n"
+            "* Discovery\n"
+            "  * tools/list\n"
+            "* Invocation via `tools/call`\n\n"
+            "```python\n"
+            "def add(a, b):\n"
+            "    return a + b\n"
+            "```\n"
+        ))
+        self.assertEqual(result["anchors"], [{"title": "Overview", "anchor": "overview-section"}])
+        self.assertTrue(result["html"].startswith("<main>"))
+        self.assertNotIn("tracking", result["content"])
+
+    def test_backends_agree(self):
+        """Probar que todos los backends extraen el mismo título, enlaces y texto."""
+        results = {name: parse_page(PAGE, f"{BASE_URL}/tools", BASE_URL, parser=name) for name in PARSERS}
+
+        for name, result in results.items():
+            with self.subTest(parser=name):
+                self.assertEqual(result["title"], "Tools")
+                self.assertEqual(result["links"], results["lxml"]["links"])
+                self.assertIn("return a + b", result["content"])
+        self.assertEqual(results["selectolax"]["content"], results["lxml"]["content"])
+        self.assertEqual(results["selectolax"]["anchors"], results["lxml"]["anchors"])
+
+    def test_streaming_matches_parse_page(self):
+        """Probar que el análisis incremental, trozo a trozo, da el mismo resultado."""
+        body = PAGE.replace("Discovery", "Descubrimiento ñ").encode("utf-8")
+        for name in ("lxml", "html.parser"):
+            with self.subTest(parser=name):
+                stream = StreamingParser(f"{BASE_URL}/tools", BASE_URL, "utf-8", parser=name)
+                for start in range(0, len(body), 7):
+                    stream.feed(body[start:start + 7])
+                result, timings = stream.close()
+
+                expected = parse_page(body.decode("utf-8"), f"{BASE_URL}/tools", BASE_URL, parser=name)
+                self.assertEqual(result, expected)
+                self.assertEqual(stream.size, len(body))
+                self.assertGreater(timings["parse"], 0)
+
+    def test_headings_with_permalinks(self):
+        """Probar encabezados con enlace permanente, envoltorios de bloque y caracteres de ancho cero."""
+        page = (
+            '<html><main><h2 id="tool-definition"><div class="absolute"><a href="#tool-definition">\u200b</a></div>'
+            "<span>Tool definition</span></h2><p>Body.</p>"
+            '<h3><a href="#input-schema">Input <code>schema</code></a></h3><p>Fields.</p></main></html>'
+        )
+        for name in ("lxml", "selectolax"):
+            with self.subTest(parser=name):
+                result = parse_page(page, f"{BASE_URL}/tools", BASE_URL, parser=name)
+                chunked = ChunkedContent(result["content"], anchors=result["anchors"])
+
+                self.assertEqual(result["content"], "## Tool definition\n\nBody.\n\n### Input `schema`\n\nFields.\n")
+                self.assertEqual(result["anchors"], [
+                    {"title": "Tool definition", "anchor": "tool-definition"},
+                    {"title": "Input `schema`", "anchor": "input-schema"},
+                ])
+                self.assertEqual(chunked.section("tool-definition")["heading"]["title"], "Tool definition")
+                self.assertEqual(chunked.section("Tool definition")["outline"][0]["anchor"], "input-schema")
+
+    def test_empty_and_unknown_parser(self):
+        """Probar páginas vacías y backends desconocidos."""
+        self.assertEqual(parse_page("  ", f"{BASE_URL}/x", BASE_URL)["content"], "")
+        with self.assertRaises(ValueError):
+            parse_page(PAGE, f"{BASE_URL}/x", BASE_URL, parser="regex")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Pruebas para el control de admisión (rate limit y límite de peticiones al origen)."""
+
+import asyncio
+import types
+import unittest
+from unittest.mock import patch
+
+import httpx
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import app
+from app import CONFIG
+from app.core.ratelimit import RateLimiter, RateLimitMiddleware, UpstreamGate, UpstreamOverloaded
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """Pruebas para RateLimiter y UpstreamGate."""
+
+    async def test_local_bucket_burst_and_refill(self):
+        """Probar que se admite una ráfaga del tamaño de la ventana y luego el ritmo sostenido."""
+        limiter = RateLimiter(requests=3, window=3)
+        with patch("app.core.ratelimit.time.monotonic", return_value=0):
+            decisions = [await limiter.acquire("a") for _ in range(4)]
+            other = await limiter.acquire("b")
+        with patch("app.core.ratelimit.time.monotonic", return_value=1):
+            refilled = await limiter.acquire("a")
+
+        self.assertEqual([decision.allowed for decision in decisions], [True, True, True, False])
+        self.assertAlmostEqual(decisions[-1].retry_after, 1.0)
+        self.assertTrue(other.allowed)
+        self.assertTrue(refilled.allowed)
+
+    async def test_redis_buckets_are_shared(self):
+        """Probar que dos réplicas consumen del mismo bucket en Redis."""
+        server = FakeServer()
+        replicas = [RateLimiter(2, 60, client=FakeRedis(server=server)) for _ in range(2)]
+        decisions = [await replicas[i % 2].acquire("client") for i in range(3)]
+        for limiter in replicas:
+            await limiter.aclose()
+
+        self.assertEqual([decision.allowed for decision in decisions], [True, True, False])
+        self.assertGreater(decisions[-1].retry_after, 0)
+
+    async def test_upstream_gate_rejects_when_queue_is_full(self):
+        """Probar que, con la cola llena, las peticiones se rechazan sin esperar."""
+        gate = UpstreamGate(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with gate:
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        self.assertEqual(gate.stats(), {"inflight": 1, "queued": 1, "max_concurrency": 1})
+
+        with self.assertRaises(UpstreamOverloaded):
+            async with gate:
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        self.assertEqual(gate.stats()["inflight"], 0)
+
+
+class TestAdmission(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del rate limit en las tools MCP y en el middleware HTTP."""
+
+    @patch.dict(CONFIG, {"RATE_LIMIT_REQUESTS": 2, "RATE_LIMIT_WINDOW": 60})
+    async def test_tools_reject_per_session(self):
+        """Probar que cada sesión tiene su propio bucket y que el exceso recibe un 429."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text="<main>x</main>"))
+        navigator = app.WebsiteNavigator(transport=transport)
+        alice, bob = types.SimpleNamespace(), types.SimpleNamespace()
+        with patch.object(app, "navigator", navigator):
+            with patch.object(app.mcp, "get_context", return_value=types.SimpleNamespace(session=alice)):
+                results = [await app.navigate("/a") for _ in range(3)]
+            with patch.object(app.mcp, "get_context", return_value=types.SimpleNamespace(session=bob)):
+                other = await app.navigate("/a")
+        await navigator.aclose()
+
+        self.assertNotIn("error", results[1])
+        self.assertEqual(results[2]["status"], 429)
+        self.assertGreater(results[2]["retry_after"], 0)
+        self.assertNotIn("error", other)
+
+    def test_middleware_returns_429(self):
+        """Probar que el middleware responde 429 con Retry-After y no limita /ping."""
+        starlette_app = Starlette(routes=[
+            Route("/", lambda request: PlainTextResponse("ok")),
+            Route("/ping", lambda request: PlainTextResponse("pong")),
+        ])
+        starlette_app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(1, 60))
+        client = TestClient(starlette_app)
+
+        self.assertEqual(client.get("/").status_code, 200)
+        response = client.get("/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "60")
+        self.assertEqual(client.get("/ping").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Pruebas para los timeouts adaptativos y el circuit breaker."""
+
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app.core.resilience import CircuitBreaker, CircuitOpen, LatencyTracker, is_transient
+
+
+class TestResilience(unittest.TestCase):
+    """Pruebas para LatencyTracker, CircuitBreaker e is_transient."""
+
+    def test_latency_percentiles(self):
+        """Probar que timeout y espera de hedging salen de los percentiles, con sus límites."""
+        tracker = LatencyTracker(window=100, min_samples=10, factor=3, min_timeout=0.5, max_timeout=10)
+        self.assertEqual(tracker.timeout(), 10)
+        self.assertIsNone(tracker.hedge_delay())
+
+        for i in range(1, 101):
+            tracker.observe(i / 100)
+        self.assertEqual(tracker.hedge_delay(), 0.95)
+        self.assertAlmostEqual(tracker.timeout(), 2.97)
+
+        for _ in range(100):
+            tracker.observe(0.01)
+        self.assertEqual(tracker.timeout(), 0.5)
+
+    def test_breaker_opens_and_probes(self):
+        """Probar que el circuito se abre tras N fallos y deja pasar una sola prueba al expirar."""
+        breaker = CircuitBreaker("example.com", failures=2, reset_timeout=30)
+        with patch("app.core.resilience.time.monotonic", return_value=0):
+            breaker.record_failure()
+            breaker.check()
+            breaker.record_failure()
+            with self.assertRaises(CircuitOpen) as raised:
+                breaker.check()
+        self.assertEqual(raised.exception.retry_after, 30)
+
+        with patch("app.core.resilience.time.monotonic", return_value=31):
+            breaker.check()  # prueba
+            with self.assertRaises(CircuitOpen):
+                breaker.check()
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        with patch("app.core.resilience.time.monotonic", return_value=62):
+            breaker.check()
+            breaker.record_success()
+            breaker.check()
+        self.assertEqual(breaker.stats(), {"state": "closed", "failures": 0})
+
+    def test_transient_errors(self):
+        """Probar qué errores se consideran transitorios (y se reintentan)."""
+        request = httpx.Request("GET", "https://example.com")
+
+        def status_error(code):
+            return httpx.HTTPStatusError("", request=request, response=httpx.Response(code, request=request))
+
+        self.assertTrue(is_transient(status_error(503)))
+        self.assertTrue(is_transient(status_error(429)))
+        self.assertFalse(is_transient(status_error(404)))
+        self.assertTrue(is_transient(httpx.ConnectError("", request=request)))
+        self.assertTrue(is_transient(httpx.TimeoutException("")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""Pruebas para el estado de navegación por sesión."""
+
+import types
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+import app
+from app.core.session import NavigationState, SessionRegistry
+
+BASE_URL = "https://modelcontextprotocol.io"
+
+
+class TestNavigationState(unittest.TestCase):
+    """Pruebas para NavigationState y SessionRegistry."""
+
+    def test_bounded_history(self):
+        """Probar que el historial no repite URLs y descarta las más antiguas."""
+        state = NavigationState(BASE_URL, max_history=3)
+        for path in ("/a", "/b", "/a", "/c"):
+            state.visit(BASE_URL + path)
+
+        self.assertEqual(state.current_url, f"{BASE_URL}/c")
+        self.assertEqual(state.history, [f"{BASE_URL}/a", f"{BASE_URL}/b", f"{BASE_URL}/c"])
+
+    def test_idle_and_capacity_eviction(self):
+        """Probar la expulsión de sesiones inactivas y el límite de sesiones."""
+        with patch("app.core.session.time.monotonic", return_value=0):
+            registry = SessionRegistry(BASE_URL, idle_ttl=10, max_sessions=2)
+            registry.get("a").visit(f"{BASE_URL}/a")
+            registry.get("b")
+        with patch("app.core.session.time.monotonic", return_value=5):
+            self.assertEqual(registry.get("a").current_url, f"{BASE_URL}/a")
+            registry.get("c")
+        self.assertNotIn("b", registry)
+        with patch("app.core.session.time.monotonic", return_value=16):
+            registry.get("c")
+        self.assertEqual(len(registry), 1)
+        self.assertNotIn("a", registry)
+
+
+class TestSessionTools(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de las tools con varias sesiones MCP simultáneas."""
+
+    async def asyncSetUp(self):
+        """Sustituir el navegador global por uno con transporte simulado."""
+        def handler(request):
+            return httpx.Response(200, text=f"<html><title>{request.url.path}</title><main>x</main></html>")
+
+        self.navigator = app.WebsiteNavigator(transport=httpx.MockTransport(handler))
+        self.patcher = patch.object(app, "navigator", self.navigator)
+        self.patcher.start()
+
+    async def asyncTearDown(self):
+        """Restaurar el navegador global."""
+        self.patcher.stop()
+        await self.navigator.aclose()
+
+    def as_session(self, session):
+        """Simular que la petición llega desde una sesión MCP concreta."""
+        return patch.object(app.mcp, "get_context", return_value=types.SimpleNamespace(session=session))
+
+    async def test_sessions_do_not_share_cursor(self):
+        """Probar que cada sesión tiene su propia URL actual e historial."""
+        alice, bob = types.SimpleNamespace(), types.SimpleNamespace()
+        with self.as_session(alice):
+            await app.navigate("/alice")
+        with self.as_session(bob):
+            await app.navigate("/bob")
+        with self.as_session(alice):
+            page = await app.current_page()
+            history = app.browse_history()
+
+        self.assertEqual(page["url"], f"{BASE_URL}/alice")
+        self.assertEqual(history, [BASE_URL, f"{BASE_URL}/alice"])
+        self.assertEqual(len(self.navigator.sessions), 2)
+        self.assertEqual(self.navigator.history, [BASE_URL])
+
+
+if __name__ == "__main__":
+    unittest.main()
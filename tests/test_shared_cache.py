@@ -0,0 +1,73 @@
+"""Pruebas para el caché compartido en Redis."""
+
+import asyncio
+import unittest
+
+import httpx
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from app import WebsiteNavigator
+from app.core.shared_cache import RedisPageCache
+
+PAGE = "<html><head><title>Shared</title></head><body><main><p>Shared content</p></main></body></html>"
+
+
+class TestRedisPageCache(unittest.IsolatedAsyncioTestCase):
+    """Pruebas para la clase RedisPageCache y su uso desde WebsiteNavigator."""
+
+    def setUp(self):
+        """Configurar dos réplicas que comparten el mismo Redis."""
+        self.server = FakeServer()
+        self.requests = []
+        self.replicas = [
+            WebsiteNavigator(
+                transport=httpx.MockTransport(self.handler),
+                shared=RedisPageCache(FakeRedis(server=self.server), ttl=60, lock_ttl=5),
+            )
+            for _ in range(2)
+        ]
+
+    async def asyncTearDown(self):
+        """Cerrar los clientes."""
+        for navigator in self.replicas:
+            await navigator.aclose()
+
+    async def handler(self, request):
+        """Responder lentamente para que las réplicas coincidan en el tiempo."""
+        self.requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=PAGE, headers={"ETag": '"v1"'})
+
+    async def test_round_trip_and_get_many(self):
+        """Probar la serialización comprimida y el MGET."""
+        shared = self.replicas[0].shared
+        await shared.set("https://example.com/a", {"title": "A", "content": "a" * 1000}, {"etag": '"x"'})
+
+        entry = await shared.get("https://example.com/a")
+        self.assertTrue(entry["fresh"])
+        self.assertEqual(entry["validators"], {"etag": '"x"'})
+        many = await shared.get_many(["https://example.com/a", "https://example.com/b"])
+        self.assertEqual(list(many), ["https://example.com/a"])
+
+    async def test_replicas_share_pages(self):
+        """Probar que una réplica reutiliza la página descargada por otra."""
+        first = await self.replicas[0].fetch_page("/shared")
+        second = await self.replicas[1].fetch_page("/shared")
+
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.requests), 1)
+        self.assertIn("https://modelcontextprotocol.io/shared", self.replicas[1].index)
+
+    async def test_single_flight_across_replicas(self):
+        """Probar que solo una réplica descarga una URL pedida a la vez."""
+        results = await asyncio.gather(*(navigator.fetch_page("/shared") for navigator in self.replicas))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(len(self.requests), 1)
+        shared = self.replicas[0].shared
+        self.assertFalse(await shared.client.exists(shared._lock_key("https://modelcontextprotocol.io/shared")))
+
+
+if __name__ == "__main__":
+    unittest.main()
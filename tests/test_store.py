@@ -0,0 +1,172 @@
+"""Pruebas para el almacén de páginas en disco."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app import CONFIG, WebsiteNavigator
+from app.core.store import PageStore
+
+PAGE = {"title": "Tools", "content": "# Tools\n\nTools expose functions.\n", "links": [{"text": "a", "url": "/a"}]}
+
+
+class TestPageStore(unittest.TestCase):
+    """Pruebas para la clase PageStore."""
+
+    def setUp(self):
+        """Crear un directorio temporal para el almacén."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = PageStore(self.tmp.name)
+
+    def tearDown(self):
+        """Cerrar y borrar el almacén."""
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_round_trip_across_reopen(self):
+        """Probar que las páginas sobreviven a un reinicio."""
+        self.store.put("https://example.com/tools", {"url": "https://example.com/tools", **PAGE}, {"etag": '"1"'})
+        self.store.close()
+
+        self.store = PageStore(self.tmp.name)
+        stored = self.store.get("https://example.com/tools")
+        self.assertEqual(stored["data"], {"url": "https://example.com/tools", **PAGE})
+        self.assertEqual(stored["validators"], {"etag": '"1"'})
+        self.assertLess(stored["age"], 5)
+
+    def test_deduplicates_by_content_hash(self):
+        """Probar que el mismo contenido en dos URLs se guarda una sola vez."""
+        self.assertTrue(self.store.put("https://example.com/a", {"url": "https://example.com/a", **PAGE}))
+        self.assertFalse(self.store.put("https://example.com/b", {"url": "https://example.com/b", **PAGE}))
+
+        self.assertEqual(self.store.stats()["blobs"], 1)
+        self.assertEqual(self.store.get("https://example.com/b")["data"]["url"], "https://example.com/b")
+
+    def test_torn_record_and_compaction(self):
+        """Probar que un registro incompleto se ignora y que la compactación libera espacio."""
+        self.store.put("https://example.com/a", PAGE)
+        self.store.put("https://example.com/a", {**PAGE, "content": "changed"})
+        self.store.close()
+        with open(os.path.join(self.tmp.name, PageStore.SEGMENT), "ab") as segment:
+            segment.write(b"\x00" * 10)
+
+        self.store = PageStore(self.tmp.name)
+        self.assertEqual(self.store.stats()["blobs"], 2)
+        self.store.compact()
+        self.assertEqual(self.store.stats()["blobs"], 1)
+        self.assertEqual(self.store.get("https://example.com/a")["data"]["content"], "changed")
+
+    def test_shared_between_processes(self):
+        """Probar que dos instancias sobre el mismo directorio ven lo que escribe la otra."""
+        other = PageStore(self.tmp.name)
+        try:
+            other.put("https://example.com/a", PAGE)
+            self.assertEqual(self.store.refresh(), ["https://example.com/a"])
+            self.assertEqual(self.store.refresh(), [])
+            self.store.put("https://example.com/b", {**PAGE, "content": "b"})
+            self.assertEqual(other.get("https://example.com/b")["data"]["content"], "b")
+
+            other.put("https://example.com/a", {**PAGE, "content": "changed"})
+            other.compact()
+            self.assertEqual(self.store.refresh(), ["https://example.com/a"])
+            self.assertEqual(self.store.get("https://example.com/a")["data"]["content"], "changed")
+            self.assertEqual(self.store.stats()["blobs"], 2)
+
+            self.assertTrue(other.delete("https://example.com/b"))
+            self.assertEqual(self.store.refresh(), ["https://example.com/b"])
+            self.assertIsNone(self.store.get("https://example.com/b"))
+        finally:
+            other.close()
+
+    def test_touch_compacts_url_log(self):
+        """Probar que las renovaciones repetidas no hacen crecer el índice de URLs sin límite."""
+        other = PageStore(self.tmp.name)
+        try:
+            self.store.put("https://example.com/a", PAGE)
+            other.refresh()
+            for _ in range(500):
+                self.store.touch("https://example.com/a")
+            self.assertLessEqual(self.store._url_lines, 102)
+            with open(os.path.join(self.tmp.name, PageStore.URLS), encoding="utf-8") as url_log:
+                self.assertLessEqual(sum(1 for _ in url_log), 102)
+
+            self.assertEqual(other.refresh(), ["https://example.com/a"])
+            self.assertEqual(other.get("https://example.com/a")["data"]["content"], PAGE["content"])
+        finally:
+            other.close()
+
+
+class TestNavigatorStore(unittest.IsolatedAsyncioTestCase):
+    """Pruebas del precalentado del navegador desde el almacén."""
+
+    async def test_warm_from_store_after_restart(self):
+        """Probar que un navegador nuevo sirve las páginas guardadas sin descargarlas."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text="<html><title>Stored</title><main><p>Persisted</p></main></html>")
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(CONFIG, {"STORE_DIR": tmp}):
+            navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+            await navigator.fetch_page("/stored")
+            await navigator.aclose()
+
+            navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+            self.assertEqual(navigator.warm_from_store(), 1)
+            page = await navigator.fetch_page("/stored")
+            await navigator.aclose()
+
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(page["title"], "Stored")
+        self.assertIn("https://modelcontextprotocol.io/stored", navigator.index)
+
+    async def test_clear_empties_store(self):
+        """Probar que limpiar el caché vacía también el almacén y que los demás procesos lo ven."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text=f"<html><title>v{len(requests)}</title><main><p>Body</p></main></html>")
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(CONFIG, {"STORE_DIR": tmp}):
+            navigator = WebsiteNavigator(transport=httpx.MockTransport(handler))
+            other = PageStore(tmp)
+            try:
+                await navigator.fetch_page("/stored")
+                other.refresh()
+                await navigator.clear()
+                page = await navigator.fetch_page("/stored")
+                removed = other.refresh()
+            finally:
+                other.close()
+                await navigator.aclose()
+
+        self.assertEqual(page["title"], "v2")
+        self.assertEqual(removed, ["https://modelcontextprotocol.io/stored"])
+
+    async def test_follower_only_renews_touched_pages(self):
+        """Probar que un seguidor renueva sin reindexar las páginas cuyo contenido no cambió."""
+        handler = lambda request: httpx.Response(200, text="<html><title>Same</title><main><p>Body</p></main></html>")
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(CONFIG, {"STORE_DIR": tmp}):
+            leader = WebsiteNavigator(transport=httpx.MockTransport(handler))
+            follower = WebsiteNavigator(transport=httpx.MockTransport(handler))
+            try:
+                await leader.fetch_page("/page")
+                self.assertEqual(follower.sync_from_store(), 1)
+
+                await leader.renew("https://modelcontextprotocol.io/page")
+                with patch.object(follower, "_index_page") as index_page:
+                    self.assertEqual(follower.sync_from_store(), 0)
+                index_page.assert_not_called()
+                self.assertLess(follower.cache.age("https://modelcontextprotocol.io/page"), 1)
+            finally:
+                await leader.aclose()
+                await follower.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
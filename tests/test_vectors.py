@@ -0,0 +1,123 @@
+"""Pruebas para el índice vectorial y la búsqueda híbrida."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app import CONFIG, WebsiteNavigator
+from app.core.vectors import HashingEmbedder, VectorIndex, hybrid_scores
+
+PAGES = {
+    "https://example.com/install": (
+        "Installation",
+        "## Requirements\n\nPython 3.11.\n\n## Installing\n\nInstalling the server takes one command.\n",
+    ),
+    "https://example.com/tools": ("Tools", "## Tools\n\nTools let servers expose functions to clients.\n"),
+    "https://example.com/prompts": ("Prompts", "## Prompts\n\nPrompts are reusable message templates.\n"),
+}
+
+
+class TestVectorIndex(unittest.TestCase):
+    """Pruebas para la clase VectorIndex."""
+
+    def setUp(self):
+        """Indexar unas páginas de ejemplo."""
+        self.index = VectorIndex(chunk_bytes=64)
+        for url, (title, content) in PAGES.items():
+            self.index.add(url, title, content)
+
+    def test_embeddings_are_normalized(self):
+        """Probar que los vectores tienen norma 1 (el producto escalar es el coseno)."""
+        vectors = HashingEmbedder(dim=64).embed(["installing servers", ""])
+        self.assertAlmostEqual(float((vectors[0] ** 2).sum()), 1.0, places=5)
+        self.assertEqual(float(abs(vectors[1]).sum()), 0.0)
+
+    def test_search_matches_word_variants(self):
+        """Probar que variantes de una palabra (install/installing) encuentran la página."""
+        results = self.index.search("install server", limit=2)
+        self.assertEqual(results[0]["url"], "https://example.com/install")
+        self.assertIn("Installing the server", results[0]["snippet"])
+
+    def test_reindex_only_when_content_changes(self):
+        """Probar que solo se recalculan los embeddings si el contenido cambió y se reutilizan filas."""
+        rows = len(self.index._texts)
+        self.assertFalse(self.index.add("https://example.com/tools", *PAGES["https://example.com/tools"]))
+        self.assertTrue(self.index.add("https://example.com/tools", "Tools", "Sampling requests."))
+        self.assertEqual(len(self.index._texts), rows)
+        self.assertEqual(self.index.search("sampling", limit=1)[0]["url"], "https://example.com/tools")
+        self.assertTrue(self.index.remove("https://example.com/tools"))
+        self.assertNotIn("https://example.com/tools", self.index.url_scores("sampling"))
+
+    def test_save_and_load(self):
+        """Probar que el índice se recarga desde disco con los mismos resultados."""
+        with tempfile.TemporaryDirectory() as path:
+            index = VectorIndex(path=path, chunk_bytes=64)
+            for url, (title, content) in PAGES.items():
+                index.add(url, title, content)
+            index.remove("https://example.com/prompts")
+            index.save()
+            reloaded = VectorIndex(path=path, chunk_bytes=64)
+            other = VectorIndex(path=path, chunk_bytes=128)
+
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.url_scores("tools functions"), index.url_scores("tools functions"))
+        self.assertTrue(reloaded.add("https://example.com/prompts", *PAGES["https://example.com/prompts"]))
+        self.assertEqual(len(other), 0)
+
+    def test_hybrid_scores(self):
+        """Probar la combinación de BM25 normalizado y similitud coseno."""
+        scores = hybrid_scores({"a": 4.0, "b": 2.0}, {"b": 0.8, "c": 0.6}, alpha=0.5)
+        self.assertEqual(scores, {"a": 0.5, "b": 0.65, "c": 0.3})
+
+
+class TestHybridSearch(unittest.IsolatedAsyncioTestCase):
+    """Pruebas de la búsqueda híbrida del navegador."""
+
+    @patch.dict(CONFIG, {"HYBRID_ALPHA": 0.5})
+    async def test_navigator_ranks_with_both_signals(self):
+        """Probar que una página sin el término exacto aparece gracias a los embeddings."""
+        def handler(request):
+            title, content = PAGES[f"https://example.com{request.url.path}"]
+            return httpx.Response(200, text=f"<html><title>{title}</title><main><p>{content}</p></main></html>")
+
+        navigator = WebsiteNavigator(transport=httpx.MockTransport(handler), vectors=VectorIndex())
+        for url in PAGES:
+            await navigator.fetch_page(url)
+        hybrid = await navigator.search("install")
+        navigator.vectors = None
+        lexical = await navigator.search("install")
+        await navigator.aclose()
+
+        self.assertEqual(lexical, [])
+        self.assertEqual(hybrid[0]["url"], "https://example.com/install")
+
+    async def test_only_leader_saves_shared_index(self):
+        """Probar que con varios workers solo el líder guarda el índice del directorio compartido."""
+        def handler(request):
+            title, content = PAGES[f"https://example.com{request.url.path}"]
+            return httpx.Response(200, text=f"<html><title>{title}</title><main><p>{content}</p></main></html>")
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(CONFIG, {"STORE_DIR": tmp, "WORKERS": 2}):
+            workers = [
+                WebsiteNavigator(transport=httpx.MockTransport(handler), vectors=VectorIndex(path=tmp))
+                for _ in range(2)
+            ]
+            leader, follower = workers
+            self.assertTrue(leader.leader.try_acquire())
+            await leader.fetch_page("https://example.com/install")
+            await follower.fetch_page("https://example.com/tools")
+            for worker in workers:
+                await worker.aclose()
+
+            saved = VectorIndex(path=tmp)
+            leftovers = [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+
+        self.assertEqual(list(saved._docs), ["https://example.com/install"])
+        self.assertEqual(leftovers, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
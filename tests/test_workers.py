@@ -0,0 +1,89 @@
+"""Pruebas para la coordinación entre workers."""
+
+import os
+import tempfile
+import types
+import unittest
+from unittest.mock import patch
+from uuid import uuid4
+
+from app import CONFIG
+from app.__main__ import serve_workers
+from app.core.workers import LeaderLock, SessionRelay
+
+MESSAGE = b'{"jsonrpc": "2.0", "method": "notifications/initialized"}'
+
+
+class FakeWriter:
+    """Extremo de escritura de una sesión SSE que guarda los mensajes recibidos."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message):
+        self.messages.append(message)
+
+
+class TestLeaderLock(unittest.TestCase):
+    """Pruebas para la clase LeaderLock."""
+
+    def test_single_leader(self):
+        """Probar que solo un participante es líder y que otro lo releva al liberarse."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "leader.lock")
+            first, second = LeaderLock(path), LeaderLock(path)
+            self.assertTrue(first.try_acquire())
+            self.assertFalse(second.try_acquire())
+            first.release()
+            self.assertTrue(second.try_acquire())
+            self.assertFalse(first.is_leader)
+            second.release()
+
+
+class TestServeWorkers(unittest.TestCase):
+    """Pruebas del arranque en modo multiproceso."""
+
+    @patch.dict(CONFIG, {"WORKERS": 2, "STORE_DIR": ""})
+    def test_temporary_store_removed_on_exit(self):
+        """Probar que el almacén temporal creado sin MCP_NAV_STORE_DIR se borra al terminar."""
+        seen = []
+
+        def run(*args, **kwargs):
+            seen.append(os.environ["MCP_NAV_STORE_DIR"])
+            with open(os.path.join(seen[0], "segment.bin"), "wb") as segment:
+                segment.write(b"data")
+
+        with patch.dict(os.environ), patch("uvicorn.run", run):
+            serve_workers()
+
+        self.assertTrue(seen[0])
+        self.assertFalse(os.path.exists(seen[0]))
+
+
+class TestSessionRelay(unittest.IsolatedAsyncioTestCase):
+    """Pruebas para la clase SessionRelay."""
+
+    async def test_forward_to_session_owner(self):
+        """Probar que un mensaje llega al worker que tiene la sesión y que las desconocidas dan 404."""
+        session_id = uuid4()
+        writer = FakeWriter()
+        with tempfile.TemporaryDirectory() as tmp:
+            owner = SessionRelay(tmp, types.SimpleNamespace(_read_stream_writers={session_id: writer}))
+            owner.path = os.path.join(tmp, "owner.sock")
+            other = SessionRelay(tmp, types.SimpleNamespace(_read_stream_writers={}))
+            await owner.start()
+            await other.start()
+            try:
+                accepted = await other.forward(session_id, MESSAGE)
+                invalid = await other.forward(session_id, b"{")
+                missing = await other.forward(uuid4(), MESSAGE)
+            finally:
+                await owner.aclose()
+                await other.aclose()
+
+        self.assertEqual((accepted, invalid, missing), (202, 400, 404))
+        self.assertEqual(writer.messages[0].root.method, "notifications/initialized")
+
+
+if __name__ == "__main__":
+    unittest.main()